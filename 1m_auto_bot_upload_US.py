@@ -8,11 +8,16 @@ import pytz
 import re
 
 # 리팩토링된 공통 모듈 및 설정 가져오기
-from common import send_telegram, fetch_data_in_parallel
+from common import send_telegram
+from score_state import sync_score_state
+from run_checkpoint import checkpointed
 import config as cfg
 
-def analyze_us_stock_strategy():
-    """미국 주식 전략 분석 로직 - 결과 딕셔너리 반환"""
+def analyze_us_stock_strategy(ckpt=None):
+    """
+    미국 주식 전략 분석 로직 - 결과 딕셔너리 반환
+    :param ckpt: RunCheckpoint (통합 리포트에서 전달, 종목 리스트/시세 수집 단계 결과를 저장·재사용)
+    """
     print("="*70)
     print("📊 미국 주식 가중모멘텀 전략 (S&P500 Top 200)")
     print("="*70)
@@ -32,22 +37,26 @@ def analyze_us_stock_strategy():
     
 # 1. 대상 종목 리스트 구성
     try:
-        print("⏳ 분석 대상 종목 수집 중... (S&P500 + NASDAQ Top 100)")
-        
-        # [수정] S&P 500 전종목 (약 500개)
-        df_sp500 = fdr.StockListing('S&P500')
-        sp500_tickers = set(df_sp500['Symbol'].tolist())
-        
-        # [수정] 나스닥 전체 중 상위 100개 (QQQ 스타일)
-        df_nasdaq = fdr.StockListing('NASDAQ')
-        nasdaq100_tickers = set(df_nasdaq.head(100)['Symbol'].tolist())
-        
-        # [수정] 합집합으로 중복 제거 (약 530~550개 예상)
-        combined_tickers = sp500_tickers.union(nasdaq100_tickers)
-        
-        # 딕셔너리 변환
-        target_tickers = {t: t for t in combined_tickers}
-        target_tickers[cfg.US_DEFENSE_ASSET] = cfg.US_DEFENSE_ASSET # 방어 자산 추가
+        def _listing():
+            print("⏳ 분석 대상 종목 수집 중... (S&P500 + NASDAQ Top 100)")
+
+            # [수정] S&P 500 전종목 (약 500개)
+            df_sp500 = fdr.StockListing('S&P500')
+            sp500_tickers = set(df_sp500['Symbol'].tolist())
+
+            # [수정] 나스닥 전체 중 상위 100개 (QQQ 스타일)
+            df_nasdaq = fdr.StockListing('NASDAQ')
+            nasdaq100_tickers = set(df_nasdaq.head(100)['Symbol'].tolist())
+
+            # [수정] 합집합으로 중복 제거 (약 530~550개 예상)
+            combined_tickers = sp500_tickers.union(nasdaq100_tickers)
+
+            # 딕셔너리 변환
+            target_tickers = {t: t for t in combined_tickers}
+            target_tickers[cfg.US_DEFENSE_ASSET] = cfg.US_DEFENSE_ASSET # 방어 자산 추가
+            return target_tickers
+
+        target_tickers = checkpointed(ckpt, 'listing', _listing)
         
         print(f"✅ 분석 대상: 총 {len(target_tickers)}개 종목 (S&P500 + NASDAQ100 + {cfg.US_DEFENSE_ASSET})")
 
@@ -61,19 +70,27 @@ def analyze_us_stock_strategy():
     start_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
     
     try:
-        print("⏳ 데이터 병렬 다운로드 중...")
-        # 2-1. 시장 지수
-        market_df = fdr.DataReader(cfg.US_MARKET_INDEX, start=start_date, end=end_date)
-        market_index = market_df['Close'].ffill()
+        def _fetch():
+            print("⏳ 데이터 병렬 다운로드 중...")
+            # 2-1. 시장 지수
+            market_df = fdr.DataReader(cfg.US_MARKET_INDEX, start=start_date, end=end_date)
+            market_index = market_df['Close'].ffill()
 
-        # 2-2. 개별 종목 데이터 병렬 수집
-        raw_data = fetch_data_in_parallel(target_tickers, start_date, end_date)
+            # 2-2. 개별 종목 스코어 상태 갱신 (저장된 상태에 신규 거래일만 반영)
+            score_state = sync_score_state(
+                'us', target_tickers,
+                log_size=cfg.MOMENTUM_SCORE_LOG_DAYS, log_spec=('weighted', cfg.MOMENTUM_WEIGHTS),  # 대시보드 점수 추이용 기록
+            )
+            if score_state is None:
+                raise Exception("유효한 데이터를 하나도 가져오지 못했습니다.")
+            return market_index, score_state
+
+        market_index, score_state = checkpointed(ckpt, 'fetch', _fetch)
+        raw_data = score_state.price_frame()
 
-        if raw_data.empty:
-            raise Exception("유효한 데이터를 하나도 가져오지 못했습니다.")
-            
         print(f"✅ {len(raw_data.columns)}개 종목 데이터 다운로드 완료")
         result['raw_data'] = raw_data
+        result['score_history'] = score_state.score_history()  # 최근 점수 기록 (전체 시세 기준)
 
     except Exception as e:
         result['error'] = f"데이터 다운로드 치명적 오류: {e}"
@@ -83,12 +100,7 @@ def analyze_us_stock_strategy():
     # 3. 전략 계산 (가중 평균 모멘텀)
     try:
         print("⏳ 전략 지표 계산 중...")
-        w1, w2, w3 = cfg.MOMENTUM_WEIGHTS
-        mom_1m = raw_data.pct_change(20).iloc[-1]
-        mom_3m = raw_data.pct_change(60).iloc[-1]
-        mom_6m = raw_data.pct_change(120).iloc[-1]
-
-        weighted_score = (mom_1m.fillna(0) * w1) + (mom_3m.fillna(0) * w2) + (mom_6m.fillna(0) * w3)
+        weighted_score = score_state.weighted_momentum(cfg.MOMENTUM_WEIGHTS)
         result['weighted_score'] = weighted_score
 
         # 시장 타이밍 (SPY 60일선)
@@ -8,11 +8,16 @@ import pytz
 import re
 
 # 리팩토링된 공통 모듈 및 설정 가져오기
-from common import send_telegram, fetch_data_in_parallel
+from common import send_telegram
+from score_state import sync_score_state
+from run_checkpoint import checkpointed
 import config as cfg
 
-def analyze_etf_strategy():
-    """ETF 전략 분석 로직 - 결과 딕셔너리 반환"""
+def analyze_etf_strategy(ckpt=None):
+    """
+    ETF 전략 분석 로직 - 결과 딕셔너리 반환
+    :param ckpt: RunCheckpoint (통합 리포트에서 전달, 종목 리스트/시세 수집 단계 결과를 저장·재사용)
+    """
     print("="*70)
     print("📊 한국 ETF 가중모멘텀 전략")
     print("="*70)
@@ -35,35 +40,39 @@ def analyze_etf_strategy():
 
     # 1. 데이터 준비 - FDR에서 전체 ETF 리스트 받아오기
     try:
-        print("📋 한국 ETF 전종목 리스트 조회 중...")
-        etf_listing = fdr.StockListing('ETF/KR')
-        
-        # 필터링 옵션 (config에서 설정)
-        if hasattr(cfg, 'ETF_MIN_MARCAP') and cfg.ETF_MIN_MARCAP > 0:
-            etf_listing = etf_listing[etf_listing['MarCap'] >= cfg.ETF_MIN_MARCAP]
-            print(f"   ✓ 시총 {cfg.ETF_MIN_MARCAP:,}억 이상 필터 적용")
-        
-        # 패턴으로 제외할 ETF (레버리지, 인버스 등)
-        if hasattr(cfg, 'ETF_EXCLUDE_PATTERNS') and cfg.ETF_EXCLUDE_PATTERNS:
-            for pattern in cfg.ETF_EXCLUDE_PATTERNS:
-                before_count = len(etf_listing)
-                etf_listing = etf_listing[~etf_listing['Name'].str.contains(pattern, case=False, na=False)]
-                excluded_count = before_count - len(etf_listing)
-                if excluded_count > 0:
-                    print(f"   ✓ '{pattern}' 포함 제외: {excluded_count}개")
-        
-        # 정확한 종목명으로 제외할 ETF
-        if hasattr(cfg, 'ETF_EXCLUDE_LIST') and cfg.ETF_EXCLUDE_LIST:
-            etf_listing = etf_listing[~etf_listing['Name'].isin(cfg.ETF_EXCLUDE_LIST)]
-            print(f"   ✓ 정확히 일치하는 종목 제외: {len(cfg.ETF_EXCLUDE_LIST)}개")
-        
-        # 상위 N개만 선택 (config에 설정된 경우)
-        if hasattr(cfg, 'ETF_TOP_N') and cfg.ETF_TOP_N > 0:
-            etf_listing = etf_listing.nlargest(cfg.ETF_TOP_N, 'MarCap')
-            print(f"   ✓ 시총 상위 {cfg.ETF_TOP_N}개 선택")
-        
-        # ETF 티커 딕셔너리 생성 {종목명: 티커}
-        etf_tickers = dict(zip(etf_listing['Name'], etf_listing['Symbol']))
+        def _listing():
+            print("📋 한국 ETF 전종목 리스트 조회 중...")
+            etf_listing = fdr.StockListing('ETF/KR')
+
+            # 필터링 옵션 (config에서 설정)
+            if hasattr(cfg, 'ETF_MIN_MARCAP') and cfg.ETF_MIN_MARCAP > 0:
+                etf_listing = etf_listing[etf_listing['MarCap'] >= cfg.ETF_MIN_MARCAP]
+                print(f"   ✓ 시총 {cfg.ETF_MIN_MARCAP:,}억 이상 필터 적용")
+
+            # 패턴으로 제외할 ETF (레버리지, 인버스 등)
+            if hasattr(cfg, 'ETF_EXCLUDE_PATTERNS') and cfg.ETF_EXCLUDE_PATTERNS:
+                for pattern in cfg.ETF_EXCLUDE_PATTERNS:
+                    before_count = len(etf_listing)
+                    etf_listing = etf_listing[~etf_listing['Name'].str.contains(pattern, case=False, na=False)]
+                    excluded_count = before_count - len(etf_listing)
+                    if excluded_count > 0:
+                        print(f"   ✓ '{pattern}' 포함 제외: {excluded_count}개")
+
+            # 정확한 종목명으로 제외할 ETF
+            if hasattr(cfg, 'ETF_EXCLUDE_LIST') and cfg.ETF_EXCLUDE_LIST:
+                etf_listing = etf_listing[~etf_listing['Name'].isin(cfg.ETF_EXCLUDE_LIST)]
+                print(f"   ✓ 정확히 일치하는 종목 제외: {len(cfg.ETF_EXCLUDE_LIST)}개")
+
+            # 상위 N개만 선택 (config에 설정된 경우)
+            if hasattr(cfg, 'ETF_TOP_N') and cfg.ETF_TOP_N > 0:
+                etf_listing = etf_listing.nlargest(cfg.ETF_TOP_N, 'MarCap')
+                print(f"   ✓ 시총 상위 {cfg.ETF_TOP_N}개 선택")
+
+            # ETF 티커 딕셔너리 생성 {종목명: 티커}
+            etf_tickers = dict(zip(etf_listing['Name'], etf_listing['Symbol']))
+            return etf_tickers
+
+        etf_tickers = checkpointed(ckpt, 'listing', _listing)
         print(f"✅ 총 {len(etf_tickers)}개 ETF 선정")
         
     except Exception as e:
@@ -75,18 +84,26 @@ def analyze_etf_strategy():
     start_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
     
     try:
-        # 1-1. 시장 지수 (KOSPI)
-        market_df = fdr.DataReader(cfg.ETF_MARKET_INDEX, start=start_date, end=end_date)
-        market_index = market_df['Close'].ffill()
+        def _fetch():
+            # 1-1. 시장 지수 (KOSPI)
+            market_df = fdr.DataReader(cfg.ETF_MARKET_INDEX, start=start_date, end=end_date)
+            market_index = market_df['Close'].ffill()
 
-        # 1-2. ETF 데이터 병렬 수집
-        raw_data = fetch_data_in_parallel(etf_tickers, start_date, end_date)
+            # 1-2. ETF 스코어 상태 갱신 (저장된 상태에 신규 거래일만 반영)
+            score_state = sync_score_state(
+                'etf', etf_tickers,
+                log_size=cfg.MOMENTUM_SCORE_LOG_DAYS, log_spec=('weighted', cfg.MOMENTUM_WEIGHTS),  # 대시보드 점수 추이용 기록
+            )
+            if score_state is None:
+                raise Exception("데이터 수집 실패: 유효한 ETF 데이터를 가져오지 못했습니다.")
+            return market_index, score_state
+
+        market_index, score_state = checkpointed(ckpt, 'fetch', _fetch)
+        raw_data = score_state.price_frame()
 
-        if raw_data.empty:
-            raise Exception("데이터 수집 실패: 유효한 ETF 데이터를 가져오지 못했습니다.")
-            
         print(f"✅ {len(raw_data.columns)}개 ETF 데이터 수집 완료")
         result['raw_data'] = raw_data
+        result['score_history'] = score_state.score_history()  # 최근 점수 기록 (전체 시세 기준)
 
     except Exception as e:
         result['error'] = f"데이터 수집 오류: {e}"
@@ -95,12 +112,7 @@ def analyze_etf_strategy():
 
     # 2. 가중 평균 모멘텀 계산
     try:
-        w1, w2, w3 = cfg.MOMENTUM_WEIGHTS
-        mom_1m = raw_data.pct_change(20).iloc[-1]
-        mom_3m = raw_data.pct_change(60).iloc[-1]
-        mom_6m = raw_data.pct_change(120).iloc[-1]
-
-        weighted_score = (mom_1m.fillna(0) * w1) + (mom_3m.fillna(0) * w2) + (mom_6m.fillna(0) * w3)
+        weighted_score = score_state.weighted_momentum(cfg.MOMENTUM_WEIGHTS)
         result['weighted_score'] = weighted_score
 
         # 시장 타이밍 (코스피 60일선)
@@ -8,11 +8,16 @@ import time
 import re
 
 # 리팩토링된 공통 모듈 및 설정 가져오기
-from common import send_telegram, fetch_data_in_parallel
+from common import send_telegram
+from score_state import sync_score_state
+from run_checkpoint import checkpointed
 import config as cfg
 
-def analyze_stock_strategy():
-    """한국 개별주 전략 분석 로직 - 결과 딕셔너리 반환"""
+def analyze_stock_strategy(ckpt=None):
+    """
+    한국 개별주 전략 분석 로직 - 결과 딕셔너리 반환
+    :param ckpt: RunCheckpoint (통합 리포트에서 전달, 종목 리스트/시세 수집 단계 결과를 저장·재사용)
+    """
     print("="*70)
     print("📊 한국 개별주 변동성조절 모멘텀 전략")
     print("="*70)
@@ -27,21 +32,27 @@ def analyze_stock_strategy():
         'market_index_val': 0,
         'weighted_score': {},
         'raw_data': None,
+        'tickers_map': {},
         'error': None
     }
     
     # 1. 대상 종목 리스트 구성
     try:
-        print("⏳ 분석 대상 종목 수집 중...")
-        df_kospi = fdr.StockListing('KOSPI').sort_values('Marcap', ascending=False).head(cfg.MOSIG_TOP_N_KOSPI)
-        df_kosdaq = fdr.StockListing('KOSDAQ').sort_values('Marcap', ascending=False).head(cfg.MOSIG_TOP_N_KOSDAQ)
-        
-        target_tickers = {}
-        for _, row in pd.concat([df_kospi, df_kosdaq]).iterrows():
-            target_tickers[row['Name']] = row['Code']
+        def _listing():
+            print("⏳ 분석 대상 종목 수집 중...")
+            df_kospi = fdr.StockListing('KOSPI').sort_values('Marcap', ascending=False).head(cfg.MOSIG_TOP_N_KOSPI)
+            df_kosdaq = fdr.StockListing('KOSDAQ').sort_values('Marcap', ascending=False).head(cfg.MOSIG_TOP_N_KOSDAQ)
+
+            target_tickers = {}
+            for _, row in pd.concat([df_kospi, df_kosdaq]).iterrows():
+                target_tickers[row['Name']] = row['Code']
+
+            # 방어 자산 추가
+            target_tickers[cfg.STOCK_DEFENSE_ASSET] = cfg.ETF_TICKERS.get(cfg.STOCK_DEFENSE_ASSET, '261240')
+            return target_tickers
 
-        # 방어 자산 추가
-        target_tickers[cfg.STOCK_DEFENSE_ASSET] = cfg.ETF_TICKERS.get(cfg.STOCK_DEFENSE_ASSET, '261240')
+        target_tickers = checkpointed(ckpt, 'listing', _listing)
+        result['tickers_map'] = target_tickers
         
         print(f"✅ 분석 대상: 총 {len(target_tickers)}개 종목 후보 확보")
 
@@ -55,27 +66,36 @@ def analyze_stock_strategy():
     start_date = (datetime.now() - timedelta(days=365)).strftime("%Y-%m-%d")
     
     try:
-        print("⏳ 데이터 병렬 다운로드 중...")
-        # 2-1. 시장 지수
-        market_df = fdr.DataReader(cfg.STOCK_MARKET_INDEX, start=start_date, end=end_date)
-        market_index = market_df['Close'].ffill()
+        def _fetch():
+            print("⏳ 데이터 병렬 다운로드 중...")
+            # 2-1. 시장 지수
+            market_df = fdr.DataReader(cfg.STOCK_MARKET_INDEX, start=start_date, end=end_date)
+            market_index = market_df['Close'].ffill()
 
-        # 2-2. 개별 종목 데이터 병렬 수집
-        raw_data = fetch_data_in_parallel(target_tickers, start_date, end_date)
+            # 2-2. 개별 종목 스코어 상태 갱신 (저장된 상태에 신규 거래일만 반영)
+            score_state = sync_score_state(
+                'stock', target_tickers,
+                log_size=cfg.MOMENTUM_SCORE_LOG_DAYS, log_spec=('vol_adjusted', (60, 120)),  # 대시보드 점수 추이용 기록
+            )
 
-        # 데이터 검증
-        if raw_data.empty:
-            raise Exception("유효한 데이터를 하나도 가져오지 못했습니다.")
+            # 데이터 검증
+            if score_state is None:
+                raise Exception("유효한 데이터를 하나도 가져오지 못했습니다.")
+            return market_index, score_state
+
+        market_index, score_state = checkpointed(ckpt, 'fetch', _fetch)
         
         # 변동성 계산을 위해 최소 120일치 데이터가 있는 종목만 필터링
-        valid_cols = [col for col in raw_data.columns if raw_data[col].count() >= 120]
-        raw_data = raw_data[valid_cols]
+        valid_counts = score_state.valid_count()
+        valid_cols = list(valid_counts[valid_counts >= 120].index)
+        raw_data = score_state.price_frame()[valid_cols]
         
         if raw_data.empty:
             raise Exception("최소 분석 기간(120일)을 충족하는 종목이 없습니다.")
             
         print(f"✅ {len(raw_data.columns)}개 종목 데이터 분석 준비 완료")
         result['raw_data'] = raw_data
+        result['score_history'] = score_state.score_history()[valid_cols]  # 최근 점수 기록 (전체 시세 기준)
 
     except Exception as e:
         result['error'] = f"데이터 다운로드 치명적 오류: {e}"
@@ -85,20 +105,8 @@ def analyze_stock_strategy():
     # 3. 전략 계산 (변동성 조절 모멘텀)
     try:
         print("⏳ 전략 지표 계산 중...")
-        daily_rets = raw_data.pct_change()
-        
-        ret_3m = raw_data.pct_change(60).iloc[-1]
-        ret_6m = raw_data.pct_change(120).iloc[-1]
-        
-        vol_3m = daily_rets.rolling(60).std().iloc[-1]
-        
-        # 0으로 나누는 것을 방지하기 위한 작은 값
-        epsilon = 1e-6 
-        score_3m = ret_3m / (vol_3m + epsilon)
-        score_6m = ret_6m / (vol_3m + epsilon)
-        
-        # 3개월, 6개월 점수 평균
-        weighted_score = (score_3m.fillna(0) * 0.5) + (score_6m.fillna(0) * 0.5)
+        # 3개월, 6개월 수익률을 60일 변동성으로 나눈 점수의 평균
+        weighted_score = score_state.vol_adjusted(60, 120)[valid_cols]
         result['weighted_score'] = weighted_score
 
         # 시장 타이밍 (코스피 60일선)
@@ -3,84 +3,156 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
-def calculate_supertrend(df, period=10, multiplier=3.0, change_atr=True):
-    df = df.copy()
-    high, low, close = df['High'], df['Low'], df['Close']
-    hl2 = (high + low) / 2
+try:
+    from numba import njit  # 선택 의존성: 있으면 Supertrend 재귀 루프를 기계어로 컴파일
+except ImportError:
+    njit = None
 
-    tr = pd.concat(
-        [high - low, (high - close.shift(1)).abs(), (low - close.shift(1)).abs()],
-        axis=1
-    ).max(axis=1)
+def _supertrend_rows(close, up_raw, dn_raw):
+    """
+    Supertrend 밴드 래칫 + 추세 전환 (행 단위 1회 순회, 종목 열 방향은 NumPy 벡터 연산)
+    - 밴드: 전일 종가가 전일 밴드 위(아래)면 하단(상단) 밴드는 올라가기만(내려가기만) 함
+    - 추세: 하락 중 종가 > 전일 상단 밴드 → 상승, 상승 중 종가 < 전일 하단 밴드 → 하락
+    :param close, up_raw, dn_raw: (날짜, 종목) 2차원 배열
+    :return: (up, dn, trend)
+    """
+    up = np.empty_like(up_raw)
+    dn = np.empty_like(dn_raw)
+    trend = np.ones(close.shape, dtype=np.int64)
+    up[0], dn[0] = up_raw[0], dn_raw[0]
 
-    atr_sma = tr.rolling(window=period).mean()
-    atr_rma = tr.ewm(alpha=1 / period, adjust=False).mean()
-    atr = atr_rma if change_atr else atr_sma
+    for i in range(1, len(close)):
+        # 전일 밴드가 없으면(지표 준비 전) 당일 원시 밴드 사용
+        up1 = np.where(np.isnan(up[i - 1]), up_raw[i], up[i - 1])
+        dn1 = np.where(np.isnan(dn[i - 1]), dn_raw[i], dn[i - 1])
+        up[i] = np.where(close[i - 1] > up1, np.where(up1 > up_raw[i], up1, up_raw[i]), up_raw[i])
+        dn[i] = np.where(close[i - 1] < dn1, np.where(dn1 < dn_raw[i], dn1, dn_raw[i]), dn_raw[i])
 
-    up_raw = hl2 - (multiplier * atr)
-    dn_raw = hl2 + (multiplier * atr)
+        prev_up = np.where(np.isnan(up[i - 1]), up[i], up[i - 1])
+        prev_dn = np.where(np.isnan(dn[i - 1]), dn[i], dn[i - 1])
+        prev_trend = trend[i - 1]
+        trend[i] = np.where((prev_trend == -1) & (close[i] > prev_dn), 1,
+                            np.where((prev_trend == 1) & (close[i] < prev_up), -1, prev_trend))
+    return up, dn, trend
 
-    up = up_raw.copy()
-    dn = dn_raw.copy()
+def _supertrend_scalar(close, up_raw, dn_raw):
+    """_supertrend_rows와 같은 계산을 원소 단위 루프로 (numba 컴파일용)"""
+    rows, cols = close.shape
+    up = np.empty_like(up_raw)
+    dn = np.empty_like(dn_raw)
+    trend = np.ones(close.shape, dtype=np.int64)
+    for k in range(cols):
+        up[0, k], dn[0, k] = up_raw[0, k], dn_raw[0, k]
+        for i in range(1, rows):
+            up1 = up_raw[i, k] if np.isnan(up[i - 1, k]) else up[i - 1, k]
+            dn1 = dn_raw[i, k] if np.isnan(dn[i - 1, k]) else dn[i - 1, k]
+            if close[i - 1, k] > up1:
+                up[i, k] = up1 if up1 > up_raw[i, k] else up_raw[i, k]
+            else:
+                up[i, k] = up_raw[i, k]
+            if close[i - 1, k] < dn1:
+                dn[i, k] = dn1 if dn1 < dn_raw[i, k] else dn_raw[i, k]
+            else:
+                dn[i, k] = dn_raw[i, k]
 
-    for i in range(1, len(df)):
-        up1 = up.iloc[i - 1] if pd.notna(up.iloc[i - 1]) else up_raw.iloc[i]
-        dn1 = dn.iloc[i - 1] if pd.notna(dn.iloc[i - 1]) else dn_raw.iloc[i]
+            prev_up = up[i, k] if np.isnan(up[i - 1, k]) else up[i - 1, k]
+            prev_dn = dn[i, k] if np.isnan(dn[i - 1, k]) else dn[i - 1, k]
+            prev_trend = trend[i - 1, k]
+            if prev_trend == -1 and close[i, k] > prev_dn:
+                trend[i, k] = 1
+            elif prev_trend == 1 and close[i, k] < prev_up:
+                trend[i, k] = -1
+            else:
+                trend[i, k] = prev_trend
+    return up, dn, trend
 
-        up.iloc[i] = max(up_raw.iloc[i], up1) if close.iloc[i - 1] > up1 else up_raw.iloc[i]
-        dn.iloc[i] = min(dn_raw.iloc[i], dn1) if close.iloc[i - 1] < dn1 else dn_raw.iloc[i]
+_supertrend_kernel = njit(cache=True)(_supertrend_scalar) if njit is not None else _supertrend_rows
 
-    trend = np.ones(len(df), dtype=int)
-    for i in range(1, len(df)):
-        prev_trend = trend[i - 1]
-        up1 = up.iloc[i - 1] if pd.notna(up.iloc[i - 1]) else up.iloc[i]
-        dn1 = dn.iloc[i - 1] if pd.notna(dn.iloc[i - 1]) else dn.iloc[i]
+def supertrend_panel(high, low, close, period=10, multiplier=3.0, change_atr=True):
+    """
+    여러 종목(또는 여러 파라미터 조합)의 Supertrend를 한 번에 계산합니다.
+    :param high, low, close: DataFrame (행: 날짜, 열: 종목) - 열 구성이 같아야 함
+    :param change_atr: True면 ATR을 RMA(Wilder), False면 SMA로 계산
+    :return: {'Trend': 1/-1, 'Up': 하단 밴드, 'Dn': 상단 밴드} DataFrame
+    """
+    h, l, c = (np.ascontiguousarray(x.to_numpy(dtype=float)) for x in (high, low, close))
+    prev_close = np.vstack([np.full((1, c.shape[1]), np.nan), c[:-1]])
+    tr = np.fmax(np.fmax(h - l, np.abs(h - prev_close)), np.abs(l - prev_close))
+
+    tr = pd.DataFrame(tr, index=close.index, columns=close.columns)
+    atr = tr.ewm(alpha=1 / period, adjust=False).mean() if change_atr else tr.rolling(window=period).mean()
+    atr = np.ascontiguousarray(atr.to_numpy())
 
-        if prev_trend == -1 and close.iloc[i] > dn1:
-            trend[i] = 1
-        elif prev_trend == 1 and close.iloc[i] < up1:
-            trend[i] = -1
-        else:
-            trend[i] = prev_trend
+    hl2 = (h + l) / 2
+    up, dn, trend = _supertrend_kernel(c, hl2 - multiplier * atr, hl2 + multiplier * atr)
+    return {
+        'Trend': pd.DataFrame(trend, index=close.index, columns=close.columns),
+        'Up': pd.DataFrame(up, index=close.index, columns=close.columns),
+        'Dn': pd.DataFrame(dn, index=close.index, columns=close.columns),
+    }
 
-    df['Trend'] = trend
+def calculate_supertrend(df, period=10, multiplier=3.0, change_atr=True):
+    df = df.copy()
+    result = supertrend_panel(df[['High']], df[['Low']], df[['Close']], period, multiplier, change_atr)
+    df['Trend'] = result['Trend'].to_numpy()[:, 0].astype(int)
     return df
 
+def macd_lines(close):
+    """MACD(12, 26)와 시그널(9) - close가 Series면 Series, DataFrame(여러 종목)이면 DataFrame"""
+    macd = close.ewm(span=12).mean() - close.ewm(span=26).mean()
+    return macd, macd.ewm(span=9).mean()
+
+def rsi_values(close, period=14):
+    """단순 이동평균 RSI (상승/하락 합이 0이면 0) - Series/DataFrame 모두 가능"""
+    delta = close.diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    return (100 * gain / (gain + loss).replace(0, np.nan)).fillna(0)
+
 def calculate_macd(df):
     df = df.copy()
-    df['MACD'] = df['Close'].ewm(span=12).mean() - df['Close'].ewm(span=26).mean()
-    df['Signal'] = df['MACD'].ewm(span=9).mean()
+    df['MACD'], df['Signal'] = macd_lines(df['Close'])
     return df
 
 def calculate_rsi(df, period=14):
     df = df.copy()
-    delta = df['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    df['RSI'] = 100 * gain / (gain + loss).replace(0, np.nan)
-    df['RSI'] = df['RSI'].fillna(0)
+    df['RSI'] = rsi_values(df['Close'], period)
     return df
 
-def generate_signals(df):
-    # 튜닝 결과 반영: SMA 200 -> 180으로 최적화
-    df['SMA180'] = df['Close'].rolling(window=180).mean()
-    df['Leverage_Level'] = 1
-    for i in range(len(df)):
-        # 1. 하락/방어 조건 (Trend 하락 혹은 180일선 하회)
-        if df['Trend'].iloc[i] == -1 or df['Close'].iloc[i] < df['SMA180'].iloc[i]:
-            df.at[df.index[i], 'Leverage_Level'] = 1
-        
-        # 2. 강력 상승 조건 (모든 모멘텀 일치)
-        elif (df['MACD'].iloc[i] > df['Signal'].iloc[i] and 
-              df['RSI'].iloc[i] > 46.0):
-            df.at[df.index[i], 'Leverage_Level'] = 3
-            
-        # 3. 중립 조건 (추세는 살아있으나 모멘텀 부족)
-        else:
-            df.at[df.index[i], 'Leverage_Level'] = 2
-            
+# 튜닝 결과 반영: SMA 200 -> 180으로 최적화, RSI 기준 46.0
+SMA_WINDOW = 180
+RSI_THRESHOLD = 46.0
+
+def leverage_level(trend, close, sma, macd, signal, rsi, rsi_threshold=RSI_THRESHOLD):
+    """
+    기어 단계 (배열 연산, 입력은 같은 모양의 Series/DataFrame/ndarray)
+    1: 하락/방어 (Trend 하락 혹은 SMA 하회)
+    3: 강력 상승 (MACD > Signal AND RSI > 기준)
+    2: 중립 (추세는 살아있으나 모멘텀 부족)
+    * SMA가 아직 없는 구간(NaN)은 SMA 하회로 보지 않음
+    """
+    defense = (np.asarray(trend) == -1) | (np.asarray(close) < np.asarray(sma))
+    full_power = (np.asarray(macd) > np.asarray(signal)) & (np.asarray(rsi) > rsi_threshold)
+    return np.select([defense, full_power], [1, 3], default=2)
+
+def generate_signals(df, sma_window=SMA_WINDOW, rsi_threshold=RSI_THRESHOLD):
+    df['SMA180'] = df['Close'].rolling(window=sma_window).mean()
+    df['Leverage_Level'] = leverage_level(df['Trend'], df['Close'], df['SMA180'],
+                                          df['MACD'], df['Signal'], df['RSI'], rsi_threshold)
     return df
 
+def gear_levels(high, low, close, period=10, multiplier=3.0, sma_window=SMA_WINDOW, rsi_threshold=RSI_THRESHOLD):
+    """
+    여러 기초자산의 기어 단계를 한 번에 계산 (calculate_supertrend → macd → rsi → generate_signals와 동일)
+    :param high, low, close: DataFrame (행: 날짜, 열: 기초자산)
+    :return: Leverage_Level DataFrame (1/2/3)
+    """
+    trend = supertrend_panel(high, low, close, period, multiplier)['Trend']
+    macd, signal = macd_lines(close)
+    sma = close.rolling(window=sma_window).mean()
+    levels = leverage_level(trend, close, sma, macd, signal, rsi_values(close), rsi_threshold)
+    return pd.DataFrame(levels, index=close.index, columns=close.columns)
+
 if __name__ == "__main__":
     print("🚀 나스닥 3단계 레버리지 시스템 가동 중...")
     start_date = (datetime.now() - timedelta(days=365*2)).strftime('%Y-%m-%d')
@@ -116,7 +188,7 @@ if __name__ == "__main__":
         print(f" - 추세(Supertrend): {'상승' if latest['Trend']==1 else '하락'}")
         print(f" - 장기추세(SMA180): {'상회' if latest['Close'] > latest['SMA180'] else '하회'}")
         print(f" - 모멘텀(MACD)   : {'살아있음' if latest['MACD'] > latest['Signal'] else '죽어있음'}")
-        print(f" - 시장강도(RSI)  : {latest['RSI']:.2f} (기준: 46.0)")
+        print(f" - 시장강도(RSI)  : {latest['RSI']:.2f} (기준: {RSI_THRESHOLD})")
         print("-" * 50)
         print(f" 결론: {target_symbol}을(를) 통해 시장 {int(latest['Leverage_Level'])}배수 대응을 유지하세요.")
         print("="*50)
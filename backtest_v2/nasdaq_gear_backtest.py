@@ -0,0 +1,220 @@
+# backtest_v2/nasdaq_gear_backtest.py
+"""
+나스닥 3단계 기어 전략 (NASDAQ_strategy.py) 백테스트 + 파라미터 탐색.
+- QQQ로 Leverage_Level(1/2/3)을 계산하고, 다음 거래일에 QQQM/QLD/TQQQ 중 해당 자산을 보유
+- 기어가 바뀔 때마다 매도+매수 거래비용 차감
+- 상장 전 구간(QQQM 2020, TQQQ 2010, QLD 2006 이전)은 QQQ 일간 수익률 × 배수 - 보수로 합성
+- 파라미터 탐색: Supertrend(기간, 배수) 조합별로 프로세스를 나눠 계산하고,
+  SMA/RSI 기준은 미리 계산한 지표 격자를 브로드캐스팅해 한 번에 평가
+
+사용법 (backtest_v2 폴더에서):
+    python nasdaq_gear_backtest.py          # 현재 파라미터 백테스트
+    python nasdaq_gear_backtest.py grid     # 파라미터 탐색
+"""
+
+import os
+import sys
+import time
+import pickle
+import itertools
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import FinanceDataReader as fdr
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+from NASDAQ_strategy import supertrend_panel, macd_lines, rsi_values, gear_levels, SMA_WINDOW, RSI_THRESHOLD  # noqa: E402
+
+# --- 백테스트 설정 ---
+START_DATE = '1999-03-10'   # QQQ 상장일
+LEVEL_ASSETS = {1: 'QQQM', 2: 'QLD', 3: 'TQQQ'}
+LEVERAGE = {1: 1, 2: 2, 3: 3}
+EXPENSE_RATIO = {1: 0.0015, 2: 0.0095, 3: 0.0084}  # 합성 구간에 적용할 연 보수
+COST_PER_TRADE = 0.001      # 편도 거래비용 (수수료 + 슬리피지), 기어 변경 시 매도+매수로 2회
+DATA_PATH = os.path.join(ROOT_DIR, 'data', 'nasdaq_gear_prices.pkl')
+
+# 현재 전략 파라미터 (NASDAQ_strategy 기본값)
+DEFAULT_PARAMS = {'period': 10, 'multiplier': 3.0, 'sma_window': SMA_WINDOW, 'rsi_threshold': RSI_THRESHOLD}
+
+# 탐색 범위
+PARAM_GRID = {
+    'period': [7, 10, 14, 20],
+    'multiplier': [1.5, 2.0, 2.5, 3.0, 3.5, 4.0],
+    'sma_window': list(range(100, 261, 20)),
+    'rsi_threshold': [float(x) for x in range(40, 61, 2)],
+}
+
+
+def load_gear_data(start_date=START_DATE):
+    """
+    QQQ 일봉과 기어별 보유 자산 일간 수익률 (당일 저장분이 있으면 재사용)
+    :return: (qqq OHLCV DataFrame, asset_returns DataFrame(열: 1/2/3))
+    """
+    if os.path.exists(DATA_PATH):
+        with open(DATA_PATH, 'rb') as f:
+            cached = pickle.load(f)
+        if cached['date'] == datetime.now().date() and cached['start'] <= start_date:
+            print("📦 저장된 가격 데이터 재사용")
+            return cached['qqq'].loc[start_date:], cached['returns'].loc[start_date:]
+
+    print("⏳ QQQ / QQQM / QLD / TQQQ 가격 수집 중...")
+    qqq = fdr.DataReader('QQQ', start_date)
+    qqq_ret = qqq['Close'].pct_change()
+
+    returns = {}
+    for level, symbol in LEVEL_ASSETS.items():
+        try:
+            actual = fdr.DataReader(symbol, start_date)['Close'].reindex(qqq.index).pct_change()
+        except Exception as e:
+            print(f"⚠️ {symbol} 수집 실패, 전 구간 합성: {e}")
+            actual = pd.Series(np.nan, index=qqq.index)
+        synthetic = qqq_ret * LEVERAGE[level] - EXPENSE_RATIO[level] / 252
+        returns[level] = actual.fillna(synthetic)
+    returns = pd.DataFrame(returns).fillna(0.0)
+
+    os.makedirs(os.path.dirname(DATA_PATH), exist_ok=True)
+    with open(DATA_PATH, 'wb') as f:
+        pickle.dump({'date': datetime.now().date(), 'start': start_date, 'qqq': qqq, 'returns': returns}, f)
+    return qqq, returns
+
+
+def simulate_levels(levels, asset_returns, cost=COST_PER_TRADE):
+    """
+    기어 단계 → 일간 전략 수익률 (여러 파라미터 조합을 열로 한 번에)
+    t일 종가 신호로 t+1일 수익률을 받고, 보유 자산이 바뀐 날은 매도+매수 비용 차감
+    :param levels: (날짜, 조합) 1/2/3 배열
+    :param asset_returns: (날짜, 3) 기어 1/2/3 자산 일간 수익률
+    :return: (일간 수익률, 기어 변경 횟수) - 첫날은 수익률 0
+    """
+    levels = np.asarray(levels, dtype=np.int64).reshape(len(levels), -1)
+    held = np.vstack([levels[:1], levels[:-1]])  # 전일 신호로 보유
+    rets = np.asarray(asset_returns)[np.arange(len(held))[:, None], held - 1]
+    switched = np.vstack([np.zeros((1, held.shape[1]), dtype=bool), held[1:] != held[:-1]])
+    rets = rets - switched * (2 * cost)
+    rets[0] = 0.0
+    return rets, switched.sum(axis=0)
+
+
+def performance(daily_returns, index):
+    """열별 CAGR / MDD / Sharpe (비율, 1.0 = 100%)"""
+    equity = np.cumprod(1 + daily_returns, axis=0)
+    years = max((index[-1] - index[0]).days / 365.25, 1e-9)
+    drawdown = equity / np.maximum.accumulate(equity, axis=0) - 1
+    std = daily_returns.std(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, daily_returns.mean(axis=0) / std * np.sqrt(252), 0.0)
+    return {
+        'cagr': equity[-1] ** (1 / years) - 1,
+        'mdd': drawdown.min(axis=0),
+        'sharpe': sharpe,
+        'final': equity[-1],
+        'years': years,
+    }
+
+
+def backtest(qqq, asset_returns, params=None, cost=COST_PER_TRADE):
+    """단일 파라미터 백테스트 → (일별 결과 DataFrame, 성과 dict)"""
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    levels = gear_levels(qqq[['High']], qqq[['Low']], qqq[['Close']], params['period'], params['multiplier'],
+                         params['sma_window'], params['rsi_threshold']).to_numpy()
+    warmup = params['sma_window']
+    rets, switches = simulate_levels(levels[warmup:], asset_returns.to_numpy()[warmup:], cost)
+    index = qqq.index[warmup:]
+
+    history = pd.DataFrame({
+        'Leverage_Level': levels[warmup:, 0],
+        'Return': rets[:, 0],
+        'TotalValue': np.cumprod(1 + rets[:, 0]),
+        'QQQ': (1 + asset_returns[1].to_numpy()[warmup:]).cumprod(),
+    }, index=index)
+    metrics = {key: np.asarray(value).ravel()[0] for key, value in performance(rets, index).items()}
+    metrics['switches_per_year'] = switches[0] / metrics['years']
+    metrics['qqq_cagr'] = history['QQQ'].iloc[-1] ** (1 / metrics['years']) - 1
+    return history, metrics
+
+
+def _evaluate_trend_block(task):
+    """
+    (기간, 배수) 하나의 Supertrend 추세에 대해 SMA × RSI 기준 전체 조합을 평가 (프로세스 풀 작업 단위)
+    """
+    (period, multiplier, high, low, close, index, sma_grid, sma_windows,
+     macd_up, rsi, rsi_thresholds, asset_returns, warmup, cost) = task
+
+    frame = lambda a: pd.DataFrame(a[:, None], index=index)
+    trend = supertrend_panel(frame(high), frame(low), frame(close), period, multiplier)['Trend'].to_numpy()[:, 0]
+
+    # 방어(1): (날짜, SMA) / 강력 상승(3): (날짜, RSI) → 기어 (날짜, SMA, RSI)
+    defense = (trend == -1)[:, None] | (close[:, None] < sma_grid)
+    full_power = macd_up[:, None] & (rsi[:, None] > rsi_thresholds[None, :])
+    levels = np.where(defense[:, :, None], 1, np.where(full_power[:, None, :], 3, 2))
+    levels = levels[warmup:].reshape(len(index) - warmup, -1)
+
+    rets, switches = simulate_levels(levels, asset_returns[warmup:], cost)
+    stats = performance(rets, index[warmup:])
+
+    combos = list(itertools.product(sma_windows, rsi_thresholds))
+    return [
+        {'period': period, 'multiplier': multiplier, 'sma_window': sma, 'rsi_threshold': thr,
+         'cagr': stats['cagr'][k], 'mdd': stats['mdd'][k], 'sharpe': stats['sharpe'][k],
+         'switches_per_year': switches[k] / stats['years']}
+        for k, (sma, thr) in enumerate(combos)
+    ]
+
+
+def grid_search(qqq, asset_returns, grid=None, cost=COST_PER_TRADE, max_workers=None):
+    """
+    파라미터 조합 전체 평가
+    - MACD/RSI는 파라미터와 무관하므로 1회, SMA는 길이별 1회 계산해 격자로 공유
+    - Supertrend(기간, 배수) 조합마다 프로세스 작업 1개
+    - 모든 조합을 같은 구간(가장 긴 SMA 준비 이후)에서 평가해 비교 가능하게 함
+    :return: 조합별 성과 DataFrame (Sharpe 내림차순)
+    """
+    grid = {**PARAM_GRID, **(grid or {})}
+    close_s = qqq['Close']
+    macd, signal = macd_lines(close_s)
+    sma_windows = list(grid['sma_window'])
+    sma_grid = np.column_stack([close_s.rolling(window=w).mean().to_numpy() for w in sma_windows])
+    rsi_thresholds = np.asarray(grid['rsi_threshold'], dtype=float)
+    warmup = max(sma_windows)
+
+    shared = (qqq['High'].to_numpy(dtype=float), qqq['Low'].to_numpy(dtype=float), close_s.to_numpy(dtype=float),
+              qqq.index, sma_grid, sma_windows, (macd > signal).to_numpy(), rsi_values(close_s).to_numpy(),
+              rsi_thresholds, asset_returns.to_numpy(), warmup, cost)
+    tasks = [(period, multiplier) + shared for period, multiplier in itertools.product(grid['period'], grid['multiplier'])]
+
+    total = len(tasks) * len(sma_windows) * len(rsi_thresholds)
+    print(f"🔎 파라미터 탐색: {total:,}개 조합 (Supertrend {len(tasks)}개 × SMA {len(sma_windows)}개 × RSI {len(rsi_thresholds)}개)")
+    started = time.perf_counter()
+    rows = []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for block in executor.map(_evaluate_trend_block, tasks):
+            rows.extend(block)
+    print(f"✅ 탐색 완료: {time.perf_counter() - started:.1f}초")
+    return pd.DataFrame(rows).sort_values('sharpe', ascending=False).reset_index(drop=True)
+
+
+def print_metrics(metrics, params):
+    print("\n" + "=" * 60)
+    print(f"📜 나스닥 기어 전략 백테스트 ({metrics['years']:.1f}년)")
+    print(f"   파라미터: Supertrend({params['period']}, {params['multiplier']}) / SMA {params['sma_window']} / RSI > {params['rsi_threshold']}")
+    print("=" * 60)
+    print(f"  - CAGR            : {metrics['cagr'] * 100:.2f} %  (1배 자산 보유 {metrics['qqq_cagr'] * 100:.2f} %)")
+    print(f"  - 최대 낙폭 (MDD) : {metrics['mdd'] * 100:.2f} %")
+    print(f"  - 샤프 지수       : {metrics['sharpe']:.2f}")
+    print(f"  - 연간 기어 변경  : {metrics['switches_per_year']:.1f} 회")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    qqq, asset_returns = load_gear_data()
+    if len(sys.argv) > 1 and sys.argv[1] == 'grid':
+        results = grid_search(qqq, asset_returns)
+        pd.set_option('display.width', 200)
+        print("\n--- [Sharpe 상위 20개 조합] ---")
+        print(results.head(20).to_string(index=False, float_format=lambda x: f"{x:.4f}"))
+    else:
+        history, metrics = backtest(qqq, asset_returns)
+        print_metrics(metrics, DEFAULT_PARAMS)
@@ -1,12 +1,33 @@
 # dev/common.py
 
-import requests
 import config
 import pandas as pd
 import FinanceDataReader as fdr
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, Future
+import threading
 import time
 
+# --- 분석 취소 (통합 리포트 분석기 제한 시간 초과 시) ---
+# 분석기 스레드에 취소 이벤트를 걸어 두면, 그 스레드에서 시작한 병렬 수집이 요청마다 확인해
+# 남은 요청을 보내지 않고 Cancelled로 빠져나옵니다. (이미 보낸 요청 1건은 끝날 때까지 기다림)
+class Cancelled(Exception):
+    """분석기 제한 시간 초과로 수집이 취소됨"""
+
+_cancel_scope = threading.local()
+
+def set_cancel_event(event):
+    """현재 스레드에서 시작하는 병렬 수집이 확인할 취소 이벤트 (None이면 해제)"""
+    _cancel_scope.event = event
+
+def current_cancel_event():
+    return getattr(_cancel_scope, 'event', None)
+
+def check_cancelled(event=None):
+    """취소 이벤트가 설정됐으면 Cancelled 발생"""
+    event = event if event is not None else current_cancel_event()
+    if event is not None and event.is_set():
+        raise Cancelled("제한 시간 초과로 취소됨")
+
 def fetch_data_in_parallel(tickers, start_date, end_date):
     """
     여러 종목의 시세 데이터를 병렬로 수집합니다.
@@ -16,8 +37,12 @@ def fetch_data_in_parallel(tickers, start_date, end_date):
     :return: pd.DataFrame, 각 종목의 종가가 컬럼으로 구성됨
     """
     
+    cancel = current_cancel_event()
+
     # 개별 종목 데이터를 가져오는 내부 함수
     def _fetch_one(name, code):
+        if cancel is not None and cancel.is_set():
+            return None, None
         try:
             df = fdr.DataReader(code, start=start_date, end=end_date)
             time.sleep(0.2)  # API 과부하 방지용 딜레이
@@ -37,6 +62,10 @@ def fetch_data_in_parallel(tickers, start_date, end_date):
         
         # 진행 상황 표시
         for i, future in enumerate(as_completed(future_to_ticker)):
+            if cancel is not None and cancel.is_set():
+                # 대기 중인 요청은 보내지 않음 (실행 중인 요청만 끝나길 기다림)
+                executor.shutdown(wait=False, cancel_futures=True)
+                break
             name = future_to_ticker[future]
             
             # 진행률 출력 (콘솔에 한 줄로 업데이트)
@@ -50,6 +79,7 @@ def fetch_data_in_parallel(tickers, start_date, end_date):
             if series is not None and not series.empty:
                 df_list.append(series)
 
+    check_cancelled(cancel)
     print("\n✅ 병렬 데이터 수집 완료!")
     
     if not df_list:
@@ -59,10 +89,12 @@ def fetch_data_in_parallel(tickers, start_date, end_date):
     raw_data = pd.concat(df_list, axis=1).ffill().dropna(how='all')
     return raw_data
 
-def send_telegram(msg, chat_id=None, token=None, parse_mode='HTML'):
+def send_telegram(msg, chat_id=None, token=None, parse_mode='HTML', block=True):
     """
-    텔레그램 메시지를 전송합니다.
+    텔레그램 메시지를 전송합니다. (telegram_dispatcher: 세션 재사용, POST, 전송 한도/429 재시도, 4096자 분할)
     chat_id, token이 지정되지 않으면 config의 기본값을 사용합니다.
+    :param block: False면 전송 큐에 넣고 바로 반환 (분석을 계속하는 동안 백그라운드 전송)
+    :return: 전송 성공 여부, block=False면 성공 여부를 담을 Future
     """
     # 파라미터로 받은 값이 없으면 config 파일의 기본값을 사용
     effective_token = token if token else config.TELEGRAM_TOKEN
@@ -74,25 +106,14 @@ def send_telegram(msg, chat_id=None, token=None, parse_mode='HTML'):
         import re
         clean_msg = re.sub('<.*?>', '', msg)
         print(f"--- 메시지 미리보기 ---\n{clean_msg}\n--------------------")
-        return
+        if block:
+            return False
+        future = Future()
+        future.set_result(False)
+        return future
 
-    url = f"https://api.telegram.org/bot{effective_token}/sendMessage"
-    params = {
-        'chat_id': effective_chat_id,
-        'text': msg,
-        'parse_mode': parse_mode
-    }
-    
-    try: 
-        response = requests.get(url, params=params)
-        response.raise_for_status() # 200번대 코드가 아닐 경우 예외 발생
-        print(f"✅ 텔레그램 전송 완료 (Chat ID: {effective_chat_id})")
-    except requests.exceptions.RequestException as e: 
-        print(f"❌ 텔레그램 전송 실패: {e}")
-        # 실패 시 응답 내용 출력
-        if e.response:
-            print(f"    - Status Code: {e.response.status_code}")
-            print(f"    - Response: {e.response.text}")
+    from telegram_dispatcher import get_dispatcher
+    return get_dispatcher(effective_token).send(msg, effective_chat_id, parse_mode=parse_mode, block=block)
 
 if __name__ == '__main__':
     # 간단한 테스트 코드
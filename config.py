@@ -12,6 +12,14 @@ CHAT_ID = os.environ.get('CHAT_ID')
 # mosig_bot.py 에서만 사용하던 ID, 필요시 분리 또는 통합
 CHAT_ID_1P = os.environ.get('CHAT_ID_1P', CHAT_ID) 
 
+# 텔레그램 발송기 (telegram_dispatcher.py)
+# TELEGRAM_API_BASE를 로컬 가짜 서버 주소로 바꾸면 실제 전송 없이 테스트 가능
+TELEGRAM_API_BASE = os.environ.get('TELEGRAM_API_BASE', 'https://api.telegram.org')
+TELEGRAM_TIMEOUT = 10          # 요청 타임아웃(초)
+TELEGRAM_MAX_RETRIES = 5       # 429/5xx/연결 오류 재시도 횟수
+TELEGRAM_CHAT_INTERVAL = 1.0   # 같은 채팅방 연속 전송 최소 간격(초)
+TELEGRAM_FLUSH_TIMEOUT = 120   # 종료 시 큐에 남은 메시지 전송 대기 한도(초)
+
 # 리밸런싱 기간 (매월 1일 ~ 7일 사이)
 REBALANCE_PERIOD_START = 1
 REBALANCE_PERIOD_END = 7
@@ -86,9 +94,56 @@ MOSIG_PICK_COUNT = 10     # 텔레그램으로 보낼 종목 수
 MOSIG_STRATEGY = 'value'  # 우선순위: 'value'(모멘텀점수), 'slope'(기울기), 'marcap'(시총)
 MOSIG_MAX_WORKERS = 3     # 모시그 전용 스레드 수 (차단 방지)
 MOSIG_REQUEST_DELAY = 0.1 # 요청 간 딜레이(초)
+MOSIG_SCAN_MODE = 'top'   # 'top': 시총 상위 종목만 / 'full': KOSPI+KOSDAQ 전 종목 (거래대금 순, 시간 예산 내)
+MOSIG_TIME_BUDGET_SEC = 600  # 'full' 모드 전체 스캔 시간 예산(초), 초과 시 남은 개별 수집 생략
+MOSIG_CHUNK_SIZE = 200       # 'full' 모드 청크 크기 (수집/계산 단위)
+MOSIG_PANEL_ROWS = 45        # 'full' 모드 패널에 보관할 최근 거래일 수 (모멘텀/ATR/거래량 계산에 30일 이상 필요)
+MOSIG_PANEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'mosig_panel.pkl')
+
+# 미국 모시그 (mosig_us, 엔진/지표는 mosig_engine.py 공용)
+MOSIG_US_TOP_N = 500             # S&P 500 전체 스캔
+MOSIG_US_PICK_COUNT = 5          # 메시지에 표시할 상위 종목 수
+MOSIG_US_MAX_WORKERS = 4         # 야후 파이낸스 차단 방지를 위해 스레드 4개로 제한
+MOSIG_US_REQUEST_DELAY = (0.2, 0.5)  # 요청 전 랜덤 대기 범위(초)
+# 미국 모시그 알림 채팅방 (기본: 미설정 → 콘솔 미리보기만, 예전처럼 전송하지 않음. 보내려면 환경 변수로 지정)
+MOSIG_US_CHAT_ID = os.environ.get('MOSIG_US_CHAT_ID')
+MOSIG_FRAME_CACHE_SIZE = 2000    # 모시그 엔진 프로세스 내 일봉 캐시 최대 종목 수 (시장 거래일이 바뀌면 비움)
 
 # =========================================================
 # [성능 최적화 설정]
 # =========================================================
 MAX_WORKERS = 5 # 병렬 데이터 수집 시 사용할 최대 작업자(스레드) 수
 
+# 통합 리포트 분석기별 제한 시간(초)
+# 초과하면 해당 섹션은 오류로 표시하고 나머지 결과로 리포트를 작성
+REPORT_ANALYZER_TIMEOUTS = {
+    'etf': 900,
+    'stock': 900,
+    'us': 1200,
+    'mosig': 900,
+}
+# 제한 시간을 넘긴 분석기에 취소를 요청한 뒤 실제로 멈추기를 기다리는 시간(초)
+# 멈출 때까지 같은 소스(KRX)를 쓰는 후속 분석기는 시작하지 않고, 이 시간이 지나면 후속 분석기는 건너뜀
+REPORT_CANCEL_GRACE = 60
+
+
+# 모멘텀 스코어 증분 계산 상태 (score_state.py)
+# 유니버스별 상태를 저장해 두고 새 거래일만 반영. 마지막 갱신 후 이 일수가 지나면 전체 재계산
+SCORE_STATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+SCORE_STATE_MAX_GAP_DAYS = 10
+MOMENTUM_SCORE_LOG_DAYS = 60 # ETF/개별주/미국 봇 스코어 상태에 남기는 최근 점수 기록 (대시보드 점수 추이)
+
+# 통합 리포트 체크포인트 (run_checkpoint.py)
+# 같은 run ID로 재실행하면 완료된 단계(종목 리스트/시세 수집/분석/메시지/전송)는 건너뜀
+RUN_CHECKPOINT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'runs')
+RUN_CHECKPOINT_KEEP = 10 # 보관할 최근 실행 수
+
+# 종목코드 ↔ 종목명 인덱스 (ticker_index.py)
+# 통합 리포트가 매일 KRX 전종목 목록 1회 호출로 갱신, 대시보드는 이 파일만 읽음
+TICKER_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'ticker_index.json')
+
+# 모멘텀 대시보드 스냅샷 (momentum_snapshot.py)
+# 통합 리포트가 매일 ETF/개별주/미국주식 결과를 발행하고 두 대시보드가 읽음
+MOMENTUM_SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'momentum_snapshot.pkl')
+MOMENTUM_SNAPSHOT_POLL_SEC = 60 # 대시보드가 스냅샷 파일 변경을 확인하는 주기
+# 스냅샷은 대시보드 호스트의 로컬 파일 - Actions 실행분은 워크플로가 저장소에 커밋 (momentum_snapshot.py 참고)
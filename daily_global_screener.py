@@ -10,6 +10,9 @@ import os
 import pickle
 import time
 import random
+import sys
+
+from score_state import sync_score_state
 
 # 경고 메시지 무시
 warnings.filterwarnings('ignore', category=FutureWarning)
@@ -36,6 +39,14 @@ PARAMS = {
     }
 }
 
+# 가속 섹터 조건: 당월 순위 3~5위 AND 전월 대비 2계단 이상 상승 → 그중 최상위 섹터의 대장주
+ACCEL_RANK_RANGE = (3, 5)
+ACCEL_MIN_RANK_GAIN = 2
+
+# 가속 섹터 백테스트 (backtest_sector_acceleration)
+BACKTEST_START = '2015-01-01'
+BACKTEST_FEE = 0.003  # 대장주 교체 시 왕복 거래비용 (수수료+세금+슬리피지)
+
 # =========================================================
 # 2. 백테스트 스코어링 로직 이식 (signals._compute_scores)
 # =========================================================
@@ -68,6 +79,111 @@ def compute_scores(price_data, strategy_name):
         
     return scores
 
+def compute_scores_at(price_data, strategy_name, dates):
+    """
+    compute_scores와 같은 점수를 지정한 기준일에서만 계산합니다. (전체 rolling 패널을 만들지 않고 필요한 구간만 직접 슬라이싱)
+    기준일이 거래일이 아니면 그 이전 마지막 거래일 값을 씁니다.
+    * price_data는 fetch_prices 결과처럼 ffill된 종가 패널을 가정합니다 (pct_change의 결측 보간과 같은 결과).
+    :param dates: 기준일 목록
+    :return: DataFrame (행: 실제 사용된 거래일, 열: 종목)
+    """
+    params = PARAMS[strategy_name].get('PASSIVE', {})
+    index = price_data.index
+    prices = price_data.to_numpy(dtype=float)
+    pos = index.searchsorted(pd.DatetimeIndex(dates), side='right') - 1
+    if (pos < 0).any():
+        raise ValueError("가격 데이터 시작일 이전의 기준일이 있습니다.")
+
+    def _ret(lag):
+        # 기준일 종가 / lag거래일 전 종가 - 1 (이력이 부족하면 NaN)
+        base = prices[np.maximum(pos - lag, 0)]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ret = prices[pos] / base - 1
+        ret[pos < lag] = np.nan
+        return ret
+
+    if 'MOMENTUM_WEIGHTS' in params:
+        # 가중 모멘텀 방식 (미국 시장)
+        w1, w2, w3 = params['MOMENTUM_WEIGHTS']
+        scores = np.nan_to_num(_ret(20), nan=0.0) * w1 + \
+                 np.nan_to_num(_ret(60), nan=0.0) * w2 + \
+                 np.nan_to_num(_ret(120), nan=0.0) * w3
+    else:
+        # 변동성 조절 방식 (한국 시장): 기준일까지 window개 일간 수익률의 표준편차 (표본, ddof=1)
+        window = params['VOLATILITY_WINDOW']
+        rows = pos[:, None] + np.arange(-window, 1)            # 기준일별 (window + 1)개 종가 행
+        block = prices[np.maximum(rows, 0)]                      # (기준일, window + 1, 종목)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            daily_rets = block[:, 1:] / block[:, :-1] - 1
+            vol = daily_rets.std(axis=1, ddof=1)
+        vol[pos < window] = np.nan
+
+        epsilon = 1e-6
+        with np.errstate(divide='ignore', invalid='ignore'):
+            score_3m = _ret(params['MOMENTUM_SHORT']) / (vol + epsilon)
+            score_6m = _ret(params['MOMENTUM_LONG']) / (vol + epsilon)
+        scores = np.nan_to_num(score_3m, nan=0.0) * 0.5 + np.nan_to_num(score_6m, nan=0.0) * 0.5
+
+    return pd.DataFrame(scores, index=index[pos], columns=price_data.columns)
+
+def score_state_options(strategy_name):
+    """
+    compute_scores와 같은 점수를 증분 상태(score_state)로 계산하기 위한 설정.
+    전월 1일 기준 점수가 필요하므로 최근 70거래일 점수를 함께 기록합니다.
+    """
+    params = PARAMS[strategy_name].get('PASSIVE', {})
+    if 'MOMENTUM_WEIGHTS' in params:
+        spec = ('weighted', params['MOMENTUM_WEIGHTS'])
+        return {'log_size': 70, 'log_spec': spec}
+    spec = ('vol_adjusted', (params['MOMENTUM_SHORT'], params['MOMENTUM_LONG']))
+    return {'vol_window': params['VOLATILITY_WINDOW'], 'log_size': 70, 'log_spec': spec}
+
+def sector_score_matrix(scores, sector_map, marcap_map, dates=None):
+    """
+    날짜 × 섹터 시가총액 가중 점수(Σ w·s / Σ w, 섹터 시총 합이 0이면 단순 평균)와 섹터 순위를 한 번에 계산합니다.
+    섹터를 정수 코드로 바꾸고 (날짜, 섹터) 칸별 합계를 np.bincount 한 번씩으로 구하므로 날짜 수와 무관하게 groupby가 없습니다.
+    :param scores: 날짜 × 종목 점수 DataFrame
+    :param dates: 계산할 날짜 목록 (기본: 전체 날짜 → 섹터 순위 이력)
+    :return: (섹터 점수, 섹터 순위) DataFrame (행: 날짜, 열: 섹터명 오름차순)
+             순위는 1위 = 최고 점수, 동점이면 섹터명 순 (rank(method='first')와 동일), 그날 점수가 있는 종목이 없는 섹터는 NaN
+    """
+    if dates is not None:
+        scores = scores.loc[dates]
+    sectors = pd.Series(sector_map, dtype=object).reindex(scores.columns)
+    weights = pd.Series(marcap_map, dtype=float).reindex(scores.columns)
+    members = (sectors.notna() & weights.notna()).to_numpy()
+
+    sector_codes, sector_names = pd.factorize(sectors[members], sort=True)
+    values = scores.loc[:, members].to_numpy(dtype=float)
+    weights = np.broadcast_to(weights[members].to_numpy(), values.shape)
+    n_dates, n_sectors = len(scores.index), len(sector_names)
+
+    # (날짜, 섹터) 칸 번호 = 날짜 순번 × 섹터 수 + 섹터 코드, 점수가 없는(NaN) 칸은 제외
+    valid = ~np.isnan(values)
+    cell = (np.arange(n_dates)[:, None] * n_sectors + sector_codes[None, :])[valid]
+
+    def _cell_sum(x):
+        return np.bincount(cell, weights=x[valid], minlength=n_dates * n_sectors).reshape(n_dates, n_sectors)
+
+    sum_ws = _cell_sum(values * weights)
+    sum_w = _cell_sum(weights)
+    sum_s = _cell_sum(values)
+    count = np.bincount(cell, minlength=n_dates * n_sectors).reshape(n_dates, n_sectors)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        matrix = np.where(sum_w != 0, sum_ws / sum_w, sum_s / count)
+    matrix[count == 0] = np.nan
+
+    # 순위: 행마다 점수 내림차순 안정 정렬 (NaN은 맨 뒤)
+    order = np.argsort(np.where(np.isnan(matrix), np.inf, -matrix), axis=1, kind='stable')
+    ranks = np.empty_like(matrix)
+    np.put_along_axis(ranks, order, np.arange(1, n_sectors + 1, dtype=float)[None, :].repeat(n_dates, axis=0), axis=1)
+    ranks[np.isnan(matrix)] = np.nan
+
+    sector_scores = pd.DataFrame(matrix, index=scores.index, columns=sector_names)
+    sector_ranks = pd.DataFrame(ranks, index=scores.index, columns=sector_names)
+    return sector_scores, sector_ranks
+
 def get_last_month_first_day(today):
     first_day_of_current_month = today.replace(day=1)
     last_day_of_last_month = first_day_of_current_month - timedelta(days=1)
@@ -75,13 +191,14 @@ def get_last_month_first_day(today):
 
 def fetch_price(args):
     """API 차단 방지용 지연 및 지수 백오프가 적용된 가격 수집기"""
-    name, code, start_date, retries = args
+    name, code, start_date, retries = args[:4]
+    min_rows = args[4] if len(args) > 4 else 121 # 기본: 120일(가장 긴 모멘텀 기간) 초과 데이터 필요
     time.sleep(random.uniform(0.01, 0.5)) 
     
     for attempt in range(retries):
         try:
             df = fdr.DataReader(code, start=start_date)
-            if not df.empty and len(df) > 120: # 120일(가장 긴 모멘텀 기간) 이상의 데이터 필요
+            if not df.empty and len(df) >= min_rows:
                 return df['Close'].rename(name)
             break
         except Exception:
@@ -91,23 +208,33 @@ def fetch_price(args):
                 pass 
     return None
 
-# =========================================================
-# 3. 메인 분석 엔진
-# =========================================================
-def analyze_market(strategy_name):
-    cfg = PARAMS[strategy_name]
-    print("\n" + "="*80)
-    print(f"🚀 [{cfg['NAME']}] 시장 분석 시작")
-    print("="*80)
+def fetch_prices(universe, start_date, end_date=None):
+    """score_state용 수집기: fetch_price를 병렬 실행해 종가 DataFrame 반환 (신규 거래일 증분 수집에도 사용)"""
+    all_price_data = []
+    fetch_args = [(name, code, start_date, 3, 1) for name, code in universe.items()]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
+        futures = {executor.submit(fetch_price, arg): arg for arg in fetch_args}
+        for future in tqdm(concurrent.futures.as_completed(futures), total=len(fetch_args), desc="데이터 다운로드", unit="종목"):
+            result = future.result()
+            if result is not None:
+                all_price_data.append(result)
 
+    if not all_price_data:
+        return pd.DataFrame()
+    price_data = pd.concat(all_price_data, axis=1).ffill()
+    return price_data.loc[:end_date] if end_date else price_data
+
+def load_listing(strategy_name):
+    """
+    분석 대상 종목과 섹터/시가총액 정보 (당일 캐시 재사용)
+    :return: (universe {'이름': '코드'}, sector_map {'이름': '섹터'}, marcap_map {'이름': 시가총액})
+    """
     os.makedirs('data', exist_ok=True)
-    screener_cache_path = f"data/screener_cache_{strategy_name}.pkl"
     listing_cache_path = f"data/listing_cache_{strategy_name}.pkl"
     
-    price_data = None
     universe, sector_map, marcap_map = {}, {}, {}
 
-    # 1. 상장 종목 및 섹터 정보 로딩
     if os.path.exists(listing_cache_path):
         with open(listing_cache_path, 'rb') as f:
             listing_cache = pickle.load(f)
@@ -143,77 +270,58 @@ def analyze_market(strategy_name):
             pickle.dump({'date': datetime.now().date(), 'universe': universe, 'sector_map': sector_map, 'marcap_map': marcap_map}, f)
         print("✅ 종목/섹터 정보 로딩 완료!")
 
-    # 2. 가격 데이터 병렬 수집 (Max Workers: 4 제한으로 API 차단 회피)
-    if os.path.exists(screener_cache_path):
-        with open(screener_cache_path, 'rb') as f:
-            screener_cache = pickle.load(f)
-            if screener_cache.get('date') == datetime.now().date():
-                print("📦 당일 캐시된 가격 데이터 로드 중...")
-                price_data = screener_cache['price_data']
-    
-    if price_data is None:
-        print("⏳ 종가 데이터 수집 중 (API 차단 방지 딜레이 적용)...")
-        # 계산에 필요한 최대 기간(120일)에 여유를 더해 약 200일 전부터 수집
-        start_date = (datetime.now() - timedelta(days=200)).strftime('%Y-%m-%d')
-        
-        all_price_data = []
-        fetch_args = [(name, code, start_date, 3) for name, code in universe.items()]
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-            futures = {executor.submit(fetch_price, arg): arg for arg in fetch_args}
-            for future in tqdm(concurrent.futures.as_completed(futures), total=len(fetch_args), desc="데이터 다운로드", unit="종목"):
-                result = future.result()
-                if result is not None:
-                    all_price_data.append(result)
-        
-        if not all_price_data:
-            print("❌ 데이터 수집 실패. 네트워크 상태를 확인하세요.")
-            return
+    return universe, sector_map, marcap_map
 
-        price_data = pd.concat(all_price_data, axis=1).ffill()
-        with open(screener_cache_path, 'wb') as f:
-            pickle.dump({'date': datetime.now().date(), 'price_data': price_data}, f)
+# =========================================================
+# 3. 메인 분석 엔진
+# =========================================================
+def analyze_market(strategy_name):
+    cfg = PARAMS[strategy_name]
+    print("\n" + "="*80)
+    print(f"🚀 [{cfg['NAME']}] 시장 분석 시작")
+    print("="*80)
+
+    # 1. 상장 종목 및 섹터 정보 로딩
+    universe, sector_map, marcap_map = load_listing(strategy_name)
 
-    # 3. 전략별 스코어 계산 적용
+    # 2. 스코어 상태 갱신 (저장된 상태에 신규 거래일만 반영, 당일 갱신분이 있으면 재사용)
+    # 계산에 필요한 최대 기간(120일)에 여유를 더해 최초 생성 시 약 200일 전부터 수집
+    print("⏳ 종가 데이터 수집 및 스코어 상태 갱신 중 (API 차단 방지 딜레이 적용)...")
+    score_state = sync_score_state(
+        f"screener_{strategy_name}", universe, fetcher=fetch_prices,
+        lookback_days=200, reuse_same_day=True, **score_state_options(strategy_name)
+    )
+    if score_state is None:
+        print("❌ 데이터 수집 실패. 네트워크 상태를 확인하세요.")
+        return
+
+    # 3. 전략별 스코어 (120일 초과 데이터가 있는 종목만)
+    # 당일 점수는 보관 중인 종가로 기준일 시점 계산 (compute_scores_at, 백테스트와 같은 경로)
+    # 전월 1일 점수는 링버퍼(121거래일)로 계산할 수 없어 스코어 상태의 점수 기록을 쓰고, 당일 값으로 두 경로가 같은지 확인
     print("⏳ 맞춤형 모멘텀 스코어 연산 중...")
-    scores = compute_scores(price_data, strategy_name)
-    
-    sector_df = pd.DataFrame.from_dict(sector_map, orient='index', columns=['Sector'])
-    marcap_df = pd.DataFrame.from_dict(marcap_map, orient='index', columns=['Marcap'])
-    
-    today = price_data.index[-1]
+    valid_counts = score_state.valid_count()
+    valid_names = valid_counts[valid_counts > 120].index
+    today = pd.Timestamp(score_state.last_date)
+    today_scores = compute_scores_at(score_state.price_frame()[valid_names], strategy_name, [today]).iloc[0]
+
+    scores = score_state.score_history()[valid_names]
+    logged = scores.loc[today_scores.name]
+    mismatch = ~np.isclose(today_scores, logged, rtol=1e-6, atol=1e-9, equal_nan=True)
+    if mismatch.any():
+        print(f"⚠️ 점수 기록과 기준일 계산이 다른 종목 {mismatch.sum()}개 (최대 차이 {np.nanmax(np.abs(today_scores - logged)):.3g}) → 기준일 계산값 사용")
+    scores.loc[today_scores.name] = today_scores
     last_month_start = get_last_month_first_day(today)
     
     today_scores_date = scores.index[scores.index <= today][-1]
     last_month_scores_date = scores.index[scores.index <= last_month_start][-1]
 
-# 시가총액 가중 평균 적용 함수
-    def calc_weighted_score(df):
-        if df['Marcap'].sum() == 0: 
-            return df['score'].mean()
-        return np.average(df['score'], weights=df['Marcap'])
-
-    # --- 여기서부터 아래 부분으로 교체 ---
-
-    # 당월 랭킹 계산
-    merged_today = pd.concat([scores.loc[today_scores_date].rename('score'), sector_df, marcap_df], axis=1).dropna()
-    sector_scores_today = merged_today.groupby('Sector').apply(calc_weighted_score)
-    
-    # [핵심 수정 사항] DataFrame으로 반환될 경우 1차원 Series로 강제 압축
-    if isinstance(sector_scores_today, pd.DataFrame):
-        sector_scores_today = sector_scores_today.squeeze()
-        
-    current_ranks = sector_scores_today.rank(ascending=False, method='first')
-    
-    # 전월 랭킹 계산
-    merged_last_month = pd.concat([scores.loc[last_month_scores_date].rename('score'), sector_df, marcap_df], axis=1).dropna()
-    sector_scores_last_month = merged_last_month.groupby('Sector').apply(calc_weighted_score)
-    
-    # [핵심 수정 사항] DataFrame으로 반환될 경우 1차원 Series로 강제 압축
-    if isinstance(sector_scores_last_month, pd.DataFrame):
-        sector_scores_last_month = sector_scores_last_month.squeeze()
-        
-    last_ranks = sector_scores_last_month.rank(ascending=False, method='first')
+    # 당월/전월 섹터 점수·순위 (시가총액 가중 평균, 두 날짜를 한 번에 계산)
+    sector_scores, sector_ranks = sector_score_matrix(
+        scores, sector_map, marcap_map, dates=sorted({last_month_scores_date, today_scores_date})
+    )
+    sector_scores_today = sector_scores.loc[today_scores_date].dropna()
+    current_ranks = sector_ranks.loc[today_scores_date].dropna()
+    last_ranks = sector_ranks.loc[last_month_scores_date].dropna()
     
     print("\n--- [당월 전체 섹터 순위 Top 10] ---")
     top10 = sector_scores_today.nlargest(10).reset_index()
@@ -222,12 +330,12 @@ def analyze_market(strategy_name):
 
     # 4. 가속 섹터 로직 판별
     accelerating_sectors = []
-    candidate_sectors = current_ranks[(current_ranks >= 3) & (current_ranks <= 5)].index
+    candidate_sectors = current_ranks[(current_ranks >= ACCEL_RANK_RANGE[0]) & (current_ranks <= ACCEL_RANK_RANGE[1])].index
     
     for sector in candidate_sectors:
         if sector in last_ranks.index:
             rank_change = last_ranks[sector] - current_ranks[sector]
-            if rank_change >= 2:
+            if rank_change >= ACCEL_MIN_RANK_GAIN:
                 accelerating_sectors.append({
                     'sector': sector, 
                     'rank': int(current_ranks[sector]), 
@@ -241,15 +349,165 @@ def analyze_market(strategy_name):
         prev_rank = best_accelerating_sector['prev_rank']
         current_rank = best_accelerating_sector['rank']
         
-        stocks_in_sector = merged_today[merged_today['Sector'] == sector_name]
-        top_stock = stocks_in_sector['score'].nlargest(1).index[0]
+        stocks_in_sector = [name for name in scores.columns if sector_map.get(name) == sector_name and name in marcap_map]
+        top_stock = scores.loc[today_scores_date, stocks_in_sector].nlargest(1).index[0]
         
         print(f"> 📈 상승 가속 섹터: [{sector_name}] (전월 {prev_rank}위 -> 당월 {current_rank}위)")
         print(f"> 🥇 해당 섹터 대장주: [{top_stock}]")
     else:
         print("> 💤 현재 가속 모멘텀 조건에 부합하는 섹터가 없습니다.")
 
+# =========================================================
+# 4. 가속 섹터 백테스트
+# =========================================================
+def load_backtest_prices(strategy_name, universe, start_date):
+    """
+    백테스트용 장기 종가 패널 (data/screener_backtest_<전략>.pkl에 저장, 다음 실행부터는 신규 거래일만 수집)
+    """
+    path = f"data/screener_backtest_{strategy_name}.pkl"
+    cached = None
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            cached = pickle.load(f)
+        if cached['start'] > start_date or set(universe) - set(cached['prices'].columns) - cached['missing']:
+            cached = None  # 기간이 짧거나 새 종목이 있으면 전체 재수집
+
+    if cached is None:
+        print(f"⏳ 백테스트용 종가 수집 ({start_date}~, {len(universe)}개 종목)...")
+        prices = fetch_prices(universe, start_date)
+    elif cached['date'] == datetime.now().date():
+        print("📦 저장된 백테스트 종가 패널 재사용")
+        return cached['prices']
+    else:
+        # 마지막 저장일 며칠 전부터 다시 받아 겹치는 구간은 새 값으로 덮어쓰기
+        since = (cached['prices'].index[-1] - timedelta(days=10)).strftime('%Y-%m-%d')
+        print(f"⏳ 백테스트 종가 패널 증분 수집 ({since}~)...")
+        recent = fetch_prices(universe, since)
+        prices = recent.combine_first(cached['prices']).ffill()
+
+    os.makedirs('data', exist_ok=True)
+    with open(path, 'wb') as f:
+        pickle.dump({'date': datetime.now().date(), 'start': start_date, 'prices': prices,
+                     'missing': set(universe) - set(prices.columns)}, f)
+    return prices
+
+def backtest_sector_acceleration(strategy_name, prices, sector_map, marcap_map, fee=BACKTEST_FEE):
+    """
+    가속 섹터 규칙의 월별 백테스트 (반복문 없이 전 기간을 한 번에 계산)
+    매월 첫 거래일마다 analyze_market과 같은 방식으로
+      당월 섹터 순위(해당일) vs 전월 섹터 순위(전월 1일 이전 마지막 거래일) → 가속 섹터 → 섹터 내 점수 1위(대장주)
+    를 고르고, 다음 거래일 종가에 진입해 다음 달 같은 시점까지 보유합니다. 조건에 맞는 섹터가 없는 달은 현금.
+    * 섹터/시가총액은 현재 상장 정보 기준이므로 생존 편향이 있습니다.
+    :param prices: 날짜 × 종목 종가 (열 이름 = sector_map 키)
+    :return: {'picks': 월별 선택 DataFrame, 'equity': 월말 누적 수익 Series, 'benchmark': 동일가중 유니버스, 'metrics': dict}
+    """
+    dates = prices.index
+
+    # 월별 평가일 (매월 첫 거래일)과 비교 기준일 (전월 1일 이전 마지막 거래일)
+    month_first = dates.to_series().groupby(dates.to_period('M')).first()
+    prev_anchor = (month_first.dt.to_period('M') - 1).dt.to_timestamp()
+    prev_pos = dates.searchsorted(prev_anchor.to_numpy(), side='right') - 1
+    keep = prev_pos >= 0
+    eval_dates, prev_dates = month_first.to_numpy()[keep], dates[prev_pos[keep]]
+
+    # 점수: 필요한 날짜에서만 계산, 해당 날짜까지 120일 초과 이력이 있는 종목만
+    # (analyze_market의 valid_count > 120과 동일, 시점 기준 / ffill된 패널이라 첫 거래 이후 결측 없음)
+    score_dates = pd.DatetimeIndex(np.union1d(eval_dates, prev_dates))
+    scores = compute_scores_at(prices, strategy_name, score_dates)
+    first_valid = np.where(prices.notna().any().to_numpy(), prices.notna().to_numpy().argmax(axis=0), len(dates))
+    history = dates.searchsorted(score_dates)[:, None] - first_valid[None, :] + 1
+    scores = scores.where(history > 120)
+
+    sector_scores, sector_ranks = sector_score_matrix(scores, sector_map, marcap_map)
+    current = sector_ranks.loc[eval_dates].to_numpy()
+    previous = sector_ranks.loc[prev_dates].to_numpy()
+
+    # 가속 섹터: 당월 순위 범위 안 + 전월 대비 상승폭 조건 → 그중 당월 순위가 가장 높은 섹터
+    with np.errstate(invalid='ignore'):
+        accel = (current >= ACCEL_RANK_RANGE[0]) & (current <= ACCEL_RANK_RANGE[1]) & \
+                (previous - current >= ACCEL_MIN_RANK_GAIN)
+    has_pick = accel.any(axis=1)
+    picked_sector = np.where(accel, current, np.inf).argmin(axis=1)
+
+    # 대장주: 선택 섹터 소속 종목 중 평가일 점수 1위
+    names = scores.columns
+    member_sector = pd.Series(sector_map, dtype=object).reindex(names)
+    member_sector[~names.isin(list(marcap_map))] = np.nan
+    sector_index = {sector: k for k, sector in enumerate(sector_ranks.columns)}
+    member_code = member_sector.map(sector_index).fillna(-1).to_numpy()
+    eval_scores = scores.loc[eval_dates].to_numpy()
+    in_sector = member_code[None, :] == picked_sector[:, None]
+    masked = np.where(in_sector & ~np.isnan(eval_scores), eval_scores, -np.inf)
+    leader = masked.argmax(axis=1)
+    has_pick &= np.isfinite(masked.max(axis=1))
+
+    # 보유 수익: 평가 다음 거래일 종가 진입 → 다음 평가 다음 거래일 종가 청산 (마지막 달은 최근 종가까지)
+    close = prices.to_numpy()
+    entry_pos = np.minimum(dates.searchsorted(eval_dates) + 1, len(dates) - 1)
+    exit_pos = np.append(entry_pos[1:], len(dates) - 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        leader_ret = close[exit_pos, leader] / close[entry_pos, leader] - 1
+        universe_ret = np.nanmean(close[exit_pos] / close[entry_pos] - 1, axis=1)
+    leader_ret = np.where(has_pick, np.nan_to_num(leader_ret), 0.0)
+
+    # 대장주가 바뀌거나 현금에서 진입할 때 왕복 비용
+    held = np.where(has_pick, leader, -1)
+    switched = has_pick & (held != np.append(-1, held[:-1]))
+    monthly = leader_ret - np.where(switched, fee, 0.0)
+
+    period_end = dates[exit_pos]
+    equity = pd.Series(np.cumprod(1 + monthly), index=period_end)
+    benchmark = pd.Series(np.cumprod(1 + np.nan_to_num(universe_ret)), index=period_end)
+    picks = pd.DataFrame({
+        'date': eval_dates,
+        'sector': np.where(has_pick, np.asarray(sector_ranks.columns, dtype=object)[picked_sector], None),
+        'rank': np.where(has_pick, current[np.arange(len(current)), picked_sector], np.nan),
+        'prev_rank': np.where(has_pick, previous[np.arange(len(previous)), picked_sector], np.nan),
+        'leader': np.where(has_pick, np.asarray(names, dtype=object)[leader], None),
+        'return': np.where(has_pick, monthly, np.nan),
+    })
+
+    years = max((period_end[-1] - pd.Timestamp(eval_dates[0])).days / 365.25, 1e-9)
+    invested = picks['return'].dropna()
+    metrics = {
+        'CAGR': equity.iloc[-1] ** (1 / years) - 1,
+        'MDD': (equity / equity.cummax() - 1).min(),
+        'Benchmark CAGR': benchmark.iloc[-1] ** (1 / years) - 1,
+        'Invested Months': len(invested),
+        'Win Rate': (invested > 0).mean() if len(invested) else np.nan,
+    }
+    return {'picks': picks, 'equity': equity, 'benchmark': benchmark, 'metrics': metrics}
+
+def run_backtest(strategy_name, start_date=BACKTEST_START):
+    cfg = PARAMS[strategy_name]
+    print("\n" + "="*80)
+    print(f"🧪 [{cfg['NAME']}] 가속 섹터 백테스트 ({start_date}~)")
+    print("="*80)
+
+    universe, sector_map, marcap_map = load_listing(strategy_name)
+    prices = load_backtest_prices(strategy_name, universe, start_date)
+    if prices.empty:
+        print("❌ 데이터 수집 실패. 네트워크 상태를 확인하세요.")
+        return None
+
+    started = time.perf_counter()
+    result = backtest_sector_acceleration(strategy_name, prices, sector_map, marcap_map)
+    print(f"⏱️ 계산 {time.perf_counter() - started:.2f}초 ({prices.shape[0]}일 × {prices.shape[1]}종목)")
+
+    print("\n--- [최근 12개월 선택 내역] ---")
+    print(result['picks'].tail(12).to_string(index=False))
+    print("\n--- [성과 요약] ---")
+    for key, value in result['metrics'].items():
+        print(f"{key:<16}: {value:.2%}" if isinstance(value, float) else f"{key:<16}: {value}")
+    return result
+
 if __name__ == "__main__":
+    # 사용법: python daily_global_screener.py [--backtest [시작일]]
     markets_to_analyze = ['STOCK_KR', 'STOCK_US']
-    for market in markets_to_analyze:
-        analyze_market(market)
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == '--backtest':
+        start = sys.argv[2] if len(sys.argv) > 2 else BACKTEST_START
+        for market in markets_to_analyze:
+            run_backtest(market, start)
+    else:
+        for market in markets_to_analyze:
+            analyze_market(market)
\ No newline at end of file
@@ -2,12 +2,9 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta, timezone
 import FinanceDataReader as fdr
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
 from streamlit_extras.stylable_container import stylable_container
 import platform
 import time
-import pickle
 import os
 import logging
 
@@ -23,14 +20,27 @@ import sys
 sys.path.append(os.path.dirname(os.path.abspath(os.path.dirname(__file__))))
 from common import fetch_data_in_parallel
 import config as cfg
+import momentum_snapshot
+import dashboard_store
 
 # ----------------------------------------------------------------------
 # [설정] 파일 저장 경로 및 스타일
 # ----------------------------------------------------------------------
-DATA_FILE = "dashboard_data.pkl"  # 데이터를 저장할 파일명
+DATA_FILE = "dashboard_data.db"  # 장중 수동 갱신 데이터 저장소 (dashboard_store.py, 섹션별 저장)
+LEGACY_DATA_FILE = "dashboard_data.pkl"  # 예전 저장 파일 (처음 한 번 DB로 가져옴)
+RANKINGS_LIMIT = 50  # 카드 "전체 순위 보기" 표시 개수 (시작 시 이만큼만 읽음)
 
 # [수정됨] 폰트 설정 (디버깅 제거, 기능 위주)
+# matplotlib은 import 비용이 커서 차트를 처음 그릴 때 로드/설정합니다.
+_font_ready = False
+
 def init_font():
+    global _font_ready
+    if _font_ready:
+        return
+    import matplotlib.pyplot as plt
+    import matplotlib.font_manager as fm
+
     font_filename = "NanumGothic.ttf"
     font_path = os.path.join(os.path.dirname(__file__), font_filename)
     
@@ -49,9 +59,8 @@ def init_font():
             plt.rc('font', family='Malgun Gothic')
             
     plt.rcParams['axes.unicode_minus'] = False
-
-init_font()
-plt.style.use('ggplot')
+    plt.style.use('ggplot')
+    _font_ready = True
 
 # 스타일 설정 (set_page_config 이후에 실행되어야 안전함)
 st.markdown("""
@@ -73,25 +82,43 @@ st.markdown("""
 # ----------------------------------------------------------------------
 # [유틸리티] 파일 입출력 (디스크 저장/로드)
 # ----------------------------------------------------------------------
-def save_data_to_disk(data):
-    """데이터를 파일로 저장 (영구 보존)"""
+def save_section_to_disk(sector, part):
+    """갱신한 섹션만 저장 (다른 섹션은 다시 쓰지 않음)"""
     try:
-        with open(DATA_FILE, "wb") as f:
-            pickle.dump(data, f)
+        dashboard_store.save_section(DATA_FILE, sector, part)
         return True
     except Exception as e:
         st.error(f"데이터 저장 실패: {e}")
         return False
 
 def load_data_from_disk():
-    """파일에서 데이터 불러오기"""
-    if os.path.exists(DATA_FILE):
-        try:
-            with open(DATA_FILE, "rb") as f:
-                return pickle.load(f)
-        except Exception:
-            return None
-    return None
+    """저장소에서 화면에 필요한 만큼만 불러오기 (순위 상위 RANKINGS_LIMIT개, 목표 종목 가격/코드)"""
+    try:
+        dashboard_store.import_legacy(DATA_FILE, momentum_file=LEGACY_DATA_FILE)
+        return dashboard_store.load_sections(DATA_FILE, rankings_limit=RANKINGS_LIMIT)
+    except Exception:
+        return None
+
+def refresh_from_snapshot(force=False):
+    """통합 리포트가 발행한 스냅샷 파일이 바뀌었으면(또는 force) 세션 데이터를 다시 구성 (장중 수동 갱신분과 섹션별 최신 병합)"""
+    stamp = momentum_snapshot.snapshot_stamp()
+    if not force and stamp == st.session_state.get('snapshot_stamp'):
+        return False
+    st.session_state['snapshot_stamp'] = stamp
+    st.session_state['cached_data'] = momentum_snapshot.merge_dashboard_data(
+        momentum_snapshot.load_snapshot(), load_data_from_disk()
+    )
+    return True
+
+# 열려 있는 화면도 새 스냅샷이 발행되면 자동으로 다시 그림 (st.fragment 지원 버전에서만)
+if hasattr(st, 'fragment'):
+    @st.fragment(run_every=cfg.MOMENTUM_SNAPSHOT_POLL_SEC)
+    def watch_snapshot():
+        if momentum_snapshot.snapshot_stamp() != st.session_state.get('snapshot_stamp'):
+            st.rerun()
+else:
+    def watch_snapshot():
+        pass
 
 # ----------------------------------------------------------------------
 # [유틸리티] 차트 지표 계산
@@ -140,6 +167,9 @@ def load_price_data(ticker, start_date, end_date):
     return fdr.DataReader(ticker, start=start_date, end=end_date)
 
 def plot_ichimoku_rsi(df, title, rr_data=None):
+    import matplotlib.pyplot as plt
+    init_font()
+
     tenkan, kijun, span_a, span_b, chikou = calculate_ichimoku(df)
     rsi = calculate_rsi(df['Close'])
 
@@ -318,7 +348,8 @@ def calculate_etf_data():
         price = raw_data[n].iloc[-1] if n in raw_data.columns else 0
         all_ranks.append({'rank': i, 'name': n, 'code': code, 'score': s, 'price': price})
 
-    return {"status": status, "reason": reason, "targets": targets, "rankings": all_ranks, "raw_data_last": raw_data.iloc[-1]}
+    return {"status": status, "reason": reason, "targets": targets, "rankings": all_ranks, "raw_data_last": raw_data.iloc[-1],
+            "score_history": momentum_snapshot.score_history_from_prices('etf', raw_data, [r["name"] for r in all_ranks])}
 
 def calculate_stock_data():
     try:
@@ -361,7 +392,8 @@ def calculate_stock_data():
         price = raw_data[n].iloc[-1] if n in raw_data.columns else 0
         all_ranks.append({'rank': i, 'name': n, 'code': code, 'score': s, 'price': price})
 
-    return {"status": status, "reason": reason, "targets": targets, "rankings": all_ranks, "raw_data_last": raw_data.iloc[-1], "tickers_map": tickers}
+    return {"status": status, "reason": reason, "targets": targets, "rankings": all_ranks, "raw_data_last": raw_data.iloc[-1], "tickers_map": tickers,
+            "score_history": momentum_snapshot.score_history_from_prices('stock', raw_data, [r["name"] for r in all_ranks])}
 
 def calculate_us_data():
     try:
@@ -406,7 +438,8 @@ def calculate_us_data():
         price = raw_data[n].iloc[-1] if n in raw_data.columns else 0
         all_ranks.append({'rank': i, 'name': n, 'code': n, 'score': s, 'price': price})
     
-    return {"status": status, "reason": reason, "targets": targets, "rankings": all_ranks, "raw_data_last": raw_data.iloc[-1]}
+    return {"status": status, "reason": reason, "targets": targets, "rankings": all_ranks, "raw_data_last": raw_data.iloc[-1],
+            "score_history": momentum_snapshot.score_history_from_prices('us', raw_data, [r["name"] for r in all_ranks])}
 
 # ----------------------------------------------------------------------
 # [렌더링] 왼쪽 컬럼 카드
@@ -437,6 +470,15 @@ def render_left_card(title, data, asset_type):
             else:
                 st.info("순위 데이터가 없습니다.")
 
+        with st.expander("📈 점수 추이 (최근 60거래일)"):
+            # 저장본에서 읽은 섹션에는 점수 추이가 없으므로 펼칠 때 따로 읽음
+            history = data['score_history'] if 'score_history' in data else dashboard_store.load_score_history(DATA_FILE, asset_type)
+            names = [n for n, _ in data['targets'] if history is not None and n in history.columns]
+            if names:
+                st.line_chart(history[names])
+            else:
+                st.info("점수 추이 데이터가 없습니다.")
+
 # ----------------------------------------------------------------------
 # [로직] 손익비 분석기
 # ----------------------------------------------------------------------
@@ -484,22 +526,17 @@ def main():
     
     st.title("📈 모멘텀 봇 대시보드")
     
-    # [1] 초기 데이터 로드 (파일 -> 메모리)
-    if 'cached_data' not in st.session_state:
-        loaded_data = load_data_from_disk()
-        if loaded_data:
-            st.session_state['cached_data'] = loaded_data
-            last_update = loaded_data.get('last_update', '알 수 없음')
-            st.toast(f"📂 저장된 데이터를 불러왔습니다. (Last Save: {last_update})")
-        else:
-            # 파일이 없으면 빈 껍데기 생성
-            st.session_state['cached_data'] = {'etf': None, 'stock': None, 'us': None, 'last_update': '-'}
+    # [1] 데이터 로드 (일일 스냅샷 + 장중 수동 갱신 저장본, 스냅샷 파일이 바뀌면 다시 로드)
+    first_load = 'cached_data' not in st.session_state
+    if refresh_from_snapshot(force=first_load):
+        last_update = st.session_state['cached_data'].get('last_update', '알 수 없음')
+        st.toast(f"📂 모멘텀 데이터를 불러왔습니다. (Last Update: {last_update})")
 
     # 현재 메모리에 있는 데이터 가져오기
     current_data = st.session_state['cached_data']
 
     # [2] 상단 컨트롤 패널 (3분할 버튼)
-    st.write("##### 🔄 데이터 갱신 (섹터별 개별 실행)")
+    st.write("##### 🔄 장중 갱신 (섹터별 개별 실행, 일일 데이터는 통합 리포트 실행 시 자동 반영)")
     c1, c2, c3, c4 = st.columns([1, 1, 1, 2])
     
     with c1:
@@ -511,7 +548,9 @@ def main():
     with c4:
         # 마지막 업데이트 시간 표시
         ts = current_data.get('last_update', '-')
-        st.info(f"🕒 마지막 저장: {ts}")
+        seq = current_data.get('snapshot_seq')
+        st.info(f"🕒 마지막 갱신: {ts}" + (f" (일일 스냅샷 #{seq})" if seq else ""))
+        watch_snapshot()
 
     # [3] 갱신 로직 (선택된 섹터만 계산 후 합치기)
     target_sector = None
@@ -533,13 +572,14 @@ def main():
             
             # 2. 기존 데이터에 덮어쓰기 (Merge)
             if new_part:
-                current_data[target_sector] = new_part
-                # 한국 시간(UTC+9)으로 저장
+                # 한국 시간(UTC+9)으로 저장 (섹션별 시각은 일일 스냅샷과 최신 여부 비교에 사용)
                 kst = timezone(timedelta(hours=9))
-                current_data['last_update'] = datetime.now(kst).strftime('%Y-%m-%d %H:%M:%S')
+                new_part['updated'] = datetime.now(kst).strftime('%Y-%m-%d %H:%M:%S')
+                current_data[target_sector] = new_part
+                current_data['last_update'] = new_part['updated']
                 
                 # 3. 파일 저장
-                if save_data_to_disk(current_data):
+                if save_section_to_disk(target_sector, new_part):
                     st.session_state['cached_data'] = current_data
                     st.success(f"✅ {target_sector.upper()} 데이터 갱신 완료!")
                     time.sleep(1)
@@ -1,7 +1,6 @@
 import streamlit as st
 import pandas as pd
-from datetime import datetime, timedelta, timezone
-import os
+from datetime import datetime, timedelta
 import time
 import logging
 
@@ -9,9 +8,8 @@ from session_management import (
     initialize_session_state,
     load_holdings_from_disk,
     save_holdings_to_disk,
-    save_momentum_data_to_disk,
-    load_momentum_data_from_disk,
-    set_analysis_target,
+    update_momentum_cache,
+    watch_snapshot,
     sync_show_rr_lines,
     sync_use_candlestick,
 )
@@ -25,21 +23,20 @@ from data_utilities import (
     calculate_stock_data,
     calculate_us_data,
     normalize_holdings,
+    get_name_search_index,
     get_rr_analysis,
-    get_ai_forecasts,
+    prefetch_holdings,
+    put_frame,
+    get_frame,
 )
 from chart_plotting import (
-    init_font,
     plot_ichimoku_rsi,
     plot_dynamic_ichimoku_rsi,
     plot_support_resistance,
-    compute_prophet_forecast,
-    compute_neuralprophet_forecast,
-    compute_xgboost_forecast,
     build_forecast_chart,
 )
 from technical_indicators import resample_ohlc, InstitutionalExecution, calculate_atr_targets
-from streamlit_ui import render_left_card
+from streamlit_ui import render_left_card, ai_forecast_status
 from streamlit_extras.stylable_container import stylable_container
 
 st.set_page_config(page_title="대시보드", layout="wide", page_icon="📊")
@@ -108,9 +105,6 @@ logging.getLogger('streamlit.runtime.scriptrunner.script_run_context').setLevel(
 
 
 
-init_font()
-
-
 def _freeze_rr(rr_data):
     if not rr_data:
         return None
@@ -121,10 +115,11 @@ def _freeze_rr(rr_data):
     )
 
 
+# 차트 캐시: 인자로 DataFrame 대신 put_frame 키를 받아 리런마다 전체 프레임을 해시하지 않음
 @st.cache_data(show_spinner=False)
-def cached_support_resistance(price_df, order, title, plot_candlestick):
+def cached_support_resistance(frame_key, order, title, plot_candlestick):
     return plot_support_resistance(
-        price_df,
+        get_frame(frame_key),
         order=order,
         title=title,
         plot_candlestick=plot_candlestick,
@@ -132,13 +127,13 @@ def cached_support_resistance(price_df, order, title, plot_candlestick):
 
 
 @st.cache_data(show_spinner=False)
-def cached_dynamic_ichimoku_rsi(view, title, entry, rr_frozen, plot_candlestick, show_rr, visible_tail_rows=None, show_bb=False):
+def cached_dynamic_ichimoku_rsi(frame_key, title, entry, rr_frozen, plot_candlestick, show_rr, visible_tail_rows=None, show_bb=False):
     rr_data = None
     if rr_frozen:
         entry_f, targets, stops = rr_frozen
         rr_data = {"entry": entry_f, "targets": list(targets), "stops": list(stops)}
     return plot_dynamic_ichimoku_rsi(
-        view,
+        get_frame(frame_key),
         title,
         entry,
         rr_data,
@@ -150,8 +145,8 @@ def cached_dynamic_ichimoku_rsi(view, title, entry, rr_frozen, plot_candlestick,
 
 
 @st.cache_data(show_spinner=False)
-def cached_forecast_chart(price_df, forecast_df, title, plot_candlestick=False):
-    return build_forecast_chart(price_df, forecast_df, title=title, plot_candlestick=plot_candlestick)
+def cached_forecast_chart(price_key, forecast_key, title, plot_candlestick=False):
+    return build_forecast_chart(get_frame(price_key), get_frame(forecast_key), title=title, plot_candlestick=plot_candlestick)
 
 
 tabs = st.tabs(["보유종목", "타점분석기", "모멘텀"])
@@ -194,7 +189,7 @@ with tabs[0]:
                     add_btn = st.button("추가", use_container_width=True)
 
                 if add_btn:
-                    resolved, unresolved = normalize_holdings(add_input, name_to_ticker)
+                    resolved, unresolved = normalize_holdings(add_input, name_to_ticker, get_name_search_index())
                     if unresolved:
                         st.warning(f"인식하지 못한 항목: {', '.join(unresolved)}")
                     if not resolved:
@@ -352,6 +347,15 @@ with tabs[0]:
 
                     holdings_map = {r.get("티커"): r for r in st.session_state.get("holdings", [])}
 
+                    # 카드 데이터 선조회 (종목별 호출을 병렬로 띄워 캐시를 채우고, 카드는 캐시만 읽음)
+                    # 조회 버튼을 눌렀거나 종목/평균단가/기간이 바뀐 경우에만 (체크박스 등 일반 재실행은 건너뜀)
+                    avg_prices = {t: float(holdings_map.get(t, {}).get("평균단가", 0) or 0) for t in tickers}
+                    prefetch_key = (tuple(sorted(avg_prices.items())), start_date, end_date, f_start_date, f_end_date)
+                    if run or st.session_state.get("holdings_prefetch_key") != prefetch_key:
+                        with st.spinner("보유종목 데이터 조회 중..."):
+                            prefetch_holdings(tickers, avg_prices, start_date, end_date, f_start_date, f_end_date)
+                        st.session_state["holdings_prefetch_key"] = prefetch_key
+
                     def slice_hist(df):
                         if history_rows == "ALL":
                             return df
@@ -443,11 +447,10 @@ with tabs[0]:
                                         )
                                         entry_for_rr = avg if avg > 0 else float(price_df["Close"].iloc[-1])
                                         rr_table, rr_data = get_rr_analysis(t, entry_for_rr)
-                                        view = price_df.copy()
                                         rr_frozen = _freeze_rr(rr_data)
                                         st.plotly_chart(
                                             cached_dynamic_ichimoku_rsi(
-                                                view,
+                                                put_frame(price_df, t, "holdings"),
                                                 f"{name} 가격",
                                                 entry_for_rr,
                                                 rr_frozen,
@@ -860,27 +863,8 @@ with tabs[1]:
             if price_df is None or price_df.empty:
                 st.caption("가격 데이터가 없습니다.")
             else:
-                ai_cache_key = f"ai_forecast_cache_inst_{calc['ticker']}"
-                ai_sig = (
-                    len(price_df),
-                    str(price_df.index.max()),
-                    float(price_df['Close'].iloc[-1]) if "Close" in price_df.columns else 0.0,
-                )
-
-                if (
-                    ai_cache_key not in st.session_state
-                    or st.session_state[ai_cache_key].get("sig") != ai_sig
-                ):
-                    try:
-                        with st.spinner("AI 모델 계산 중..."):
-                            forecasts = get_ai_forecasts(price_df, prophet_periods=30, neural_periods=5, xgb_periods=5)
-                        st.session_state[ai_cache_key] = {"sig": ai_sig, **forecasts}
-                    except Exception as e:
-                        st.error(f"예측 실패: {e}")
-                        st.session_state[ai_cache_key] = None
-
-                if ai_cache_key in st.session_state and st.session_state[ai_cache_key]:
-                    cached = st.session_state[ai_cache_key]
+                cached = ai_forecast_status(calc["ticker"], price_df, key=f"inst_{calc['ticker']}")
+                if cached:
 
                     # 캔들스틱 토글 추가
                     st.checkbox(
@@ -913,8 +897,8 @@ with tabs[1]:
                     st.markdown("**Prophet**")
                     try:
                         fig_pf = cached_forecast_chart(
-                            price_df, 
-                            cached["prophet"], 
+                            put_frame(price_df, calc["ticker"], "inst"),
+                            put_frame(cached["prophet"], calc["ticker"], "prophet"),
                             title=f"{calc['ticker']} Prophet",
                             plot_candlestick=st.session_state.get('use_candlestick', False)
                         )
@@ -926,8 +910,8 @@ with tabs[1]:
                     st.markdown("**NeuralProphet**")
                     try:
                         fig_np = cached_forecast_chart(
-                            price_df, 
-                            cached["neural"], 
+                            put_frame(price_df, calc["ticker"], "inst"),
+                            put_frame(cached["neural"], calc["ticker"], "neural"),
                             title=f"{calc['ticker']} NeuralProphet",
                             plot_candlestick=st.session_state.get('use_candlestick', False)
                         )
@@ -954,7 +938,7 @@ with tabs[2]:
 
     current_data = st.session_state['cached_data']
 
-    st.write("##### 🔄 데이터 갱신 (섹터별 개별 실행)")
+    st.write("##### 🔄 장중 갱신 (섹터별 개별 실행, 일일 데이터는 통합 리포트 실행 시 자동 반영)")
     c1, c2, c3, c4 = st.columns([1, 1, 1, 2])
 
     with c1:
@@ -965,7 +949,9 @@ with tabs[2]:
         btn_us = st.button("🇺🇸 미국주식 갱신", use_container_width=True)
     with c4:
         ts = current_data.get('last_update', '-')
-        st.info(f"🕒 마지막 저장: {ts}")
+        seq = current_data.get('snapshot_seq')
+        st.info(f"🕒 마지막 갱신: {ts}" + (f" (일일 스냅샷 #{seq})" if seq else ""))
+        watch_snapshot()
 
     target_sector = None
     if btn_etf: target_sector = 'etf'
@@ -981,17 +967,11 @@ with tabs[2]:
             else:
                 new_part = calculate_us_data()
 
-            if new_part:
-                current_data[target_sector] = new_part
-                kst = timezone(timedelta(hours=9))
-                current_data['last_update'] = datetime.now(kst).strftime('%Y-%m-%d %H:%M:%S')
-
-                if save_momentum_data_to_disk(current_data):
-                    st.session_state['cached_data'] = current_data
-                    st.success(f"✅ {target_sector.upper()} 데이터 갱신 완료!")
-                    time.sleep(1)
-                    st.rerun()
-            else:
+            if update_momentum_cache(target_sector, new_part):
+                st.success(f"✅ {target_sector.upper()} 데이터 갱신 완료!")
+                time.sleep(1)
+                st.rerun()
+            elif not new_part:
                 st.error("데이터 수집 실패. 잠시 후 다시 시도해주세요.")
 
     st.divider()
@@ -1119,7 +1099,7 @@ with tabs[2]:
                                 rr_frozen = _freeze_rr(rr_data)
                                 st.plotly_chart(
                                     cached_dynamic_ichimoku_rsi(
-                                        view,
+                                        put_frame(view, ticker, "D"),
                                         f"[{ticker}] 일차트",
                                         entry_price if entry_price else None,
                                         rr_frozen,
@@ -1150,7 +1130,7 @@ with tabs[2]:
                                 rr_frozen = _freeze_rr(rr_data)
                                 st.plotly_chart(
                                     cached_dynamic_ichimoku_rsi(
-                                        view,
+                                        put_frame(view, ticker, "W"),
                                         f"[{ticker}] 주차트",
                                         entry_price if entry_price else None,
                                         rr_frozen,
@@ -1181,7 +1161,7 @@ with tabs[2]:
                                 rr_frozen = _freeze_rr(rr_data)
                                 st.plotly_chart(
                                     cached_dynamic_ichimoku_rsi(
-                                        view,
+                                        put_frame(view, ticker, "M"),
                                         f"[{ticker}] 월차트",
                                         entry_price if entry_price else None,
                                         rr_frozen,
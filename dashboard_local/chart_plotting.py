@@ -1,21 +1,35 @@
 # chart_plotting.py
 
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
+# matplotlib / scipy / torch / prophet 류는 import 비용이 커서 해당 기능을 쓸 때 함수 안에서 로드합니다.
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
 import platform
 import os
-import torch
+import pickle
 from datetime import timedelta
-from scipy.signal import argrelextrema
 
 from technical_indicators import calculate_ichimoku, calculate_rsi # noqa: E402
-from dashboard_config import CANDLE_UP_COLOR, CANDLE_DOWN_COLOR # noqa: E402
+from technical_indicators import resample_ohlc # noqa: E402
+from dashboard_config import CANDLE_UP_COLOR, CANDLE_DOWN_COLOR, CHART_MAX_POINTS, CHART_WEBGL_MIN_POINTS # noqa: E402
+
+_font_ready = False
+
+# 월말 리샘플 규칙 (pandas 2.2부터 'ME', 이전 버전은 'M')
+try:
+    pd.tseries.frequencies.to_offset('ME')
+    _MONTH_END = 'ME'
+except ValueError:
+    _MONTH_END = 'M'
 
 def init_font():
+    global _font_ready
+    if _font_ready:
+        return
+    import matplotlib.pyplot as plt
+    import matplotlib.font_manager as fm
+
     font_filename = "NanumGothic.ttf"
     font_path = os.path.join(os.path.dirname(__file__), font_filename)
 
@@ -30,8 +44,12 @@ def init_font():
             plt.rc('font', family='Malgun Gothic')
 
     plt.rcParams['axes.unicode_minus'] = False
+    _font_ready = True
 
 def plot_ichimoku_rsi(df, title, rr_data=None, show_rr=True):
+    import matplotlib.pyplot as plt
+    init_font()
+
     tenkan, kijun, span_a, span_b, chikou = calculate_ichimoku(df)
     rsi = calculate_rsi(df['Close'])
 
@@ -77,7 +95,49 @@ def plot_ichimoku_rsi(df, title, rr_data=None, show_rr=True):
     plt.tight_layout()
     return fig
 
-def plot_dynamic_ichimoku_rsi(df, title, entry_price=None, rr_data=None, plot_candlestick=False, show_rr=True, visible_tail_rows=None, show_bb=False):
+def chart_resolution(n_rows, max_points=CHART_MAX_POINTS):
+    """표시할 일봉 수 → 리샘플 규칙 (None: 일봉 그대로, 'W-FRI': 주봉, 월말: 월봉)"""
+    if n_rows <= max_points:
+        return None
+    if n_rows / 5 <= max_points:
+        return 'W-FRI'
+    return _MONTH_END
+
+
+def decimate_minmax(series, max_points=CHART_MAX_POINTS):
+    """
+    라인용 솎아내기: max_points/2개 구간으로 나눠 구간별 최솟값·최댓값 위치만 남김 (급등락 모양 보존)
+    """
+    values = series.to_numpy(dtype=float)
+    n = len(values)
+    if n <= max_points:
+        return series
+    buckets = max_points // 2
+    edges = np.linspace(0, n, buckets + 1).astype(int)
+    filled = np.where(np.isnan(values), np.nanmean(values), values)
+    keep = [0, n - 1]
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if hi > lo:
+            chunk = filled[lo:hi]
+            keep.append(lo + int(chunk.argmin()))
+            keep.append(lo + int(chunk.argmax()))
+    return series.iloc[np.unique(keep)]
+
+
+def _scatter_cls(n_points):
+    """점이 많이 남는 시리즈만 WebGL 트레이스 사용"""
+    return go.Scattergl if n_points >= CHART_WEBGL_MIN_POINTS else go.Scatter
+
+
+def _bar_colors(open_, close):
+    """거래량 막대 색 (양봉/음봉, 값 없는 봉은 회색)"""
+    o = pd.to_numeric(open_, errors='coerce').to_numpy(dtype=float)
+    c = pd.to_numeric(close, errors='coerce').to_numpy(dtype=float)
+    return np.where(np.isnan(o) | np.isnan(c), '#555555', np.where(c >= o, CANDLE_UP_COLOR, CANDLE_DOWN_COLOR))
+
+
+def plot_dynamic_ichimoku_rsi(df, title, entry_price=None, rr_data=None, plot_candlestick=False, show_rr=True, visible_tail_rows=None, show_bb=False, lod=True):
+    """lod=True면 표시 봉 수에 맞춰 주봉/월봉으로 묶어 그림 (지표는 일봉 기준으로 계산)"""
     # 1. Future Cloud를 위해 데이터프레임 확장 (26일)
     last_date = df.index[-1]
     # 인덱스가 DatetimeIndex인 경우와 아닌 경우 처리
@@ -129,7 +189,21 @@ def plot_dynamic_ichimoku_rsi(df, title, entry_price=None, rr_data=None, plot_ca
     else:
         df_disp = df_extended
 
-    # 4. Plotly 차트 생성 (3단: Price / Volume / RSI)
+    # 4. 해상도 선택 (LOD): 지표는 일봉으로 계산하고 표시만 주봉/월봉 + 라인 솎아내기
+    lines = pd.DataFrame({
+        'tenkan': tenkan, 'kijun': kijun, 'span_a': span_a, 'span_b': span_b, 'chikou': chikou,
+        'rsi': rsi, 'bb_upper': bb_upper, 'bb_lower': bb_lower, 'ma20': ma20,
+    }).apply(pd.to_numeric, errors='coerce')
+    bars = df_disp[['Open', 'High', 'Low', 'Close', 'Volume']].apply(pd.to_numeric, errors='coerce')
+    close_line = bars['Close']
+    rule = chart_resolution(len(df_disp)) if lod and isinstance(df_disp.index, pd.DatetimeIndex) else None
+    if rule:
+        bars = resample_ohlc(bars.dropna(subset=['Close']), rule)
+        lines = lines.resample(rule).last().dropna(how='all')
+        close_line = decimate_minmax(close_line.dropna())
+    Line = _scatter_cls(max(len(lines), len(close_line)))
+
+    # 5. Plotly 차트 생성 (3단: Price / Volume / RSI)
     fig = make_subplots(
         rows=3,
         cols=1,
@@ -142,34 +216,34 @@ def plot_dynamic_ichimoku_rsi(df, title, entry_price=None, rr_data=None, plot_ca
     # --- Row 1: Price & Ichimoku & BB ---
     # 캔들/라인
     if plot_candlestick:
-        fig.add_trace(go.Candlestick(x=df_disp.index,
-                                     open=df_disp['Open'],
-                                     high=df_disp['High'],
-                                     low=df_disp['Low'],
-                                     close=df_disp['Close'],
+        fig.add_trace(go.Candlestick(x=bars.index,
+                                     open=bars['Open'],
+                                     high=bars['High'],
+                                     low=bars['Low'],
+                                     close=bars['Close'],
                                      increasing=dict(line=dict(color=CANDLE_UP_COLOR, width=1), fillcolor=CANDLE_UP_COLOR),
                                      decreasing=dict(line=dict(color=CANDLE_DOWN_COLOR, width=1), fillcolor=CANDLE_DOWN_COLOR),
                                      name='Candlestick'), row=1, col=1)
     else:
-        fig.add_trace(go.Scatter(x=df_disp.index, y=df_disp['Close'], name='Close', line=dict(color='#e2e8f0', width=2)), row=1, col=1)
+        fig.add_trace(Line(x=close_line.index, y=close_line, name='Close', line=dict(color='#e2e8f0', width=2)), row=1, col=1)
 
     # 볼린저 밴드 (옵션)
     if show_bb:
-        fig.add_trace(go.Scatter(x=bb_upper.index, y=bb_upper, name='BB Upper', line=dict(color='#6366f1', width=1, dash='dot')), row=1, col=1)
-        fig.add_trace(go.Scatter(x=ma20.index, y=ma20, name='BB Mid', line=dict(color='#6366f1', width=1)), row=1, col=1)
-        fig.add_trace(go.Scatter(x=bb_lower.index, y=bb_lower, name='BB Lower', line=dict(color='#6366f1', width=1, dash='dot')), row=1, col=1)
+        fig.add_trace(Line(x=lines.index, y=lines['bb_upper'], name='BB Upper', line=dict(color='#6366f1', width=1, dash='dot')), row=1, col=1)
+        fig.add_trace(Line(x=lines.index, y=lines['ma20'], name='BB Mid', line=dict(color='#6366f1', width=1)), row=1, col=1)
+        fig.add_trace(Line(x=lines.index, y=lines['bb_lower'], name='BB Lower', line=dict(color='#6366f1', width=1, dash='dot')), row=1, col=1)
 
     # 일목균형표
-    fig.add_trace(go.Scatter(x=tenkan.index, y=tenkan, name='Tenkan', line=dict(color='#f59e0b', width=1)), row=1, col=1)
-    fig.add_trace(go.Scatter(x=kijun.index, y=kijun, name='Kijun', line=dict(color='#3b82f6', width=1)), row=1, col=1)
+    fig.add_trace(Line(x=lines.index, y=lines['tenkan'], name='Tenkan', line=dict(color='#f59e0b', width=1)), row=1, col=1)
+    fig.add_trace(Line(x=lines.index, y=lines['kijun'], name='Kijun', line=dict(color='#3b82f6', width=1)), row=1, col=1)
     
     # 구름대 (Span A, Span B)
     # Span A, B는 미래 영역까지 값이 있음. fill='tonexty'를 위해 순서 중요.
     # 보통 Span A를 먼저 그리고 Span B를 그릴 때 fill='tonexty'하면 두 선 사이가 채워짐.
-    fig.add_trace(go.Scatter(x=span_a.index, y=span_a, name='Span A', line=dict(color='#10b981', width=1), showlegend=True), row=1, col=1)
-    fig.add_trace(go.Scatter(
-        x=span_b.index, 
-        y=span_b, 
+    fig.add_trace(Line(x=lines.index, y=lines['span_a'], name='Span A', line=dict(color='#10b981', width=1), showlegend=True), row=1, col=1)
+    fig.add_trace(Line(
+        x=lines.index, 
+        y=lines['span_b'], 
         name='Span B', 
         line=dict(color='#ef4444', width=1), 
         fill='tonexty', 
@@ -178,7 +252,7 @@ def plot_dynamic_ichimoku_rsi(df, title, entry_price=None, rr_data=None, plot_ca
     ), row=1, col=1)
     
     # 후행스팬 (Chikou)
-    fig.add_trace(go.Scatter(x=chikou.index, y=chikou, name='Chikou', line=dict(color='#6b7280', width=1)), row=1, col=1)
+    fig.add_trace(Line(x=lines.index, y=lines['chikou'], name='Chikou', line=dict(color='#6b7280', width=1)), row=1, col=1)
 
     # 진입가/손익비 라인
     if entry_price:
@@ -194,33 +268,17 @@ def plot_dynamic_ichimoku_rsi(df, title, entry_price=None, rr_data=None, plot_ca
             fig.add_hline(y=sl, line=dict(color=colors[i % len(colors)], width=1, dash='dot'), row=1, col=1)
 
     # --- Row 2: Volume ---
-    # 색상: 전일 대비 상승이면 빨강(한국기준) or Green, 하락이면 파랑 or Red. 
-    # 여기선 단순화를 위해 회색이나 고정색, 혹은 캔들 색상 따라가기.
-    # Close가 Open보다 크면 양봉(UP), 작으면 음봉(DOWN) 색상 사용
-    colors_vol = [CANDLE_UP_COLOR if (o <= c) else CANDLE_DOWN_COLOR for o, c in zip(df_disp['Open'], df_disp['Close'])]
-    # df_disp의 마지막 26개는 NaN이므로 색상 계산시 주의. NaN이면 기본색
-    # zip은 짧은 쪽 기준이므로 NaN 데이터(Close/Open이 NaN)에 대해서는 루프가 돌지 않거나 에러 날 수 있음.
-    # 안전하게 처리:
-    vol_colors = []
-    for i in range(len(df_disp)):
-        if pd.isna(df_disp['Close'].iloc[i]) or pd.isna(df_disp['Open'].iloc[i]):
-            vol_colors.append('#555555')
-        else:
-            if df_disp['Close'].iloc[i] >= df_disp['Open'].iloc[i]:
-                vol_colors.append(CANDLE_UP_COLOR)
-            else:
-                vol_colors.append(CANDLE_DOWN_COLOR)
-    
+    # Close가 Open보다 크면 양봉(UP), 작으면 음봉(DOWN) 색상, 값이 없는 미래 구간은 회색
     fig.add_trace(go.Bar(
-        x=df_disp.index, 
-        y=df_disp['Volume'], 
+        x=bars.index, 
+        y=bars['Volume'], 
         name='Volume', 
-        marker_color=vol_colors,
+        marker_color=_bar_colors(bars['Open'], bars['Close']),
         showlegend=False
     ), row=2, col=1)
 
     # --- Row 3: RSI ---
-    fig.add_trace(go.Scatter(x=rsi.index, y=rsi, name='RSI', line=dict(color='#8b5cf6', width=1)), row=3, col=1)
+    fig.add_trace(Line(x=lines.index, y=lines['rsi'], name='RSI', line=dict(color='#8b5cf6', width=1)), row=3, col=1)
     fig.add_hline(y=70, line=dict(color='#ef4444', width=1, dash='dash'), row=3, col=1)
     fig.add_hline(y=30, line=dict(color='#10b981', width=1, dash='dash'), row=3, col=1)
 
@@ -251,7 +309,10 @@ def plot_dynamic_ichimoku_rsi(df, title, entry_price=None, rr_data=None, plot_ca
 
 
 
-def plot_support_resistance(df, order=20, title="Support/Resistance", plot_candlestick=False):
+def plot_support_resistance(df, order=20, title="Support/Resistance", plot_candlestick=False, lod=True):
+    """지지/저항은 일봉으로 계산, lod=True면 가격은 주봉/월봉·솎아낸 라인으로 표시"""
+    from scipy.signal import argrelextrema
+
     close = df['Close'].values
     local_max_idx = argrelextrema(close, np.greater, order=order)[0]
     local_min_idx = argrelextrema(close, np.less, order=order)[0]
@@ -263,20 +324,23 @@ def plot_support_resistance(df, order=20, title="Support/Resistance", plot_candl
     nearest_support = local_min_prices[local_min_prices < current_price].max() if any(local_min_prices < current_price) else current_price * 0.9
     nearest_resistance = local_max_prices[local_max_prices > current_price].min() if any(local_max_prices > current_price) else current_price * 1.1
 
+    rule = chart_resolution(len(df)) if lod and isinstance(df.index, pd.DatetimeIndex) else None
     fig = go.Figure()
     if plot_candlestick:
+        bars = resample_ohlc(df, rule) if rule else df
         fig.add_trace(go.Candlestick(
-            x=df.index,
-            open=df['Open'],
-            high=df['High'],
-            low=df['Low'],
-            close=df['Close'],
+            x=bars.index,
+            open=bars['Open'],
+            high=bars['High'],
+            low=bars['Low'],
+            close=bars['Close'],
             increasing=dict(line=dict(color=CANDLE_UP_COLOR, width=1), fillcolor=CANDLE_UP_COLOR),
             decreasing=dict(line=dict(color=CANDLE_DOWN_COLOR, width=1), fillcolor=CANDLE_DOWN_COLOR),
             name='Candlestick'
         ))
     else:
-        fig.add_trace(go.Scatter(x=df.index, y=close, name='Close', line=dict(color='#1f2937', width=2)))
+        close_line = decimate_minmax(df['Close']) if rule else df['Close']
+        fig.add_trace(_scatter_cls(len(close_line))(x=close_line.index, y=close_line, name='Close', line=dict(color='#1f2937', width=2)))
     if len(local_max_idx) > 0:
         fig.add_trace(go.Scatter(x=df.index[local_max_idx], y=local_max_prices, mode='markers', name='Resistance', marker=dict(color='red', size=6, symbol='triangle-down')))
     if len(local_min_idx) > 0:
@@ -368,141 +432,160 @@ def compute_prophet_forecast(df, periods=30):
     return plot_prophet_forecast(df, periods=periods, title="Prophet Forecast")
 
 
-def compute_neuralprophet_forecast(df, periods=30):
-    """NeuralProphet 모델을 사용하여 미래 가격을 예측합니다."""
+def _neuralprophet_model(periods, **kwargs):
+    """NeuralProphet 직접 다중 시점 모델 (n_forecasts=periods, 한 번 학습으로 periods일 예측)"""
     try:
         from neuralprophet import NeuralProphet
     except ImportError:
         raise ImportError("NeuralProphet이 설치되지 않았습니다. pip install neuralprophet 실행 필요")
-    
+    import torch
+
     # 랜덤 시드 고정으로 일관된 결과 생성
     np.random.seed(42)
     torch.manual_seed(42)
     if torch.cuda.is_available():
         torch.cuda.manual_seed(42)
-    
-    df_prophet = _prophet_df_from_price(df)
-    df_prophet = df_prophet[['ds', 'y', 'rsi', 'ma20', 'ma60']].copy()
-    df_prophet = df_prophet.sort_values('ds')
-    
-    if len(df_prophet) <= 30:
-        raise ValueError(f"학습 데이터 길이({len(df_prophet)})가 30일보다 짧아 예측할 수 없습니다.")
-    
-    # 단순하고 안정적인 1-step 예측 방식 사용
+
     model = NeuralProphet(
         n_lags=30,
-        n_forecasts=1,
+        n_forecasts=periods,
         yearly_seasonality=True,
         weekly_seasonality=True,
         daily_seasonality=False,
         learning_rate=0.01,
-        epochs=150
+        epochs=150,
+        **kwargs,
     )
-    
     # RSI, MA20, MA60을 lagged regressor로 등록 (미래 값을 알 수 없으므로)
     model.add_lagged_regressor('rsi')
     model.add_lagged_regressor('ma20')
     model.add_lagged_regressor('ma60')
-    
-    model.fit(df_prophet, freq='D')
-    
-    # 과거 fitted 값 먼저 구하기
-    historic_predictions = model.predict(df_prophet)
-    
-    # Iterative 방식으로 미래 예측 (한 단계씩 예측하고 결과를 다음 입력으로 사용)
-    current_df = df_prophet.copy()
-    future_predictions = []
-    
-    for i in range(periods):
-        # 1일 예측
-        future_1step = model.make_future_dataframe(current_df, periods=1, n_historic_predictions=0)
-        pred = model.predict(future_1step)
-        
-        # 예측 결과 저장
-        if not pred.empty:
-            last_pred = pred.iloc[-1]
-            future_predictions.append({
-                'ds': last_pred['ds'],
-                'yhat': last_pred.get('yhat1', last_pred.get('yhat', 0))
-            })
-            
-            # 예측 결과를 다음 입력 데이터에 추가 (autoregressive)
-            next_row = pd.DataFrame({
-                'ds': [last_pred['ds']],
-                'y': [last_pred.get('yhat1', last_pred.get('yhat', current_df['y'].iloc[-1]))],
-                'rsi': [current_df['rsi'].iloc[-1]],
-                'ma20': [current_df['ma20'].iloc[-1]],
-                'ma60': [current_df['ma60'].iloc[-1]]
-            })
-            current_df = pd.concat([current_df, next_row], ignore_index=True)
-    
-    # 과거 + 미래 결합
-    if 'yhat1' in historic_predictions.columns:
-        historic_predictions['yhat'] = historic_predictions['yhat1']
-    
-    future_df = pd.DataFrame(future_predictions)
-    forecast = pd.concat([historic_predictions[['ds', 'yhat']], future_df], ignore_index=True)
-    
+    return model
+
+
+def _neuralprophet_input(df):
+    df_prophet = _prophet_df_from_price(df)
+    df_prophet = df_prophet[['ds', 'y', 'rsi', 'ma20', 'ma60']].sort_values('ds').reset_index(drop=True)
+    if len(df_prophet) <= 30:
+        raise ValueError(f"학습 데이터 길이({len(df_prophet)})가 30일보다 짧아 예측할 수 없습니다.")
+    return df_prophet
+
+
+def _neuralprophet_output(pred, last_ds, periods):
+    """
+    predict 결과 → [ds, yhat, yhat_lower, yhat_upper]
+    과거 구간은 1일 앞 예측(yhat1), 미래 k일째는 마지막 시점 기준 k일 앞 예측(yhat{k})
+    """
+    pred = pred.sort_values('ds').reset_index(drop=True)
+    past = pred[pred['ds'] <= last_ds]
+    future = pred[pred['ds'] > last_ds].head(periods)
+    steps = np.arange(1, len(future) + 1)
+    yhat_future = future[[f'yhat{k}' for k in steps]].to_numpy()[steps - 1, steps - 1] if len(future) else []
+    forecast = pd.concat([
+        pd.DataFrame({'ds': past['ds'].to_numpy(), 'yhat': past['yhat1'].to_numpy()}),
+        pd.DataFrame({'ds': future['ds'].to_numpy(), 'yhat': yhat_future}),
+    ], ignore_index=True)
     # 신뢰구간 추가 (NeuralProphet은 기본 제공 안함, yhat의 ±5%로 설정)
-    if 'yhat' in forecast.columns:
-        forecast['yhat_lower'] = forecast['yhat'] * 0.95
-        forecast['yhat_upper'] = forecast['yhat'] * 1.05
-    
+    forecast['yhat_lower'] = forecast['yhat'] * 0.95
+    forecast['yhat_upper'] = forecast['yhat'] * 1.05
     return forecast
 
 
-def compute_xgboost_forecast(df, periods=5):
-    """XGBoost 분류 모델을 사용하여 미래 상승/하락 확률을 예측합니다."""
-    try:
-        import xgboost as xgb
-    except ImportError:
-        raise ImportError("XGBoost가 설치되지 않았습니다. pip install xgboost 실행 필요")
-    
-    from sklearn.preprocessing import StandardScaler
-    
-    # 랜덤 시드 고정으로 일관된 결과 생성
-    np.random.seed(42)
-    
+def compute_neuralprophet_forecast(df, periods=30):
+    """
+    NeuralProphet 모델을 사용하여 미래 가격을 예측합니다.
+    n_forecasts=periods로 한 번 학습하고 predict 1회로 과거 적합값 + 미래 periods일을 얻습니다.
+    """
+    df_prophet = _neuralprophet_input(df)
+    model = _neuralprophet_model(periods)
+    model.fit(df_prophet, freq='D')
+    future = model.make_future_dataframe(df_prophet, periods=periods, n_historic_predictions=True)
+    return _neuralprophet_output(model.predict(future), df_prophet['ds'].iloc[-1], periods)
+
+
+def compute_neuralprophet_forecasts(frames, periods=30):
+    """
+    여러 종목을 하나의 글로벌 모델로 묶어 학습/예측 (종목별 추세·계절성·정규화는 각자 유지).
+    forecast_jobs 보유종목 일괄 계산에서 사용 (화면별 요청은 compute_neuralprophet_forecast).
+    :param frames: {티커: 가격 DataFrame}
+    :return: {티커: forecast DataFrame} (데이터가 부족한 종목은 제외)
+    """
+    inputs = {}
+    for ticker, df in frames.items():
+        try:
+            inputs[ticker] = _neuralprophet_input(df)
+        except ValueError:
+            continue
+    if not inputs:
+        return {}
+    if len(inputs) == 1:
+        ticker = next(iter(inputs))
+        return {ticker: compute_neuralprophet_forecast(frames[ticker], periods)}
+
+    panel = pd.concat([d.assign(ID=str(t)) for t, d in inputs.items()], ignore_index=True)
+    model = _neuralprophet_model(periods, trend_global_local='local', season_global_local='local')
+    model.fit(panel, freq='D')
+    future = model.make_future_dataframe(panel, periods=periods, n_historic_predictions=True)
+    pred = model.predict(future)
+    return {
+        t: _neuralprophet_output(pred[pred['ID'] == str(t)], d['ds'].iloc[-1], periods)
+        for t, d in inputs.items()
+    }
+
+
+XGB_LOOKBACK = 5
+
+
+def _xgb_frame(df):
     df_clean = df[['Close']].copy()
     df_clean['MA5'] = df_clean['Close'].rolling(5).mean()
     df_clean['MA20'] = df_clean['Close'].rolling(20).mean()
     df_clean['MA60'] = df_clean['Close'].rolling(60).mean()
     df_clean['RSI'] = calculate_rsi(df_clean['Close'])
     df_clean = df_clean.dropna()
-    
     if len(df_clean) < 100:
         raise ValueError("XGBoost 예측을 위한 데이터가 부족합니다.")
-    
-    # 특징 생성: 이전 5일 가격 + 기술지표
-    X, y = [], []
-    lookback = 5
-    for i in range(lookback, len(df_clean) - 1):  # -1: 다음날 라벨을 위해
-        features = list(df_clean['Close'].iloc[i-lookback:i].values)
-        features.extend([
-            df_clean['MA5'].iloc[i],
-            df_clean['MA20'].iloc[i],
-            df_clean['MA60'].iloc[i],
-            df_clean['RSI'].iloc[i]
-        ])
-        X.append(features)
-        # 타겟: 다음날 상승(1) or 하락(0)
-        next_close = df_clean['Close'].iloc[i + 1]
-        current_close = df_clean['Close'].iloc[i]
-        y.append(1 if next_close > current_close else 0)
-    
-    X = np.array(X)
-    y = np.array(y)
-    
-    # 학습/검증 분리
+    return df_clean
+
+
+def _xgb_features(df_clean, relative=False, lookback=XGB_LOOKBACK):
+    """
+    학습 행렬 (sliding_window_view, 반복문 없음)
+    i번째 샘플: 이전 lookback일 종가 + i일 MA5/MA20/MA60/RSI, 라벨은 다음날 상승(1)/하락(0)
+    :param relative: 가격 특징을 i일 종가로 나눔 (여러 종목을 한 모델로 학습할 때)
+    """
+    close = df_clean['Close'].to_numpy(dtype=float)
+    n = len(close)
+    rows = np.arange(lookback, n - 1)  # -1: 다음날 라벨을 위해
+    windows = np.lib.stride_tricks.sliding_window_view(close, lookback)[rows - lookback]
+    mas = df_clean[['MA5', 'MA20', 'MA60']].to_numpy(dtype=float)[rows]
+    if relative:
+        windows = windows / close[rows, None]
+        mas = mas / close[rows, None]
+    X = np.column_stack([windows, mas, df_clean['RSI'].to_numpy(dtype=float)[rows]])
+    y = (close[rows + 1] > close[rows]).astype(int)
+    return X, y
+
+
+def _train_split(X, y):
+    """학습/검증 분리 (시계열 순서 유지, 앞 80%로 학습)"""
     split = int(len(X) * 0.8)
-    X_train, X_val = X[:split], X[split:]
-    y_train, y_val = y[:split], y[split:]
-    
-    # 스케일링
+    return X[:split], y[:split]
+
+
+def _fit_xgb(X_train, y_train):
+    try:
+        import xgboost as xgb
+    except ImportError:
+        raise ImportError("XGBoost가 설치되지 않았습니다. pip install xgboost 실행 필요")
+    from sklearn.preprocessing import StandardScaler
+
+    # 랜덤 시드 고정으로 일관된 결과 생성
+    np.random.seed(42)
+
     scaler = StandardScaler()
     X_train_scaled = scaler.fit_transform(X_train)
-    X_val_scaled = scaler.transform(X_val)
-    
+
     # XGBoost 분류 모델 학습
     model = xgb.XGBClassifier(
         n_estimators=100,
@@ -511,36 +594,116 @@ def compute_xgboost_forecast(df, periods=5):
         random_state=42
     )
     model.fit(X_train_scaled, y_train)
-    
+    return {'model': model, 'scaler': scaler}
+
+
+def _load_pickle(path):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def _save_pickle(obj, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'wb') as f:
+        pickle.dump(obj, f)
+    os.replace(path + '.tmp', path)
+
+
+def fit_xgboost_model(df):
+    """
+    종목 XGBoost 모델 학습 (예측 결과는 forecast_jobs가 저장하므로 모델은 따로 저장하지 않음)
+    :return: {'model', 'scaler', 'relative'}
+    """
+    X, y = _xgb_features(_xgb_frame(df))
+    return {**_fit_xgb(*_train_split(X, y)), 'relative': False}
+
+
+def fit_xgboost_cross_section(frames, path=None):
+    """
+    여러 종목의 특징을 쌓아 하나의 모델로 학습 (가격 특징은 당일 종가 대비 비율).
+    :param frames: {티커: 가격 DataFrame} (데이터가 부족한 종목은 제외)
+    :param path: 저장/재사용할 파일 경로 (None이면 저장 안 함, 보통 XGB_MODEL_DIR 아래)
+    """
+    bundle = _load_pickle(path) if path else None
+    if bundle is not None:
+        return bundle
+    parts = []
+    for df in frames.values():
+        try:
+            # 종목별로 앞 80%를 떼어 낸 뒤 이어 붙임 (모든 종목이 학습에 들어감)
+            parts.append(_train_split(*_xgb_features(_xgb_frame(df), relative=True)))
+        except ValueError:
+            continue
+    if not parts:
+        raise ValueError("XGBoost 예측을 위한 데이터가 부족합니다.")
+    X = np.concatenate([p[0] for p in parts])
+    y = np.concatenate([p[1] for p in parts])
+    bundle = {**_fit_xgb(X, y), 'relative': True}
+    if path:
+        _save_pickle(bundle, path)
+    return bundle
+
+
+def predict_xgboost(bundle, df, periods=5, lookback=XGB_LOOKBACK):
+    """학습된 모델로 미래 periods일 상승 확률 예측 (추론만)"""
+    df_clean = _xgb_frame(df)
+    model, scaler = bundle['model'], bundle['scaler']
+
     # 미래 상승 확률 예측 (iterative)
     predictions = []  # 상승 확률 저장
     last_sequence = list(df_clean['Close'].iloc[-lookback:].values)
-    last_ma5 = df_clean['MA5'].iloc[-1]
-    last_ma20 = df_clean['MA20'].iloc[-1]
-    last_ma60 = df_clean['MA60'].iloc[-1]
+    last_mas = [df_clean['MA5'].iloc[-1], df_clean['MA20'].iloc[-1], df_clean['MA60'].iloc[-1]]
     last_rsi = df_clean['RSI'].iloc[-1]
-    
+
     for i in range(periods):
-        features = last_sequence[-lookback:] + [last_ma5, last_ma20, last_ma60, last_rsi]
-        features_scaled = scaler.transform([features])
+        window = last_sequence[-lookback:]
+        mas = last_mas
+        if bundle.get('relative'):
+            ref = last_sequence[-1]
+            window = [v / ref for v in window]
+            mas = [v / ref for v in mas]
+        features_scaled = scaler.transform([window + mas + [last_rsi]])
         # 상승 확률 (클래스 1의 확률)
         prob_up = model.predict_proba(features_scaled)[0][1]
         predictions.append(prob_up)
-        
+
         # 다음 예측을 위해 가격 업데이트 (확률 기반 예측가)
         current_price = last_sequence[-1]
         # 상승 확률이 0.5 이상이면 1% 상승, 아니면 1% 하락 가정
         next_price = current_price * (1.01 if prob_up > 0.5 else 0.99)
         last_sequence.append(next_price)
-    
+
     # 결과 반환 (확률 데이터)
     last_date = df.index[-1]
-    from datetime import timedelta
     future_dates = pd.date_range(start=last_date + timedelta(days=1), periods=periods, freq='D')
-    
+
     result = pd.DataFrame({
         'ds': future_dates,
         'probability': predictions  # 상승 확률
     })
-    
+
     return result
+
+
+def compute_xgboost_forecast(df, periods=5):
+    """
+    XGBoost 분류 모델을 사용하여 미래 상승/하락 확률을 예측합니다.
+    """
+    return predict_xgboost(fit_xgboost_model(df), df, periods)
+
+
+def compute_xgboost_forecasts(frames, periods=5, path=None):
+    """교차 종목 모드: 한 모델로 여러 종목 상승 확률 예측 → {티커: 결과} (forecast_jobs 보유종목 일괄 계산)"""
+    bundle = fit_xgboost_cross_section(frames, path)
+    results = {}
+    for ticker, df in frames.items():
+        try:
+            results[ticker] = predict_xgboost(bundle, df, periods)
+        except ValueError:
+            continue
+    return results
@@ -4,9 +4,30 @@ import os
 
 # 파일 경로 설정
 DATA_DIR = os.path.dirname(os.path.abspath(__file__))
-MOMENTUM_DATA_FILE = os.path.join(DATA_DIR, "momentum_dashboard.pkl")
-HOLDINGS_FILE = os.path.join(DATA_DIR, "holdings.json")
+DASHBOARD_DB_FILE = os.path.join(DATA_DIR, "dashboard.db")  # 모멘텀 섹션/보유종목 저장소 (dashboard_store.py)
+MOMENTUM_DATA_FILE = os.path.join(DATA_DIR, "momentum_dashboard.pkl")  # 예전 저장 파일 (DB로 1회 가져옴)
+HOLDINGS_FILE = os.path.join(DATA_DIR, "holdings.json")  # 예전 저장 파일 (DB로 1회 가져옴)
+FORECAST_DIR = os.path.join(DATA_DIR, "forecasts")  # AI 예측 결과 (forecast_jobs.py)
+XGB_MODEL_DIR = os.path.join(DATA_DIR, "models", "xgboost")  # 보유종목 일괄 예측용 교차 종목 XGBoost 모델 (forecast_jobs.py)
 
 # 차트 색상 설정
 CANDLE_UP_COLOR = '#26A69A' # Green for increasing candles
 CANDLE_DOWN_COLOR = '#EF5350' # Red for decreasing candles
+
+# 차트 해상도 (LOD): 표시 봉 수가 CHART_MAX_POINTS를 넘으면 주봉 → 월봉으로 묶고, 라인은 최소/최대 보존 솎아내기
+CHART_MAX_POINTS = 500
+CHART_WEBGL_MIN_POINTS = 1000 # 이 이상 점이 남는 시리즈만 WebGL(Scattergl) 사용 (브라우저 WebGL 컨텍스트 수 제한)
+
+# 보유종목 카드 선조회 동시 실행 수 (가격/손익비/펀더멘탈/외인 호출을 한 번에 띄우되 차단 방지용 상한)
+HOLDINGS_PREFETCH_WORKERS = 6
+
+# AI 예측 백그라운드 작업 (forecast_jobs.py)
+FORECAST_WORKERS = 2     # 학습 프로세스 수 (NeuralProphet/torch가 무거워 작게 유지)
+FORECAST_KEEP_DAYS = 14  # 이 기간보다 오래된 결과 파일은 미리 계산 시 삭제
+FORECAST_BARS = 200      # 학습에 쓰는 최근 봉 수 (조회 시작일과 무관하게 같은 구간 → 야간 미리 계산 결과를 다음 날 재사용)
+
+# 차트 캐시용 DataFrame 공유 저장소 크기 (data_utilities.put_frame, 캐시 키에는 프레임 대신 식별자만 사용)
+FRAME_STORE_SIZE = 256
+
+# 모멘텀 카드 "전체 순위 보기"에 표시하는 순위 수 (시작 시 DB에서 이만큼만 읽음)
+RANKINGS_DISPLAY_LIMIT = 50
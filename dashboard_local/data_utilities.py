@@ -4,63 +4,90 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime, timedelta
 import FinanceDataReader as fdr
-from pykrx import stock
 import os
 import sys
 import numpy as np
 import logging
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+import threading
+import hashlib
 
 from technical_indicators import UniversalRiskRewardCalculator
-from chart_plotting import (
-    compute_prophet_forecast,
-    compute_neuralprophet_forecast,
-    compute_xgboost_forecast,
-)
+from dashboard_config import HOLDINGS_PREFETCH_WORKERS, FRAME_STORE_SIZE
+import forecast_jobs
 
 # Adjust path to import common and config from parent directory
 ROOT_DIR = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
 sys.path.append(ROOT_DIR)
 from common import fetch_data_in_parallel  # noqa: E402
 import config as cfg  # noqa: E402
+import ticker_index  # noqa: E402
+import momentum_snapshot  # noqa: E402
 
-@st.cache_data(ttl=60 * 60)
-def get_ticker_name_map():
-    tickers = []
-    try:
-        tickers.extend(stock.get_market_ticker_list(market="KOSPI"))
-        tickers.extend(stock.get_market_ticker_list(market="KOSDAQ"))
-    except Exception:
-        tickers = []
 
-    if not tickers:
-        try:
-            df_kospi = fdr.StockListing('KOSPI')
-            df_kosdaq = fdr.StockListing('KOSDAQ')
-            combined = pd.concat([df_kospi, df_kosdaq])
-            name_to_ticker = dict(zip(combined['Name'], combined['Code']))
-            ticker_to_name = dict(zip(combined['Code'], combined['Name']))
-            return name_to_ticker, ticker_to_name
-        except Exception:
-            return {}, {}
+def _krx():
+    """pykrx는 import만으로도 수 초가 걸려 실제 조회 시점에 로드합니다."""
+    from pykrx import stock
+    return stock
 
-    name_to_ticker = {}
-    ticker_to_name = {}
-    for t in tickers:
-        try:
-            name = stock.get_market_ticker_name(t)
-            if name:
-                name_to_ticker[name] = t
-                ticker_to_name[t] = name
-        except Exception:
-            continue
-    return name_to_ticker, ticker_to_name
+@st.cache_resource(ttl=60 * 60)
+def get_ticker_name_map():
+    """
+    (name_to_ticker, ticker_to_name) - 통합 리포트가 매일 갱신하는 종목 인덱스 파일을 읽음.
+    cache_resource라 모든 세션이 같은 dict를 공유합니다 (읽기 전용으로만 사용).
+    """
+    return ticker_index.load_ticker_index()
+
+@st.cache_resource
+def _frame_store():
+    """차트용 DataFrame 공유 저장소 (세션 간 공유, 최근 FRAME_STORE_SIZE개 유지)"""
+    return {"frames": OrderedDict(), "lock": threading.Lock()}
+
+
+def frame_key(df, *label):
+    """
+    DataFrame 식별자: (label..., 첫/마지막 인덱스, 행 수, 데이터 버전)
+    데이터 버전은 값 전체의 해시 (pandas 벡터 해시라 파이썬 루프 없음) →
+    분할/배당 수정주가처럼 중간 행만 바뀐 재조회도 다른 키가 되어 이전 차트를 재사용하지 않음
+    """
+    if df is None or df.empty:
+        return (*label, 0)
+    version = hashlib.blake2b(
+        pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes(), digest_size=16).hexdigest()
+    return (*label, str(df.index[0]), str(df.index[-1]), len(df), version)
+
+
+def put_frame(df, *label):
+    """프레임을 공유 저장소에 넣고 키 반환 (차트 캐시 함수에는 이 키만 넘김)"""
+    key = frame_key(df, *label)
+    store = _frame_store()
+    with store["lock"]:
+        store["frames"][key] = df
+        store["frames"].move_to_end(key)
+        while len(store["frames"]) > FRAME_STORE_SIZE:
+            store["frames"].popitem(last=False)
+    return key
+
+
+def get_frame(key):
+    store = _frame_store()
+    with store["lock"]:
+        return store["frames"][key]
+
+
+@st.cache_resource(ttl=60 * 60)
+def get_name_search_index():
+    """종목명 검색 인덱스 (get_ticker_name_map과 같은 주기로 한 번만 생성해 세션 간 공유)"""
+    name_to_ticker, _ = get_ticker_name_map()
+    return ticker_index.build_search_index(name_to_ticker)
 
 @st.cache_data(ttl=60 * 60)
 def get_latest_fundamental(max_lookback=10):
     for i in range(max_lookback):
         date_str = (datetime.now() - timedelta(days=i)).strftime("%Y%m%d")
         try:
-            df = stock.get_market_fundamental(date_str, market="ALL")
+            df = _krx().get_market_fundamental(date_str, market="ALL")
         except Exception:
             df = pd.DataFrame()
         if df is not None and not df.empty:
@@ -79,7 +106,7 @@ def load_price_data(ticker, start_date, end_date):
 @st.cache_data(ttl=60 * 60)
 def load_fundamental_history(ticker, start_date, end_date):
     try:
-        return stock.get_market_fundamental(start_date, end_date, ticker)
+        return _krx().get_market_fundamental(start_date, end_date, ticker)
     except Exception as e:
         st.warning(f"펀더멘탈 호출 오류: {e}")
         return pd.DataFrame()
@@ -87,7 +114,7 @@ def load_fundamental_history(ticker, start_date, end_date):
 @st.cache_data(ttl=60 * 60)
 def load_foreign_history(ticker, start_date, end_date):
     try:
-        return stock.get_exhaustion_rates_of_foreign_investment(start_date, end_date, ticker)
+        return _krx().get_exhaustion_rates_of_foreign_investment(start_date, end_date, ticker)
     except Exception as e:
         st.warning(f"외인 보유 호출 오류: {e}")
         return pd.DataFrame()
@@ -99,16 +126,64 @@ def get_rr_analysis(ticker, entry_price):
     return calc.analyze(ticker, entry_price)
 
 
+def _with_script_ctx(func):
+    """워커 스레드에서도 st.warning 등이 현재 세션에 붙도록 스크립트 컨텍스트를 넘김"""
+    try:
+        from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+    except ImportError:
+        return func
+    ctx = get_script_run_ctx()
+
+    def run(*args):
+        add_script_run_ctx(ctx=ctx)
+        return func(*args)
+    return run
+
+
+def prefetch_holdings(tickers, avg_prices, start_date, end_date, f_start_date, f_end_date,
+                      max_workers=HOLDINGS_PREFETCH_WORKERS):
+    """
+    보유종목 카드가 쓸 데이터를 종목별로 동시에 조회해 st.cache_data를 채웁니다.
+    (가격 → 손익비 분석 / 펀더멘탈 히스토리 / 외인 보유율) 카드 렌더링은 같은 인자로 캐시만 읽음.
+    :param avg_prices: {티커: 평균단가} (0 이하면 종가를 손익비 진입가로 사용, 카드와 동일)
+    """
+    def price_and_rr(ticker):
+        price_df = load_price_data(ticker, start_date, end_date)
+        if price_df.empty or "Close" not in price_df.columns:
+            return
+        avg = avg_prices.get(ticker, 0)
+        get_rr_analysis(ticker, avg if avg > 0 else float(price_df["Close"].iloc[-1]))
+
+    tasks = []
+    for t in tickers:
+        tasks.append((price_and_rr, t))
+        tasks.append((load_fundamental_history, t, f_start_date, f_end_date))
+        tasks.append((load_foreign_history, t, f_start_date, f_end_date))
+
+    started = datetime.now()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_with_script_ctx(func), *args) for func, *args in tasks]
+        wait(futures)
+    failed = sum(1 for f in futures if f.exception() is not None)
+    logging.info("holdings prefetch: %s tickers, %s calls, failed=%s, %.1fs",
+                 len(tickers), len(tasks), failed, (datetime.now() - started).total_seconds())
+
+
 @st.cache_data(ttl=60 * 60)
 def get_ai_forecasts(df, prophet_periods=30, neural_periods=5, xgb_periods=5):
-    forecast_prophet = compute_prophet_forecast(df, periods=prophet_periods)
-    forecast_np = compute_neuralprophet_forecast(df, periods=neural_periods)
-    forecast_xgb = compute_xgboost_forecast(df, periods=xgb_periods)
-    return {
-        "prophet": forecast_prophet,
-        "neural": forecast_np,
-        "xgboost": forecast_xgb,
-    }
+    """동기 예측 (요청 중 학습). 대시보드 화면은 request_ai_forecasts로 백그라운드 작업을 사용"""
+    return forecast_jobs.compute_forecasts(forecast_jobs.forecast_window(df), prophet_periods, neural_periods, xgb_periods)
+
+
+def request_ai_forecasts(ticker, df, retry=False, prophet_periods=30, neural_periods=5, xgb_periods=5):
+    """
+    저장된 예측 결과를 바로 받거나 백그라운드 학습을 제출 (대기하지 않음).
+    :return: (status, payload) - ('done', 결과) / ('pending', None) / ('error', 메시지)
+    """
+    return forecast_jobs.request_forecasts(
+        ticker, df, retry=retry,
+        prophet_periods=prophet_periods, neural_periods=neural_periods, xgb_periods=xgb_periods,
+    )
 
 def calculate_etf_data():
     etf_tickers = cfg.ETF_TICKERS
@@ -149,7 +224,8 @@ def calculate_etf_data():
         price = raw_data[n].iloc[-1] if n in raw_data.columns else 0
         all_ranks.append({'rank': i, 'name': n, 'code': code, 'score': s, 'price': price})
 
-    return {"status": status, "reason": reason, "targets": targets, "rankings": all_ranks, "raw_data_last": raw_data.iloc[-1]}
+    return {"status": status, "reason": reason, "targets": targets, "rankings": all_ranks, "raw_data_last": raw_data.iloc[-1],
+            "score_history": momentum_snapshot.score_history_from_prices('etf', raw_data, [r["name"] for r in all_ranks])}
 
 def calculate_stock_data():
     try:
@@ -195,7 +271,8 @@ def calculate_stock_data():
         price = raw_data[n].iloc[-1] if n in raw_data.columns else 0
         all_ranks.append({'rank': i, 'name': n, 'code': code, 'score': s, 'price': price})
 
-    return {"status": status, "reason": reason, "targets": targets, "rankings": all_ranks, "raw_data_last": raw_data.iloc[-1], "tickers_map": tickers}
+    return {"status": status, "reason": reason, "targets": targets, "rankings": all_ranks, "raw_data_last": raw_data.iloc[-1], "tickers_map": tickers,
+            "score_history": momentum_snapshot.score_history_from_prices('stock', raw_data, [r["name"] for r in all_ranks])}
 
 def calculate_us_data():
     try:
@@ -238,9 +315,15 @@ def calculate_us_data():
         price = raw_data[n].iloc[-1] if n in raw_data.columns else 0
         all_ranks.append({'rank': i, 'name': n, 'code': n, 'score': s, 'price': price})
 
-    return {"status": status, "reason": reason, "targets": targets, "rankings": all_ranks, "raw_data_last": raw_data.iloc[-1]}
+    return {"status": status, "reason": reason, "targets": targets, "rankings": all_ranks, "raw_data_last": raw_data.iloc[-1],
+            "score_history": momentum_snapshot.score_history_from_prices('us', raw_data, [r["name"] for r in all_ranks])}
 
-def normalize_holdings(raw_input, name_to_ticker):
+def normalize_holdings(raw_input, name_to_ticker, search_index=None):
+    """
+    입력 문자열(쉼표/줄바꿈/공백 구분) → (종목코드 리스트, 해석 못 한 항목)
+    6자리 코드는 그대로, 이름은 정확 일치 → 검색 인덱스 최상위 결과(부분일치·초성·코드 접두) 순으로 해석.
+    :param search_index: ticker_index.build_search_index 결과 (없으면 name_to_ticker로 생성)
+    """
     tokens = (
         raw_input.replace(",", " ")
     .replace("\n", " ")
@@ -248,6 +331,8 @@ def normalize_holdings(raw_input, name_to_ticker):
         .split(" ")
     )
     tokens = [t.strip() for t in tokens if t.strip()]
+    if search_index is None:
+        search_index = ticker_index.build_search_index(name_to_ticker)
 
     resolved = []
     unresolved = []
@@ -261,10 +346,10 @@ def normalize_holdings(raw_input, name_to_ticker):
             resolved.append(name_to_ticker[item])
             continue
 
-        # 부분 일치 검색
-        partial = [name for name in name_to_ticker.keys() if item in name]
-        if partial:
-            resolved.append(name_to_ticker[partial[0]])
+        # 부분 일치/초성/코드 접두 검색 (순위 최상위 1개)
+        matches = ticker_index.search_names(search_index, item, limit=1)
+        if matches:
+            resolved.append(matches[0][1])
         else:
             unresolved.append(item)
 
@@ -0,0 +1,265 @@
+# forecast_jobs.py
+"""
+AI 예측(Prophet / NeuralProphet / XGBoost) 백그라운드 작업 큐.
+- 학습은 별도 프로세스 풀(FORECAST_WORKERS)에서 실행 → Streamlit 요청은 막히지 않음
+- 학습 구간은 최근 FORECAST_BARS개 봉으로 고정 (화면마다 조회 시작일이 달라도 같은 결과 재사용)
+- 결과는 (티커, 마지막 봉 날짜, 봉 수, 예측 기간) 키로 FORECAST_DIR에 저장 → 재시작 후에도 재사용
+- 워커 프로세스가 죽어(메모리 부족 등) 풀이 망가지면 새 풀을 만들어 다시 제출
+- 대시보드는 request_forecasts()로 저장된 결과를 바로 받거나 'pending' 상태만 확인
+- 보유종목 미리 계산은 NeuralProphet/XGBoost를 전 종목 한 모델로 학습 (Prophet은 종목별)
+
+사용법 (보유종목 예측 미리 계산, 야간 스케줄러용):
+    python forecast_jobs.py
+"""
+
+import os
+import glob
+import time
+import pickle
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from dashboard_config import FORECAST_DIR, FORECAST_WORKERS, FORECAST_KEEP_DAYS, FORECAST_BARS, XGB_MODEL_DIR
+
+DEFAULT_PERIODS = {'prophet_periods': 30, 'neural_periods': 5, 'xgb_periods': 5}
+
+_executor = None
+_pending = {}  # key -> Future (이 프로세스에서 제출한 작업)
+_lock = threading.RLock()
+
+
+def compute_forecasts(df, prophet_periods=30, neural_periods=5, xgb_periods=5):
+    """세 모델 예측을 동기 실행 (워커 프로세스와 get_ai_forecasts 공용)"""
+    # prophet / neuralprophet(torch) / xgboost는 예측을 요청할 때만 로드
+    from chart_plotting import (
+        compute_prophet_forecast,
+        compute_neuralprophet_forecast,
+        compute_xgboost_forecast,
+    )
+
+    return {
+        "prophet": compute_prophet_forecast(df, periods=prophet_periods),
+        "neural": compute_neuralprophet_forecast(df, periods=neural_periods),
+        "xgboost": compute_xgboost_forecast(df, periods=xgb_periods),
+    }
+
+
+def compute_batch_forecasts(frames, prophet_periods=30, neural_periods=5, xgb_periods=5, xgb_path=None):
+    """
+    여러 종목 일괄 예측: NeuralProphet/XGBoost는 전 종목을 한 모델로 학습, Prophet은 종목별.
+    :param frames: {티커: forecast_window()로 자른 가격 DataFrame}
+    :param xgb_path: 교차 종목 XGBoost 모델 저장/재사용 경로
+    :return: {티커: 결과 dict 또는 {'error'}}
+    """
+    from chart_plotting import (
+        compute_prophet_forecast,
+        compute_neuralprophet_forecasts,
+        compute_xgboost_forecasts,
+    )
+
+    neural = compute_neuralprophet_forecasts(frames, periods=neural_periods)
+    xgb = compute_xgboost_forecasts(frames, periods=xgb_periods, path=xgb_path)
+    results = {}
+    for ticker, df in frames.items():
+        if ticker not in neural or ticker not in xgb:
+            results[ticker] = {"error": "예측을 위한 데이터가 부족합니다."}
+            continue
+        try:
+            results[ticker] = {
+                "prophet": compute_prophet_forecast(df, periods=prophet_periods),
+                "neural": neural[ticker],
+                "xgboost": xgb[ticker],
+            }
+        except Exception as e:
+            results[ticker] = {"error": str(e)}
+    return results
+
+
+def forecast_window(df, bars=FORECAST_BARS):
+    """학습 구간: 최근 bars개 봉 (조회 시작일이 하루 밀려도 구간이 바뀌지 않음)"""
+    return df.sort_index().tail(bars)
+
+
+def forecast_key(ticker, df, prophet_periods=30, neural_periods=5, xgb_periods=5):
+    """결과 파일 키: 티커 + 학습 구간(마지막 봉, 봉 수) + 예측 기간. df는 forecast_window()로 자른 프레임"""
+    return (f"{ticker}_{df.index.max():%Y%m%d}_b{len(df)}"
+            f"_p{prophet_periods}_n{neural_periods}_x{xgb_periods}")
+
+
+def _path(key):
+    return os.path.join(FORECAST_DIR, f"{key}.pkl")
+
+
+def load_forecast(key):
+    """저장된 결과 ({'prophet','neural','xgboost'} 또는 {'error'}), 없으면 None"""
+    path = _path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def _save(key, result):
+    os.makedirs(FORECAST_DIR, exist_ok=True)
+    tmp = _path(key) + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(result, f)
+    os.replace(tmp, _path(key))
+
+
+def _run_job(key, ticker, df, periods):
+    """워커 프로세스: 학습 후 결과(또는 오류)를 파일로 저장"""
+    try:
+        result = compute_forecasts(df, **periods)
+    except Exception as e:
+        result = {"error": str(e)}
+    result["created"] = datetime.now().isoformat(timespec="seconds")
+    _save(key, result)
+    return "error" not in result
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=FORECAST_WORKERS)
+        return _executor
+
+
+def _reset_executor():
+    """망가진 풀(워커 비정상 종료) 폐기 → 다음 제출 때 새로 생성"""
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _submit(key, ticker, df, periods):
+    """작업 제출, 풀이 망가졌으면 새 풀로 한 번 더 시도"""
+    for attempt in range(2):
+        try:
+            return _get_executor().submit(_run_job, key, ticker, df, periods)
+        except BrokenProcessPool:
+            print(f"⚠️ 예측 작업 풀이 중단되어 다시 만듭니다 ({ticker})")
+            _reset_executor()
+            if attempt:
+                raise
+
+
+def request_forecasts(ticker, df, retry=False, **periods):
+    """
+    저장된 예측을 바로 반환하거나, 없으면 백그라운드 작업을 제출합니다 (대기하지 않음).
+    :param retry: 저장된 오류 결과를 지우고 다시 계산
+    :return: (status, payload) - ('done', 결과 dict) / ('pending', None) / ('error', 메시지)
+    """
+    periods = {**DEFAULT_PERIODS, **periods}
+    df = forecast_window(df)
+    key = forecast_key(ticker, df, **periods)
+
+    with _lock:  # 여러 세션이 같은 종목을 동시에 요청해도 작업은 한 번만 제출
+        future = _pending.get(key)
+        if future is not None:
+            if not future.done():
+                return "pending", None
+            _pending.pop(key)
+            error = future.exception()
+            if isinstance(error, BrokenProcessPool):
+                # 작업 중 워커가 죽음 (메모리 부족 등) → 풀은 새로 만들고, 이 작업은 오류로 남겨 '다시 계산'으로만 재시도
+                _reset_executor()
+                error = f"예측 작업 프로세스가 비정상 종료되었습니다: {error}"
+                _save(key, {"error": error, "created": datetime.now().isoformat(timespec="seconds")})
+            if error is not None:
+                return "error", str(error)
+
+        result = load_forecast(key)
+        if result is not None and "error" in result and retry:
+            os.remove(_path(key))
+            result = None
+        if result is not None:
+            if "error" in result:
+                return "error", result["error"]
+            return "done", result
+
+        try:
+            _pending[key] = _submit(key, ticker, df.copy(), periods)
+        except BrokenProcessPool as e:
+            return "error", f"예측 작업 풀 오류: {e}"
+    return "pending", None
+
+
+def prune_forecasts(keep_days=FORECAST_KEEP_DAYS):
+    """
+    keep_days보다 오래된 결과/모델 파일 삭제 (마지막 봉이 바뀌면 키가 바뀌어 옛 파일은 다시 읽히지 않음)
+    """
+    cutoff = time.time() - keep_days * 86400
+    removed = 0
+    for path in glob.glob(os.path.join(FORECAST_DIR, "*.pkl")) + glob.glob(os.path.join(XGB_MODEL_DIR, "*.pkl")):
+        if os.path.getmtime(path) < cutoff:
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+def _cross_model_path(frames):
+    """교차 종목 XGBoost 모델 파일 (마지막 봉 + 종목 구성별, 같은 날 다시 실행하면 재사용)"""
+    last = max(df.index.max() for df in frames.values())
+    digest = hashlib.md5(",".join(sorted(frames)).encode()).hexdigest()[:8]
+    return os.path.join(XGB_MODEL_DIR, f"cross_{last:%Y%m%d}_n{len(frames)}_{digest}.pkl")
+
+
+def precompute_holdings(lookback_days=365):
+    """
+    보유종목 전체 예측을 미리 계산 (보유종목 카드와 같은 키로 저장 → 다음 날 화면에서 바로 사용).
+    이미 저장된 결과는 건너뛰고, 나머지는 compute_batch_forecasts로 한 번에 학습합니다.
+    """
+    import FinanceDataReader as fdr
+    from session_management import load_holdings_from_disk
+
+    tickers = [str(r.get("티커", "")).strip() for r in load_holdings_from_disk()]
+    tickers = list(dict.fromkeys(t for t in tickers if t))
+    if not tickers:
+        print("⚠️ 저장된 보유종목이 없습니다.")
+        return
+
+    end_date = datetime.now().strftime("%Y-%m-%d")
+    start_date = (datetime.now() - timedelta(days=lookback_days)).strftime("%Y-%m-%d")
+    print(f"🔮 보유종목 {len(tickers)}개 예측 미리 계산 ({start_date} ~ {end_date})")
+
+    frames, keys = {}, {}
+    for t in tickers:
+        try:
+            df = fdr.DataReader(t, start=start_date, end=end_date)
+        except Exception as e:
+            print(f"⚠️ {t} 가격 조회 실패: {e}")
+            continue
+        if df.empty:
+            continue
+        df = forecast_window(df)
+        key = forecast_key(t, df, **DEFAULT_PERIODS)
+        stored = load_forecast(key)
+        if stored is not None and "error" not in stored:
+            print(f"  - {t}: 저장된 결과 사용")
+            continue
+        frames[t], keys[t] = df, key
+
+    if frames:
+        try:
+            results = compute_batch_forecasts(frames, xgb_path=_cross_model_path(frames), **DEFAULT_PERIODS)
+        except Exception as e:
+            results = {t: {"error": str(e)} for t in frames}
+        created = datetime.now().isoformat(timespec="seconds")
+        for t, result in results.items():
+            _save(keys[t], {**result, "created": created})
+            print(f"  - {t}: {'❌ 실패 (' + result['error'] + ')' if 'error' in result else '✅ 완료'}")
+    print(f"🧹 오래된 예측/모델 {prune_forecasts()}개 삭제")
+
+
+if __name__ == "__main__":
+    precompute_holdings()
@@ -1,49 +1,92 @@
 # session_management.py
 
 import streamlit as st
-import json
 import os
-import pickle
+import sys
 from datetime import datetime, timedelta, timezone
 
 # Assuming dashboard_config is in the same directory
-from dashboard_config import MOMENTUM_DATA_FILE, HOLDINGS_FILE
+from dashboard_config import DASHBOARD_DB_FILE, MOMENTUM_DATA_FILE, HOLDINGS_FILE, RANKINGS_DISPLAY_LIMIT
+
+# 통합 리포트가 발행하는 모멘텀 스냅샷 / 대시보드 저장소 (상위 디렉토리 모듈)
+ROOT_DIR = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
+import config as cfg  # noqa: E402
+import momentum_snapshot  # noqa: E402
+import dashboard_store  # noqa: E402
+
+_legacy_checked = False
+
+def _store_path():
+    """저장소 경로 (프로세스당 처음 한 번 예전 pickle/json 파일을 가져옴)"""
+    global _legacy_checked
+    if not _legacy_checked:
+        _legacy_checked = True
+        try:
+            dashboard_store.import_legacy(DASHBOARD_DB_FILE, MOMENTUM_DATA_FILE, HOLDINGS_FILE)
+        except Exception as e:
+            print(f"⚠️ 기존 저장 파일 가져오기 실패: {e}")
+    return DASHBOARD_DB_FILE
 
 def load_holdings_from_disk():
-    if os.path.exists(HOLDINGS_FILE):
-        try:
-            with open(HOLDINGS_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            if isinstance(data, list):
-                return data
-        except Exception:
-            pass
-    return []
+    try:
+        return dashboard_store.load_holdings(_store_path())
+    except Exception:
+        return []
 
 def save_holdings_to_disk(rows):
     try:
-        with open(HOLDINGS_FILE, "w", encoding="utf-8") as f:
-            json.dump(rows, f, ensure_ascii=False, indent=2)
+        dashboard_store.save_holdings(_store_path(), rows)
         return True
     except Exception:
         return False
 
-def save_momentum_data_to_disk(data):
+def save_momentum_section_to_disk(target_sector, new_part):
+    """한 섹션만 저장 (다른 섹션은 다시 쓰지 않음)"""
     try:
-        with open(MOMENTUM_DATA_FILE, "wb") as f:
-            pickle.dump(data, f)
+        dashboard_store.save_section(_store_path(), target_sector, new_part)
         return True
     except Exception:
         return False
 
-def load_momentum_data_from_disk():
-    if os.path.exists(MOMENTUM_DATA_FILE):
-        try:
-            with open(MOMENTUM_DATA_FILE, "rb") as f:
-                return pickle.load(f)
-        except Exception:
-            return None
-    return None
+def load_momentum_data_from_disk(rankings_limit=RANKINGS_DISPLAY_LIMIT):
+    """화면에 필요한 만큼만 읽음 (순위 상위 rankings_limit개, 목표 종목 가격/코드)"""
+    try:
+        return dashboard_store.load_sections(_store_path(), rankings_limit=rankings_limit)
+    except Exception:
+        return None
+
+def load_score_history_from_disk(target_sector):
+    """섹션의 점수 추이 (카드의 점수 추이를 펼칠 때만 읽음)"""
+    try:
+        return dashboard_store.load_score_history(_store_path(), target_sector)
+    except Exception:
+        return None
+
+def refresh_from_snapshot(force=False):
+    """스냅샷 파일이 바뀌었으면(또는 force) 세션의 모멘텀 데이터를 다시 구성. 파일 확인은 stat 1회"""
+    stamp = momentum_snapshot.snapshot_stamp()
+    if not force and stamp == st.session_state.get('snapshot_stamp'):
+        return False
+    st.session_state['snapshot_stamp'] = stamp
+    st.session_state['cached_data'] = momentum_snapshot.merge_dashboard_data(
+        momentum_snapshot.load_snapshot(), load_momentum_data_from_disk()
+    )
+    return True
+
+if hasattr(st, 'fragment'):
+    @st.fragment(run_every=cfg.MOMENTUM_SNAPSHOT_POLL_SEC)
+    def _poll_snapshot():
+        if momentum_snapshot.snapshot_stamp() != st.session_state.get('snapshot_stamp'):
+            st.rerun()
+else:
+    def _poll_snapshot():
+        pass
+
+def watch_snapshot():
+    """열려 있는 화면도 새 스냅샷이 발행되면 자동으로 다시 그림 (st.fragment 지원 버전에서만)"""
+    _poll_snapshot()
 
 def initialize_session_state():
     if "holdings" not in st.session_state:
@@ -52,12 +95,8 @@ def initialize_session_state():
     if "holdings_query" not in st.session_state:
         st.session_state["holdings_query"] = False
 
-    if 'cached_data' not in st.session_state:
-        loaded_data = load_momentum_data_from_disk()
-        if loaded_data:
-            st.session_state['cached_data'] = loaded_data
-        else:
-            st.session_state['cached_data'] = {'etf': None, 'stock': None, 'us': None, 'last_update': '-'}
+    # 모멘텀 데이터: 스냅샷 + 장중 수동 갱신 저장본 (스냅샷 파일이 바뀌면 다시 합침)
+    refresh_from_snapshot(force='cached_data' not in st.session_state)
 
     if 'ticker_for_rr' not in st.session_state:
         st.session_state['ticker_for_rr'] = ""
@@ -89,11 +128,12 @@ def sync_use_candlestick(src_key):
 def update_momentum_cache(target_sector, new_part):
     current_data = st.session_state['cached_data']
     if new_part:
-        current_data[target_sector] = new_part
         kst = timezone(timedelta(hours=9))
-        current_data['last_update'] = datetime.now(kst).strftime('%Y-%m-%d %H:%M:%S')
+        new_part['updated'] = datetime.now(kst).strftime('%Y-%m-%d %H:%M:%S')
+        current_data[target_sector] = new_part
+        current_data['last_update'] = new_part['updated']
 
-        if save_momentum_data_to_disk(current_data):
+        if save_momentum_section_to_disk(target_sector, new_part):
             st.session_state['cached_data'] = current_data
             return True
     return False
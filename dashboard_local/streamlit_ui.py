@@ -6,7 +6,7 @@ import os
 import sys
 from streamlit_extras.stylable_container import stylable_container
 
-from session_management import set_analysis_target # noqa: E402
+from session_management import set_analysis_target, load_score_history_from_disk # noqa: E402
 
 # Adjust path to import config from parent directory
 ROOT_DIR = os.path.dirname(os.path.abspath(os.path.dirname(__file__)))
@@ -24,8 +24,6 @@ def render_support_resistance_and_forecast(ticker, price_df, name=None, key_suff
         key_suffix: 세션 상태 키 구분용 접미사
         plot_candlestick: 봉차트 사용 여부
     """
-    from data_utilities import get_ai_forecasts
-    
     if name is None:
         name = ticker
     
@@ -71,29 +69,8 @@ def render_support_resistance_and_forecast(ticker, price_df, name=None, key_suff
     st.divider()
     st.markdown("**📈 AI 예측 모델 (30일)**")
 
-    # AI 예측 캐싱
-    ai_cache_key = f"ai_forecast_cache_{key_suffix}_{ticker}"
-    ai_sig = (
-        len(price_df),
-        str(price_df.index.max()),
-        float(price_df['Close'].iloc[-1])
-    )
-
-    cache_entry = st.session_state.get(ai_cache_key)
-    if cache_entry is None or cache_entry.get("sig") != ai_sig:
-        try:
-            with st.spinner("AI 모델 계산 중..."):
-                forecasts = get_ai_forecasts(price_df, prophet_periods=30, neural_periods=5, xgb_periods=5)
-            st.session_state[ai_cache_key] = {
-                "sig": ai_sig,
-                **forecasts,
-            }
-        except Exception as e:
-            st.error(f"예측 실패: {e}")
-            st.session_state[ai_cache_key] = None
-
-    if ai_cache_key in st.session_state and st.session_state[ai_cache_key]:
-        cached = st.session_state[ai_cache_key]
+    cached = ai_forecast_status(ticker, price_df, key=f"{key_suffix}_{ticker}")
+    if cached:
         from chart_plotting import build_forecast_chart
 
         col1, col2 = st.columns(2)
@@ -131,6 +108,29 @@ def render_support_resistance_and_forecast(ticker, price_df, name=None, key_suff
             except Exception as e:
                 st.error(f"예측 실패: {e}")
 
+def ai_forecast_status(ticker, price_df, key):
+    """
+    AI 예측 결과를 기다리지 않고 조회 (forecast_jobs 백그라운드 작업).
+    저장된 결과가 있으면 반환하고, 계산 중/실패면 상태와 버튼만 표시한 뒤 None 반환.
+    """
+    from data_utilities import request_ai_forecasts
+
+    retry = st.session_state.pop(f"ai_forecast_retry_{key}", False)
+    status, payload = request_ai_forecasts(ticker, price_df, retry=retry, prophet_periods=30, neural_periods=5, xgb_periods=5)
+    if status == "done":
+        return payload
+
+    c1, c2 = st.columns([4, 1])
+    if status == "pending":
+        c1.info("⏳ AI 모델 계산 중입니다 (백그라운드). 잠시 후 새로고침하세요.")
+        c2.button("새로고침", key=f"ai_forecast_refresh_{key}")
+    else:
+        c1.error(f"예측 실패: {payload}")
+        if c2.button("다시 계산", key=f"ai_forecast_retry_btn_{key}"):
+            st.session_state[f"ai_forecast_retry_{key}"] = True
+            st.rerun()
+    return None
+
 def ui_card_header(title, status, reason):
     color = "red" if "상승" in status else "orange" if "중립" in status else "blue"
     icon = "🔴" if "상승" in status else "🟠" if "중립" in status else "🔵"
@@ -241,4 +241,13 @@ def render_left_card(title, data, asset_type):
             if data['rankings']:
                 ui_ranking_list(data['rankings'], is_us=is_us_asset, limit=50)
             else:
-                st.info("순위 데이터가 없습니다.")
\ No newline at end of file
+                st.info("순위 데이터가 없습니다.")
+
+        with st.expander("📈 점수 추이 (최근 60거래일)"):
+            # 저장본에서 읽은 섹션에는 점수 추이가 없으므로 펼칠 때 따로 읽음
+            history = data['score_history'] if 'score_history' in data else load_score_history_from_disk(asset_type)
+            names = [n for n, _ in data['targets'] if history is not None and n in history.columns]
+            if names:
+                st.line_chart(history[names])
+            else:
+                st.info("점수 추이 데이터가 없습니다.")
\ No newline at end of file
@@ -2,7 +2,6 @@
 
 import pandas as pd
 import numpy as np
-from scipy.signal import argrelextrema
 from datetime import datetime, timedelta
 import FinanceDataReader as fdr
 
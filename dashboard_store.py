@@ -0,0 +1,295 @@
+# dashboard_store.py
+"""
+대시보드 로컬 저장소 (SQLite, WAL 모드).
+장중 수동 갱신한 모멘텀 섹션과 보유종목을 표 단위로 저장합니다. (dashboard/, dashboard_local/ 공용)
+- 섹션 갱신은 해당 섹션의 행만 한 트랜잭션으로 교체 → 다른 섹션은 다시 쓰지 않음
+- WAL 모드라 읽는 쪽(다른 세션/프로세스)은 쓰는 중에도 막히지 않고 항상 커밋된 상태만 봄
+- 화면 시작 시에는 카드에 필요한 만큼만 읽음 (순위 상위 N개, 목표 종목의 가격/코드)
+- 시계열(score_history)은 섹션별 열 지향 파일(parquet, pyarrow가 없으면 pickle)로 따로 저장
+  새 버전 파일을 먼저 쓰고, 섹션 행과 같은 트랜잭션에서 sections.history에 그 버전을 기록
+  → 읽는 쪽은 항상 커밋된 순위와 짝이 맞는 시계열을 보고, 중간에 중단돼도 이전 짝이 그대로 남음
+
+테이블:
+    sections (kind, status, reason, updated, market_index_val, history)  # history: 시계열 파일 버전
+    targets  (kind, pos, name, weight)
+    rankings (kind, rank, name, code, score, price)
+    assets   (kind, name, code, price)          # raw_data_last / tickers_map
+    holdings (pos, ticker, name, qty, avg_price, memo, deleted)
+    meta     (key, value)
+"""
+
+import os
+import json
+import math
+import pickle
+import sqlite3
+import threading
+import uuid
+from contextlib import closing
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401  (parquet 엔진)
+    _SERIES_EXT = '.parquet'
+except ImportError:
+    _SERIES_EXT = '.pkl'
+
+SECTIONS = ('etf', 'stock', 'us')
+HOLDING_KEYS = ('티커', '종목명', '보유수량', '평균단가', '메모', '삭제')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sections (
+    kind TEXT PRIMARY KEY, status TEXT, reason TEXT, updated TEXT, market_index_val REAL, history TEXT);
+CREATE TABLE IF NOT EXISTS targets (
+    kind TEXT, pos INTEGER, name TEXT, weight REAL, PRIMARY KEY (kind, pos));
+CREATE TABLE IF NOT EXISTS rankings (
+    kind TEXT, rank INTEGER, name TEXT, code TEXT, score REAL, price REAL, PRIMARY KEY (kind, rank));
+CREATE TABLE IF NOT EXISTS assets (
+    kind TEXT, name TEXT, code TEXT, price REAL, PRIMARY KEY (kind, name));
+CREATE TABLE IF NOT EXISTS holdings (
+    pos INTEGER PRIMARY KEY, ticker TEXT, name TEXT, qty REAL, avg_price REAL, memo TEXT, deleted INTEGER);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+_ready = set()  # 스키마를 확인한 DB 경로 (프로세스당 1회)
+_ready_lock = threading.Lock()
+
+
+def connect(path):
+    """WAL 모드 연결 (쓰기 잠금은 최대 10초 대기). 호출부에서 닫아야 합니다."""
+    if path not in _ready:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=10)
+    conn.execute('PRAGMA synchronous=NORMAL')
+    with _ready_lock:
+        if path not in _ready:
+            conn.execute('PRAGMA journal_mode=WAL')  # DB 파일에 유지되는 설정
+            conn.executescript(_SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(sections)")}
+            if 'history' not in columns:  # 이전 스키마 DB
+                conn.execute("ALTER TABLE sections ADD COLUMN history TEXT")
+            _ready.add(path)
+    return conn
+
+
+def _num(value):
+    """숫자 → float (NaN/빈 값은 None, SQLite NULL로 저장)"""
+    if value is None:
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+def _nan(value):
+    return float('nan') if value is None else value
+
+
+# --- 시계열 파일 (score_history) ---
+def _series_path(path, kind, version=None):
+    suffix = f"_{version}" if version else ''  # 버전이 없으면 예전(버전 도입 전) 파일 이름
+    return f"{os.path.splitext(path)[0]}_{kind}_score_history{suffix}{_SERIES_EXT}"
+
+
+def _save_series(path, kind, frame):
+    """새 버전 파일로 저장 (원자적 교체) → 버전 문자열, 저장할 시계열이 없으면 None"""
+    if frame is None or frame.empty:
+        return None
+    version = uuid.uuid4().hex[:12]
+    target = _series_path(path, kind, version)
+    tmp = target + '.tmp'
+    if _SERIES_EXT == '.parquet':
+        frame.to_parquet(tmp)
+    else:
+        with open(tmp, 'wb') as f:
+            pickle.dump(frame, f)
+    os.replace(tmp, target)
+    return version
+
+
+def _remove_series(path, kind, version):
+    """교체된 이전 버전 파일 삭제 (이미 없으면 무시)"""
+    try:
+        os.remove(_series_path(path, kind, version))
+    except OSError:
+        pass
+
+
+def load_score_history(path, kind):
+    """섹션의 점수 히스토리 (없으면 None). 카드 화면에는 필요 없어 load_sections와 따로 읽음"""
+    if not os.path.exists(path):
+        return None
+    with closing(connect(path)) as conn:
+        row = conn.execute("SELECT history FROM sections WHERE kind = ?", (kind,)).fetchone()
+    if row is None:
+        return None
+    target = _series_path(path, kind, row[0])
+    if not os.path.exists(target):
+        return None
+    try:
+        if _SERIES_EXT == '.parquet':
+            return pd.read_parquet(target)
+        with open(target, 'rb') as f:
+            return pickle.load(f)
+    except Exception as e:
+        print(f"⚠️ [{kind}] 점수 히스토리 로드 실패: {e}")
+        return None
+
+
+# --- 모멘텀 섹션 ---
+def save_section(path, kind, section):
+    """
+    한 섹션만 교체 저장 (한 트랜잭션, 다른 섹션 행은 건드리지 않음)
+    :param section: 대시보드 섹션 dict ('status', 'reason', 'targets', 'rankings', 'raw_data_last', ...)
+    """
+    raw_last = section.get('raw_data_last')
+    prices = {} if raw_last is None else {str(n): _num(p) for n, p in raw_last.items()}
+    codes = section.get('tickers_map') or {}
+    assets = [(kind, name, codes.get(name), prices.get(name)) for name in prices.keys() | codes.keys()]
+
+    history = _save_series(path, kind, section.get('score_history'))  # 행 커밋 전에 새 버전 파일부터
+    try:
+        with closing(connect(path)) as conn, conn:
+            conn.execute("BEGIN IMMEDIATE")  # 이전 버전 조회 ~ 교체를 다른 쓰기와 겹치지 않게
+            row = conn.execute("SELECT history FROM sections WHERE kind = ?", (kind,)).fetchone()
+            for table in ('sections', 'targets', 'rankings', 'assets'):
+                conn.execute(f"DELETE FROM {table} WHERE kind = ?", (kind,))
+            conn.execute(
+                "INSERT INTO sections (kind, status, reason, updated, market_index_val, history) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (kind, section.get('status'), section.get('reason'), section.get('updated'),
+                 _num(section.get('market_index_val')), history),
+            )
+            conn.executemany(
+                "INSERT INTO targets VALUES (?, ?, ?, ?)",
+                [(kind, i, name, _num(weight)) for i, (name, weight) in enumerate(section.get('targets') or [])],
+            )
+            conn.executemany(
+                "INSERT INTO rankings VALUES (?, ?, ?, ?, ?, ?)",
+                [(kind, int(r['rank']), r['name'], None if r.get('code') is None else str(r['code']),
+                  _num(r.get('score')), _num(r.get('price')))
+                 for r in section.get('rankings') or []],
+            )
+            conn.executemany("INSERT INTO assets VALUES (?, ?, ?, ?)", assets)
+    except Exception:
+        if history:
+            _remove_series(path, kind, history)  # 커밋되지 않은 새 버전 파일 정리
+        raise
+    if row is not None and (row[0] != history or history is None):
+        _remove_series(path, kind, row[0])  # 커밋 후에만 삭제 → 읽는 쪽은 이전 짝 또는 새 짝만 봄
+
+
+def load_sections(path, kinds=SECTIONS, rankings_limit=None):
+    """
+    저장된 섹션 읽기 → {'etf': 섹션 또는 None, ..., 'last_update'}
+    :param rankings_limit: 순위는 상위 N개만 (None이면 전체)
+    raw_data_last / tickers_map은 rankings_limit이 있으면 목표 종목 것만 읽음 (카드 표시에 필요한 만큼)
+    """
+    data = {kind: None for kind in kinds}
+    if not os.path.exists(path):
+        data['last_update'] = '-'
+        return data
+
+    limit = -1 if rankings_limit is None else int(rankings_limit)
+    with closing(connect(path)) as conn:
+        rows = conn.execute(
+            f"SELECT kind, status, reason, updated, market_index_val FROM sections "
+            f"WHERE kind IN ({','.join('?' * len(kinds))})", tuple(kinds),
+        ).fetchall()
+        for kind, status, reason, updated, market_index_val in rows:
+            targets = conn.execute(
+                "SELECT name, weight FROM targets WHERE kind = ? ORDER BY pos", (kind,)).fetchall()
+            rankings = [
+                {'rank': rank, 'name': name, 'code': code, 'score': _nan(score), 'price': _nan(price)}
+                for rank, name, code, score, price in conn.execute(
+                    "SELECT rank, name, code, score, price FROM rankings WHERE kind = ? ORDER BY rank LIMIT ?",
+                    (kind, limit))
+            ]
+            if rankings_limit is None:
+                assets = conn.execute("SELECT name, code, price FROM assets WHERE kind = ?", (kind,)).fetchall()
+            else:
+                assets = conn.execute(
+                    "SELECT name, code, price FROM assets WHERE kind = ? "
+                    "AND name IN (SELECT name FROM targets WHERE kind = ?)", (kind, kind)).fetchall()
+
+            section = {
+                'status': status, 'reason': reason, 'updated': updated, 'market_index_val': market_index_val,
+                'targets': targets, 'rankings': rankings,
+                'raw_data_last': pd.Series({n: _nan(p) for n, _, p in assets}, dtype=float),
+            }
+            if kind == 'stock':
+                section['tickers_map'] = {n: c for n, c, _ in assets if c is not None}
+            data[kind] = section
+
+    stamps = [s['updated'] for s in data.values() if s and s.get('updated')]
+    data['last_update'] = max(stamps) if stamps else '-'
+    return data
+
+
+# --- 보유종목 ---
+def _holding_row(pos, row):
+    return (pos, str(row.get('티커') or '').strip(), row.get('종목명'), _num(row.get('보유수량')),
+            _num(row.get('평균단가')), row.get('메모'), int(bool(row.get('삭제'))))
+
+
+def load_holdings(path):
+    """보유종목 행 목록 (대시보드 표 형식: 티커/종목명/보유수량/평균단가/메모/삭제)"""
+    if not os.path.exists(path):
+        return []
+    with closing(connect(path)) as conn:
+        rows = conn.execute(
+            "SELECT ticker, name, qty, avg_price, memo, deleted FROM holdings ORDER BY pos").fetchall()
+    return [dict(zip(HOLDING_KEYS, (*row[:-1], bool(row[-1])))) for row in rows]
+
+
+def save_holdings(path, rows):
+    """보유종목 저장: 바뀐 행만 갱신하고 줄어든 행은 삭제 (한 트랜잭션)"""
+    new = [_holding_row(pos, row) for pos, row in enumerate(rows)]
+    with closing(connect(path)) as conn, conn:
+        old = {r[0]: r for r in conn.execute("SELECT * FROM holdings")}
+        changed = [r for r in new if old.get(r[0]) != r]
+        conn.executemany("INSERT OR REPLACE INTO holdings VALUES (?, ?, ?, ?, ?, ?, ?)", changed)
+        conn.execute("DELETE FROM holdings WHERE pos >= ?", (len(new),))
+    return len(changed)
+
+
+# --- 기존 파일(pickle/json) 1회 가져오기 ---
+def import_legacy(path, momentum_file=None, holdings_file=None):
+    """
+    예전 저장 파일(모멘텀 pickle, 보유종목 json)을 처음 한 번만 가져옵니다. 원본 파일은 그대로 둡니다.
+    :return: 가져온 항목 이름 목록
+    """
+    with closing(connect(path)) as conn:
+        done = {k for (k,) in conn.execute("SELECT key FROM meta WHERE key LIKE 'imported:%'")}
+
+    imported = []
+    if momentum_file and 'imported:momentum' not in done and os.path.exists(momentum_file):
+        try:
+            with open(momentum_file, 'rb') as f:
+                legacy = pickle.load(f) or {}
+            for kind in SECTIONS:
+                if legacy.get(kind):
+                    section = dict(legacy[kind])
+                    section.setdefault('updated', legacy.get('last_update'))
+                    save_section(path, kind, section)
+            imported.append('momentum')
+        except Exception as e:
+            print(f"⚠️ 기존 모멘텀 데이터 가져오기 실패: {e}")
+    if holdings_file and 'imported:holdings' not in done and os.path.exists(holdings_file):
+        try:
+            with open(holdings_file, 'r', encoding='utf-8') as f:
+                rows = json.load(f)
+            if isinstance(rows, list):
+                save_holdings(path, rows)
+            imported.append('holdings')
+        except Exception as e:
+            print(f"⚠️ 기존 보유종목 가져오기 실패: {e}")
+
+    if imported:
+        with closing(connect(path)) as conn, conn:
+            conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, '1')", [(f"imported:{k}",) for k in imported])
+        print(f"✅ 기존 저장 파일을 대시보드 DB로 가져옴: {', '.join(imported)}")
+    return imported
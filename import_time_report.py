@@ -0,0 +1,111 @@
+# import_time_report.py
+"""
+각 실행 진입점의 import 시간을 측정합니다.
+진입점마다 새 파이썬 프로세스를 `-X importtime`으로 띄워 모듈 로드(모듈 최상단 코드 실행)에 걸린 시간과
+가장 무거운 최상위 패키지를 출력합니다. (봇/대시보드 콜드 스타트 점검용)
+
+사용법:
+    python import_time_report.py            # 전체 진입점
+    python import_time_report.py mosig_bot.py dashboard_local/data_utilities.py
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 측정 대상 진입점 (대시보드 app.py는 streamlit 런타임이 필요해 구성 모듈 단위로 측정)
+ENTRY_POINTS = [
+    'total_daily_report.py',
+    '1m_auto_bot_upload_etf.py',
+    '1m_auto_bot_upload_stock.py',
+    '1m_auto_bot_upload_US.py',
+    'mosig_bot.py',
+    'mosig_us.py',
+    'mosig_engine.py',
+    'daily_global_screener.py',
+    'NASDAQ_strategy.py',
+    'dashboard_local/session_management.py',
+    'dashboard_local/data_utilities.py',
+    'dashboard_local/chart_plotting.py',
+    'dashboard_local/streamlit_ui.py',
+]
+
+# 필요할 때만 로드되어야 하는 무거운 의존성
+HEAVY_PACKAGES = ['torch', 'prophet', 'neuralprophet', 'xgboost', 'scipy', 'matplotlib', 'pykrx']
+
+# 진입점 파일을 __main__이 아닌 이름으로 로드 (if __name__ == "__main__" 블록은 실행되지 않음)
+_LOADER = """
+import importlib.util, os, sys, time
+path = sys.argv[1]
+sys.path.insert(0, os.path.dirname(path))
+t0 = time.perf_counter()
+spec = importlib.util.spec_from_file_location('_entry_under_test', path)
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+print(f'__ENTRY_LOAD_SEC__={time.perf_counter() - t0:.4f}')
+"""
+
+_IMPORTTIME_LINE = re.compile(r'import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def measure_entry_point(rel_path, top_n=8):
+    """
+    진입점 하나의 import 프로파일을 측정합니다.
+    :return: {'entry', 'load_sec', 'top': [(패키지, 누적초)], 'heavy': [패키지], 'error'}
+    """
+    path = os.path.join(BASE_DIR, rel_path)
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _LOADER, path],
+        cwd=os.path.dirname(path),
+        capture_output=True,
+        text=True,
+    )
+
+    report = {'entry': rel_path, 'load_sec': None, 'top': [], 'heavy': [], 'error': None}
+    match = re.search(r'__ENTRY_LOAD_SEC__=([\d.]+)', proc.stdout)
+    if proc.returncode != 0 or not match:
+        last_line = (proc.stderr.strip().splitlines() or ['알 수 없는 오류'])[-1]
+        report['error'] = last_line
+        return report
+    report['load_sec'] = float(match.group(1))
+
+    # 최상위(들여쓰기 1단계) 패키지의 누적 import 시간 집계
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        m = _IMPORTTIME_LINE.match(line)
+        if not m:
+            continue
+        cum_us, indent, name = int(m.group(2)), len(m.group(3)), m.group(4)
+        top_level = name.split('.')[0]
+        if indent <= 1:
+            cumulative[top_level] = cumulative.get(top_level, 0) + cum_us
+        if top_level in HEAVY_PACKAGES and top_level not in report['heavy']:
+            report['heavy'].append(top_level)
+
+    ranked = sorted(cumulative.items(), key=lambda x: x[1], reverse=True)[:top_n]
+    report['top'] = [(name, us / 1e6) for name, us in ranked]
+    return report
+
+
+def print_report(reports):
+    print("=" * 70)
+    print("⏱️ 진입점별 import 시간 리포트")
+    print("=" * 70)
+    for r in reports:
+        if r['error']:
+            print(f"\n❌ {r['entry']}: 로드 실패 ({r['error']})")
+            continue
+        heavy = ', '.join(r['heavy']) if r['heavy'] else '없음'
+        print(f"\n📦 {r['entry']}  —  {r['load_sec']:.2f}초")
+        print(f"   무거운 의존성 로드: {heavy}")
+        for name, sec in r['top']:
+            print(f"   - {name:<24} {sec:6.3f}초")
+    print("\n" + "=" * 70)
+
+
+if __name__ == "__main__":
+    targets = sys.argv[1:] or ENTRY_POINTS
+    print_report([measure_entry_point(t) for t in targets])
@@ -0,0 +1,175 @@
+# momentum_snapshot.py
+"""
+모멘텀 대시보드 스냅샷.
+통합 리포트(일일 실행)가 ETF/개별주/미국주식 분석 결과를 대시보드 형식으로 변환해 저장하고,
+두 대시보드(dashboard/, dashboard_local/)는 이 파일을 바로 읽습니다. ("갱신" 버튼은 장중 갱신용)
+
+배포: 대시보드는 자기 작업 폴더의 data/momentum_snapshot.pkl만 읽습니다.
+GitHub Actions 실행에서는 data/가 actions/cache에만 남으므로, 워크플로의 "Publish dashboard snapshot" 단계가
+스냅샷(과 종목 색인)을 저장소에 커밋합니다. 대시보드 호스트는 git pull(Streamlit Cloud는 재배포)로 받아야 하며,
+그 외 환경에서는 통합 리포트를 대시보드와 같은 호스트에서 실행해야 스냅샷이 보입니다.
+
+스냅샷 형식 (pickle):
+    {'version': SNAPSHOT_VERSION, 'seq': 발행 번호, 'published': 'YYYY-MM-DD HH:MM:SS',
+     'etf' | 'stock' | 'us': {'status', 'reason', 'targets', 'rankings', 'raw_data_last',
+                              'score_history', 'market_index_val', 'updated', ('tickers_map')}}
+- 분석에 실패한 섹션은 직전 스냅샷 값을 유지
+- score_history: 순위 상위 종목의 최근 점수 (봇 스코어 상태에 기록된 점수 로그, ScoreState.score_history)
+"""
+
+import os
+import pickle
+import datetime
+
+import pytz
+
+import config as cfg
+
+SNAPSHOT_VERSION = 1
+SECTIONS = ('etf', 'stock', 'us')
+HISTORY_TOP_N = 50  # score_history에 남길 순위 상위 종목 수
+HISTORY_DAYS = cfg.MOMENTUM_SCORE_LOG_DAYS  # score_history 기간 (거래일)
+MAX_LAG = 120       # 점수식의 최장 기간 (120일 수익률) - 이보다 짧은 시세로는 점수를 계산할 수 없음
+
+
+def _now():
+    return datetime.datetime.now(pytz.timezone('Asia/Seoul')).strftime('%Y-%m-%d %H:%M:%S')
+
+
+# 섹션별 점수 정의 (봇과 동일: ETF/미국은 가중 모멘텀, 개별주는 변동성 조절 모멘텀)
+SCORE_SPECS = {
+    'etf': ('weighted', cfg.MOMENTUM_WEIGHTS),
+    'stock': ('vol_adjusted', (60, 120)),
+    'us': ('weighted', cfg.MOMENTUM_WEIGHTS),
+}
+
+
+def _top_history(history, names):
+    """점수 기록에서 순위 상위 종목 열만 (없으면 None)"""
+    if history is None:
+        return None
+    cols = [n for n in names[:HISTORY_TOP_N] if n in history.columns]
+    return history[cols].tail(HISTORY_DAYS) if cols else None
+
+
+def score_history_from_prices(kind, prices, names):
+    """
+    대시보드 "갱신"용: 전체 시세로 최근 HISTORY_DAYS일 점수를 계산 (봇과 같은 점수식)
+    시세가 MAX_LAG + HISTORY_DAYS 거래일보다 짧으면 앞쪽 점수가 틀리므로 None
+    :param names: 순위 순서의 종목명 (상위 HISTORY_TOP_N개만 사용)
+    """
+    from score_state import score_frame
+    if prices is None or len(prices) < MAX_LAG + HISTORY_DAYS:
+        return None
+    cols = [n for n in list(names)[:HISTORY_TOP_N] if n in prices.columns]
+    if not cols:
+        return None
+    return score_frame(prices[cols], SCORE_SPECS[kind]).tail(HISTORY_DAYS)
+
+
+def section_from_result(kind, result, codes=None):
+    """
+    봇 분석 결과(analyze_*_strategy 반환값) → 대시보드 섹션
+    :param codes: {'종목명': '종목코드'} (ETF는 cfg.ETF_TICKERS, 미국은 심볼 그대로)
+    :return: 섹션 dict, 오류 결과면 None
+    """
+    if not result or result.get('error') or result.get('raw_data') is None:
+        return None
+    raw_data = result['raw_data']
+    codes = codes if codes is not None else result.get('tickers_map', {})
+    defense = {'etf': cfg.ETF_DEFENSE_ASSET, 'stock': cfg.STOCK_DEFENSE_ASSET, 'us': cfg.US_DEFENSE_ASSET}[kind]
+
+    scores = result['weighted_score'].drop(defense, errors='ignore').sort_values(ascending=False)
+    last = raw_data.iloc[-1]
+    rankings = [
+        {'rank': i, 'name': n, 'code': n if kind == 'us' else codes.get(n, 'N/A' if kind == 'etf' else n),
+         'score': s, 'price': last.get(n, 0)}
+        for i, (n, s) in enumerate(scores.items(), 1)
+    ]
+    section = {
+        'status': result['market_status'].split(' ', 1)[-1],  # '🔴 상승장' → '상승장'
+        'reason': result.get('reason', ''),
+        'targets': result['final_targets'],
+        'rankings': rankings,
+        'raw_data_last': last,
+        'market_index_val': result.get('market_index_val'),
+        'updated': _now(),
+    }
+    # raw_data는 스코어 상태의 링버퍼(121일)라 여기서 다시 계산하지 않고, 봇이 기록해 둔 점수 로그를 그대로 씀
+    section['score_history'] = _top_history(result.get('score_history'), list(scores.index))
+    if kind == 'stock':
+        section['tickers_map'] = codes
+    return section
+
+
+def load_snapshot(path=None):
+    """저장된 스냅샷 (없거나 형식이 다르면 None)"""
+    path = path or cfg.MOMENTUM_SNAPSHOT_PATH
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except Exception as e:
+        print(f"⚠️ 모멘텀 스냅샷 로드 실패: {e}")
+        return None
+    return snapshot if snapshot.get('version') == SNAPSHOT_VERSION else None
+
+
+def snapshot_stamp(path=None):
+    """파일 변경 감지용 (mtime, size), 파일이 없으면 None"""
+    try:
+        st = os.stat(path or cfg.MOMENTUM_SNAPSHOT_PATH)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def publish_snapshot(results, path=None):
+    """
+    분석 결과를 스냅샷으로 발행 (원자적 교체)
+    :param results: {'etf': 결과, 'stock': 결과, 'us': 결과}
+    :return: 발행된 스냅샷
+    """
+    path = path or cfg.MOMENTUM_SNAPSHOT_PATH
+    previous = load_snapshot(path) or {}
+    snapshot = {'version': SNAPSHOT_VERSION, 'seq': previous.get('seq', 0) + 1, 'published': _now()}
+    codes = {'etf': cfg.ETF_TICKERS, 'stock': None, 'us': {}}
+    updated, kept = [], []
+    for kind in SECTIONS:
+        section = section_from_result(kind, results.get(kind), codes[kind])
+        if section is None:
+            section = previous.get(kind)
+            kept.append(kind)
+        else:
+            updated.append(kind)
+        snapshot[kind] = section
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'wb') as f:
+        pickle.dump(snapshot, f)
+    os.replace(path + '.tmp', path)
+    print(f"✅ 모멘텀 스냅샷 #{snapshot['seq']} 발행 (갱신: {', '.join(updated) or '-'}, 유지: {', '.join(kept) or '-'})")
+    return snapshot
+
+
+def merge_dashboard_data(snapshot, local):
+    """
+    스냅샷과 대시보드 로컬 저장본(장중 수동 갱신)을 섹션별로 더 최신인 쪽으로 합침.
+    로컬 섹션에 'updated'가 없으면 저장본의 last_update를 기준으로 비교합니다.
+    :return: 대시보드 cached_data 형식 {'etf', 'stock', 'us', 'last_update', 'snapshot_seq'}
+    """
+    snapshot = snapshot or {}
+    local = local or {}
+    merged = {'snapshot_seq': snapshot.get('seq')}
+    stamps = []
+    for kind in SECTIONS:
+        snap_sec, local_sec = snapshot.get(kind), local.get(kind)
+        snap_ts = (snap_sec or {}).get('updated', '')
+        local_ts = (local_sec or {}).get('updated', local.get('last_update', '')) if local_sec else ''
+        use_local = local_sec is not None and (snap_sec is None or local_ts > snap_ts)
+        merged[kind] = local_sec if use_local else snap_sec
+        if merged[kind] is not None:
+            stamps.append(local_ts if use_local else snap_ts)
+    merged['last_update'] = max(stamps) if stamps else '-'
+    return merged
@@ -0,0 +1,637 @@
+# mosig_engine.py
+"""
+모멘텀 돌파(MOSIG Hybrid 3.0) 스캐너 공통 엔진.
+시장별 차이(대상 종목, 통화 표시, 요청 한도, 거래일 달력/시간대)는 MARKETS 프로필로만 구분하고
+시세 수집, 지표 계산, 캐시는 한국/미국이 함께 씁니다.
+- mosig_bot.py (한국), mosig_us.py (미국)는 이 엔진의 얇은 래퍼
+- scan_markets(['KR', 'US'])로 한 프로세스에서 두 시장을 동시에 스캔
+
+사용법:
+    python mosig_engine.py          # 한국 + 미국 동시 스캔 후 메시지 출력
+    python mosig_engine.py US
+"""
+
+import FinanceDataReader as fdr
+import pandas as pd
+import numpy as np
+import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+import pytz
+import random
+import threading
+import time
+import os
+import pickle
+import sys
+from collections import OrderedDict
+
+from run_checkpoint import checkpointed
+from common import current_cancel_event, check_cancelled, set_cancel_event
+import config as cfg
+
+# --- 백테스트에서 검증된 파라미터 ---
+ATR_WINDOW = 20
+ATR_MULT = 3.0        # 익절 목표 (ATR의 3배)
+STOP_LOSS_RATE = 0.05 # 손절 (5%)
+VOL_MULT = 2.0        # 거래량 급증 기준 (2배)
+SLOPE_WINDOW = 20     # 'slope' 정렬용 로그 가격 회귀 기울기 기간
+
+# MOSIG_STRATEGY별 정렬 기준 (종목 정보 키, 메시지 표시명)
+RANK_KEYS = {
+    'value': ('Momentum', '모멘텀'),
+    'slope': ('Slope', f'{SLOPE_WINDOW}일 추세 기울기'),
+    'marcap': ('Marcap', '시가총액'),
+}
+
+PANEL_FIELDS = ['Close', 'High', 'Low', 'Volume']
+
+
+# =========================================================
+# 시장 프로필
+# =========================================================
+def _listing_kr():
+    """KOSPI/KOSDAQ 시가총액 상위 종목"""
+    df_kospi = fdr.StockListing('KOSPI').sort_values('Marcap', ascending=False).head(cfg.MOSIG_TOP_N_KOSPI)
+    df_kosdaq = fdr.StockListing('KOSDAQ').sort_values('Marcap', ascending=False).head(cfg.MOSIG_TOP_N_KOSDAQ)
+    return pd.concat([df_kospi, df_kosdaq])
+
+def _snapshot_listing_kr():
+    """KRX 전종목 당일 시세 (KOSPI+KOSDAQ, 거래대금 순)"""
+    listing = fdr.StockListing('KRX')
+    listing = listing[listing['Market'].str.startswith(('KOSPI', 'KOSDAQ'))]
+    return listing.sort_values('Amount', ascending=False)
+
+def _listing_us():
+    """S&P 500 구성 종목 (Symbol → Code, 시가총액 정보 없음)"""
+    listing = fdr.StockListing('S&P500').head(cfg.MOSIG_US_TOP_N).rename(columns={'Symbol': 'Code'})
+    if 'Marcap' not in listing:
+        listing['Marcap'] = np.nan
+    return listing
+
+def _clock_kr():
+    return f"기준: {datetime.datetime.now(pytz.timezone('Asia/Seoul')).strftime('%Y-%m-%d %H:%M')}"
+
+def _clock_us():
+    # 미국 현지 시간(동부 표준시) 병기
+    kst_time = datetime.datetime.now(pytz.timezone('Asia/Seoul')).strftime('%m-%d %H:%M KST')
+    est_time = datetime.datetime.now(pytz.timezone('America/New_York')).strftime('%m-%d %H:%M EST')
+    return f"시간: {kst_time} ({est_time})"
+
+MARKETS = {
+    'KR': {
+        'flag': '🇰🇷',
+        'title': '🚀 *[Mosig Hybrid Signal]*',
+        'empty_message': '📉 오늘은 포착된 하이브리드(Hybrid) 돌파 종목이 없습니다.',
+        'listing': _listing_kr,
+        'snapshot_listing': _snapshot_listing_kr,  # 'full' 모드 (전종목 당일 시세 1회 호출)
+        'calendar_symbol': 'KS11',                  # 거래일 달력 기준 지수
+        'clock': _clock_kr,
+        'timezone': 'Asia/Seoul',                   # 일봉 캐시 날짜 기준
+        'price_limit': 0.3,                         # 일일 가격제한폭 (수정주가 감지용)
+        'panel_path': cfg.MOSIG_PANEL_PATH,
+        'round_price': int,
+        'format_price': lambda p: f"{p:,.0f}원",
+        'format_marcap': lambda m: f"{m / 1e8:,.0f}억원",
+        'max_workers': cfg.MOSIG_MAX_WORKERS,
+        'request_delay': (cfg.MOSIG_REQUEST_DELAY, cfg.MOSIG_REQUEST_DELAY),
+        'retries': 1,
+        'pick_count': cfg.MOSIG_PICK_COUNT,
+    },
+    'US': {
+        'flag': '🇺🇸',
+        'title': '🗽 *[US Mosig Hybrid Signal]*',
+        'empty_message': '📉 오늘은 포착된 🇺🇸미국장 하이브리드 돌파 종목이 없습니다.',
+        'listing': _listing_us,
+        'snapshot_listing': None,
+        'calendar_symbol': 'US500',
+        'clock': _clock_us,
+        'timezone': 'America/New_York',
+        'price_limit': None,
+        'panel_path': None,
+        'round_price': lambda p: round(p, 2),       # 달러 소수점 둘째 자리
+        'format_price': lambda p: f"${p:,.2f}",
+        'format_marcap': lambda m: f"${m / 1e9:,.1f}B",
+        'max_workers': cfg.MOSIG_US_MAX_WORKERS,    # 야후 파이낸스 차단 방지
+        'request_delay': cfg.MOSIG_US_REQUEST_DELAY, # 동시 요청 분산용 랜덤 대기 범위
+        'retries': 3,
+        'pick_count': cfg.MOSIG_US_PICK_COUNT,
+    },
+}
+
+
+# =========================================================
+# 시세 수집 (시장별 공용 스레드 풀 + 프로세스 내 캐시)
+# - 캐시는 시장 현지 날짜별: 날짜가 바뀌면 그 시장 캐시를 비워 전날 일봉을 돌려주지 않음
+# - 캐시 크기는 MOSIG_FRAME_CACHE_SIZE 종목까지 (오래 사용하지 않은 것부터 제거)
+# - 스레드 풀은 스캔이 끝나도 유지되므로, 스캔을 마친 실행 주체가 shutdown()으로 정리
+# =========================================================
+_executors = {}
+_frame_cache = OrderedDict()  # (시장, 종목코드, 시작일) -> 일봉
+_cache_day = {}               # 시장 -> 캐시 기준 현지 날짜
+_engine_lock = threading.Lock()
+
+def _market_day(market):
+    return datetime.datetime.now(pytz.timezone(MARKETS[market]['timezone'])).strftime('%Y-%m-%d')
+
+def _cache_get(market, key):
+    """캐시 조회 (_engine_lock 안에서 호출), 시장 날짜가 바뀌었으면 그 시장 캐시를 비움"""
+    day = _market_day(market)
+    if _cache_day.get(market) != day:
+        for stale in [k for k in _frame_cache if k[0] == market]:
+            del _frame_cache[stale]
+        _cache_day[market] = day
+        return None
+    df = _frame_cache.get(key)
+    if df is not None:
+        _frame_cache.move_to_end(key)
+    return df
+
+def _cache_put(key, df):
+    """캐시 저장 (_engine_lock 안에서 호출), 크기 제한을 넘으면 오래된 것부터 제거"""
+    _frame_cache[key] = df
+    _frame_cache.move_to_end(key)
+    while len(_frame_cache) > cfg.MOSIG_FRAME_CACHE_SIZE:
+        _frame_cache.popitem(last=False)
+
+def _market_executor(market):
+    """
+    시장별 공용 스레드 풀. 같은 시장 스캔이 동시에 여러 번 돌아도 요청 동시성은 max_workers를 넘지 않음
+    """
+    with _engine_lock:
+        if market not in _executors:
+            _executors[market] = ThreadPoolExecutor(
+                max_workers=MARKETS[market]['max_workers'], thread_name_prefix=f"mosig-{market}")
+        return _executors[market]
+
+def _fetch_one(market, code, start_date, cancel=None):
+    """일봉 1종목 수집 (요청 전 대기, 실패 시 지수 백오프 재시도, 성공하면 캐시, 취소되면 요청하지 않음)"""
+    key = (market, code, start_date)
+    with _engine_lock:
+        cached = _cache_get(market, key)
+    if cached is not None:
+        return cached
+
+    profile = MARKETS[market]
+    for attempt in range(profile['retries']):
+        if cancel is not None and cancel.is_set():
+            return None
+        try:
+            time.sleep(random.uniform(*profile['request_delay']))
+            df = fdr.DataReader(code, start_date)
+            break
+        except Exception:
+            if attempt < profile['retries'] - 1:
+                time.sleep(2 ** (attempt + 1))
+    else:
+        return None
+
+    if df is not None and not df.empty:
+        with _engine_lock:
+            _cache_put(key, df)
+    return df
+
+def fetch_ohlcv_frames(names, start_date, deadline=None, market='KR'):
+    """
+    종목별 일봉을 병렬로 수집합니다.
+    :param names: {'종목코드': '종목명'}
+    :param deadline: time.monotonic() 기준 마감 시각 (지나면 남은 요청은 취소하고 받은 것만 반환)
+    :param market: MARKETS 키 (요청 한도/재시도 설정)
+    :return: {'종목코드': OHLCV DataFrame}
+    """
+    flag = MARKETS[market]['flag']
+    frames = {}
+    total = len(names)
+    cancel = current_cancel_event()
+    executor = _market_executor(market)
+    future_to_code = {executor.submit(_fetch_one, market, code, start_date, cancel): code for code in names}
+    try:
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        for i, future in enumerate(as_completed(future_to_code, timeout=timeout)):
+            if cancel is not None and cancel.is_set():
+                break
+            code = future_to_code[future]
+            # 진행 상황 표시 (선택사항)
+            print(f"\r   {flag} 수집 진행률: {i+1}/{total} ({str(names[code])[:15]})", end='', flush=True)
+            df = future.result()
+            if df is not None and not df.empty:
+                frames[code] = df
+    except FuturesTimeoutError:
+        print(f"\n⏰ 시간 예산 소진: {total - len(frames)}개 종목 수집 중단")
+    finally:
+        # 공용 풀이므로 풀을 닫지 않고 이 호출의 대기 작업만 취소
+        for future in future_to_code:
+            future.cancel()
+    check_cancelled(cancel)
+    return frames
+
+def clear_cache():
+    """프로세스 내 일봉 캐시 비우기"""
+    with _engine_lock:
+        _frame_cache.clear()
+        _cache_day.clear()
+
+def shutdown():
+    """시장별 스레드 풀 종료 + 캐시 비우기 (다음 스캔 때 풀은 다시 생성)"""
+    with _engine_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+        _frame_cache.clear()
+        _cache_day.clear()
+    for executor in executors:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# =========================================================
+# 지표 계산 (날짜 × 종목 패널)
+# =========================================================
+def build_ohlcv_panel(frames):
+    """
+    종목별 일봉을 날짜 × 종목 패널로 정렬합니다.
+    :return: {'Close'|'High'|'Low'|'Volume': DataFrame(행: 날짜, 열: 종목코드)}
+    """
+    if not frames:
+        return {field: pd.DataFrame() for field in PANEL_FIELDS}
+    return {field: pd.concat({code: df[field] for code, df in frames.items()}, axis=1).sort_index() for field in PANEL_FIELDS}
+
+def _window_mean(arr, start, stop):
+    """행 구간 [start, stop) 평균 (구간에 NaN이 하나라도 있으면 NaN = rolling(window).mean() 마지막 값과 동일)"""
+    return arr[start:stop].mean(axis=0)
+
+def rolling_log_slope(close, window=SLOPE_WINDOW):
+    """
+    로그 종가의 rolling 최소제곱 기울기 (행: 날짜, 열: 종목) - 누적합으로 O(N·T)
+    창 [s, s+w) 에서 x = t - s 일 때
+        slope = (w·Σxy - Σx·Σy) / (w·Σx² - (Σx)²),  Σxy = Σ t·y - s·Σy
+    창 안에 NaN이 있으면 NaN. 첫 window-1 행은 NaN.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        y = np.log(close)
+    rows = y.shape[0]
+    out = np.full(y.shape, np.nan)
+    if rows < window:
+        return out
+
+    valid = ~np.isnan(y)
+    y0 = np.where(valid, y, 0.0)
+    t = np.arange(rows, dtype=float)[:, None]
+    zero = np.zeros((1, y.shape[1]))
+    cum_y = np.vstack([zero, np.cumsum(y0, axis=0)])
+    cum_ty = np.vstack([zero, np.cumsum(t * y0, axis=0)])
+    cum_n = np.vstack([zero, np.cumsum(valid, axis=0)])
+
+    sum_y = cum_y[window:] - cum_y[:-window]
+    sum_ty = cum_ty[window:] - cum_ty[:-window]
+    count = cum_n[window:] - cum_n[:-window]
+    start = t[:rows - window + 1]
+
+    sum_x = window * (window - 1) / 2
+    denom = window * window * (window * window - 1) / 12  # w·Σx² - (Σx)²
+    slope = (window * (sum_ty - start * sum_y) - sum_x * sum_y) / denom
+    out[window - 1:] = np.where(count == window, slope, np.nan)
+    return out
+
+def scan_breakouts(panel, names, marcaps=None, market='KR'):
+    """
+    [업데이트된 Hybrid 3.0 로직 - 패널 계산]
+    날짜 × 종목 패널 전체에 대해 모멘텀 돌파 + 동적 거래량 급증(20일 이평선 돌파)을 한 번에 판정합니다.
+    종목마다 자신의 마지막 거래일(df.iloc[-1]) 기준으로 판정합니다.
+    * 최소 거래대금 필터는 요청에 따라 제외되었습니다.
+    :param panel: build_ohlcv_panel 결과
+    :param names: {'종목코드': '종목명'}
+    :param marcaps: {'종목코드': 시가총액} (종목 리스트 스냅샷, 'marcap' 정렬용)
+    :param market: MARKETS 키 (가격 반올림 단위)
+    :return: 돌파 종목 정보 리스트
+    """
+    round_price = MARKETS[market]['round_price']
+    marcaps = marcaps or {}
+    close_df = panel['Close']
+    if close_df.empty:
+        return []
+    codes = close_df.columns
+    close = close_df.to_numpy(dtype=float)
+
+    # 종목별 실제 거래일만 아래쪽으로 모으기 (상장일/거래정지로 비는 날짜는 위쪽 NaN 패딩)
+    # → 각 열의 마지막 행 = 해당 종목 df.iloc[-1], shift(n) = 해당 종목 기준 n거래일 전
+    order = np.argsort(~np.isnan(close), axis=0, kind='stable')
+    close = np.take_along_axis(close, order, axis=0)
+    high = np.take_along_axis(panel['High'].reindex(columns=codes).to_numpy(dtype=float), order, axis=0)
+    low = np.take_along_axis(panel['Low'].reindex(columns=codes).to_numpy(dtype=float), order, axis=0)
+    volume = np.take_along_axis(panel['Volume'].reindex(columns=codes).to_numpy(dtype=float), order, axis=0)
+
+    # ATR 계산 및 모멘텀 계산을 위해 최소 30일 이상 데이터 필요
+    has_history = (~np.isnan(close)).sum(axis=0) >= 30
+    if len(close) < 30 or not has_history.any():
+        return []
+
+    # 1. 모멘텀 지표: 오늘/어제 Momentum, 오늘 Signal(Momentum 9일 평균)
+    # Momentum = 종가 / 10거래일 전 종가 * 100, 최근 9일치만 계산 (index -1 = 오늘)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        momentum = close[-9:] / close[-19:-10] * 100
+    mom_today, mom_yesterday = momentum[-1], momentum[-2]
+    signal_today = momentum.mean(axis=0)
+
+    # 2. ATR(변동성): True Range 20일 평균 (High-Low, |High-전일종가|, |Low-전일종가| 중 최대)
+    prev_close = close[-(ATR_WINDOW + 1):-1]
+    high_w, low_w = high[-ATR_WINDOW:], low[-ATR_WINDOW:]
+    true_range = np.fmax(np.fmax(high_w - low_w, np.abs(high_w - prev_close)), np.abs(low_w - prev_close))
+    atr = _window_mean(true_range, 0, ATR_WINDOW)
+
+    # 3. 거래량 이동평균(20일): 어제까지의 20일 평균 ('평소 거래량' 기준)
+    vol_ma_baseline = _window_mean(volume, -21, -1)
+    vol_today = volume[-1]
+
+    # 데이터 유효성 체크
+    valid = has_history & ~np.isnan(mom_today) & ~np.isnan(vol_ma_baseline) & ~np.isnan(atr)
+
+    # --- [조건 검증] ---
+    with np.errstate(invalid='ignore'):
+        # 1) 모멘텀 돌파: 오늘 100 돌파 AND 어제는 100 아래 AND 시그널선 위
+        is_momentum_break = (mom_today >= 100) & (mom_yesterday < 100) & (mom_today > signal_today)
+        # 2) 동적 거래량 폭증: 어제까지의 20일 평균 대비 VOL_MULT배 이상
+        is_volume_spike = (vol_ma_baseline > 0) & (vol_today >= vol_ma_baseline * VOL_MULT)
+
+    hits = np.flatnonzero(valid & is_momentum_break & is_volume_spike)
+
+    # 정렬용 추세 기울기 (로그 종가 20일 회귀, 일 단위)
+    slope = rolling_log_slope(close[-SLOPE_WINDOW:])[-1]
+
+    candidates = []
+    for j in hits:
+        current_price = round_price(float(close[-1, j]))
+        atr_value = atr[j]
+
+        # --- [익절/손절가 계산] ---
+        # 익절: ATR * 3배 위 / 손절: -5% 아래 (고정)
+        target_price = round_price(current_price + (atr_value * ATR_MULT))
+        stop_price = round_price(current_price * (1 - STOP_LOSS_RATE))
+        target_pct = ((target_price - current_price) / current_price) * 100
+
+        candidates.append({
+            'Code': codes[j],
+            'Name': names.get(codes[j], codes[j]),
+            'Price': current_price,
+            'TargetPrice': target_price,
+            'StopPrice': stop_price,
+            'TargetPct': target_pct,
+            'Momentum': mom_today[j],
+            'VolumeRatio': vol_today[j] / vol_ma_baseline[j], # 전일 대비가 아닌 '평균 대비' 배수
+            'ATR': atr_value,
+            'Slope': slope[j],
+            'Marcap': marcaps.get(codes[j], np.nan),
+        })
+    return candidates
+
+def check_breakout_signal(df, code, name, market='KR'):
+    """
+    단일 종목 돌파 여부 (scan_breakouts를 종목 1개 패널로 호출)
+    :return: (돌파 여부, 종목 정보 또는 None)
+    """
+    found = scan_breakouts(build_ohlcv_panel({code: df}), {code: name}, market=market)
+    return (True, found[0]) if found else (False, None)
+
+
+# =========================================================
+# 스캔 실행
+# =========================================================
+def scan_market(market, ckpt=None):
+    """
+    한 시장의 모멘텀 돌파 종목을 스캔합니다.
+    :param market: MARKETS 키 ('KR', 'US')
+    :param ckpt: RunCheckpoint (대상 종목 리스트를 저장·재사용)
+    """
+    profile = MARKETS[market]
+    if cfg.MOSIG_SCAN_MODE == 'full' and profile['snapshot_listing'] is not None:
+        return scan_market_full(market, ckpt)
+
+    print(f"[{datetime.datetime.now()}] {profile['flag']} 모멘텀 돌파(Hybrid) 스캔 시작...")
+
+    # 1. 대상 종목 선정
+    try:
+        target_stocks = checkpointed(ckpt, 'listing', profile['listing'])
+        print(f"✅ {profile['flag']} 스캔 대상: {len(target_stocks)}개 종목")
+    except Exception as e:
+        print(f"❌ [모시그 봇] {profile['flag']} 대상 종목 선정 실패: {e}")
+        return []
+
+    # ATR 계산(20일)을 위해 데이터 여유있게 90일치 로드
+    start_date = (datetime.datetime.now() - datetime.timedelta(days=90)).strftime('%Y-%m-%d')
+    names = dict(zip(target_stocks['Code'], target_stocks['Name']))
+    marcaps = dict(zip(target_stocks['Code'], target_stocks['Marcap']))
+
+    # 2. 시세 수집 (병렬, 종목별) → 날짜 × 종목 패널
+    frames = fetch_ohlcv_frames(names, start_date, market=market)
+    panel = build_ohlcv_panel(frames)
+
+    # 3. 돌파 신호 계산 (전 종목 한 번에)
+    scan_started = time.perf_counter()
+    candidates = scan_breakouts(panel, names, marcaps, market=market)
+    print(f"\n✅ {profile['flag']} 분석 완료! ({len(frames)}개 종목, 신호 계산 {(time.perf_counter() - scan_started) * 1000:.1f}ms)")
+    return candidates
+
+def scan_markets(markets=('KR', 'US'), ckpt=None):
+    """
+    여러 시장을 한 프로세스에서 동시에 스캔합니다. (시장별 요청 한도는 각 시장 스레드 풀이 지킴)
+    :param ckpt: RunCheckpoint (시장별로 'kr.', 'us.' 하위 단계에 저장)
+    :return: {'KR': [...], 'US': [...]}
+    """
+    cancel = current_cancel_event()
+
+    def _scan(market):
+        set_cancel_event(cancel)  # 호출한 분석기의 취소 이벤트를 시장별 스레드에도 적용
+        return scan_market(market, ckpt.scope(market.lower()) if ckpt is not None else None)
+
+    with ThreadPoolExecutor(max_workers=len(markets)) as executor:
+        futures = {market: executor.submit(_scan, market) for market in markets}
+        return {market: future.result() for market, future in futures.items()}
+
+
+# =========================================================
+# 전 종목 스캔 모드 (MOSIG_SCAN_MODE = 'full', 당일 전종목 시세를 주는 시장만)
+# =========================================================
+def load_mosig_panel(path):
+    """
+    저장된 최근 일봉 패널 (없으면 빈 패널)
+    'complete': 개별 수집으로 이력을 채운 뒤 빠진 날 없이 이어져 온 종목코드 집합
+    """
+    if os.path.exists(path):
+        try:
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            print(f"⚠️ 모시그 패널 로드 실패, 새로 생성: {e}")
+    return {**{field: pd.DataFrame() for field in PANEL_FIELDS}, 'complete': set()}
+
+def save_mosig_panel(panel, path):
+    """최근 MOSIG_PANEL_ROWS 거래일만 남기고 저장 (메모리/파일 크기 고정)"""
+    trimmed = {field: panel[field].iloc[-cfg.MOSIG_PANEL_ROWS:].dropna(axis=1, how='all') for field in PANEL_FIELDS}
+    trimmed['complete'] = panel['complete'] & set(trimmed['Close'].columns)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'wb') as f:
+        pickle.dump(trimmed, f)
+    os.replace(path + '.tmp', path)
+
+def _put_rows(panel, rows):
+    """rows({'필드': DataFrame(날짜 × 종목)})로 패널 해당 칸을 덮어쓰기"""
+    for field in PANEL_FIELDS:
+        new = rows[field]
+        if new.empty:
+            continue
+        base = panel[field]
+        index = base.index.union(new.index)
+        columns = base.columns.union(new.columns)
+        merged = base.reindex(index=index, columns=columns)
+        merged.loc[new.index, new.columns] = new.combine_first(merged.loc[new.index, new.columns])
+        panel[field] = merged
+
+def snapshot_rows(listing, bar_date):
+    """
+    전종목 시세(StockListing 1회 호출)를 bar_date 하루치 일봉 행으로 변환
+    (거래정지 종목은 시가/고가/저가가 0으로 오므로 종가로 대체)
+    """
+    snap = listing.set_index('Code')
+    halted = (snap['High'] <= 0) | (snap['Low'] <= 0)
+    high = snap['High'].where(~halted, snap['Close'])
+    low = snap['Low'].where(~halted, snap['Close'])
+    fields = {'Close': snap['Close'], 'High': high, 'Low': low, 'Volume': snap['Volume']}
+    return {field: values.astype(float).to_frame(bar_date).T for field, values in fields.items()}
+
+def stale_codes(panel, codes, trading_dates, lookback=30, price_limit=0.3):
+    """
+    최근 거래일 이력이 온전하지 않아 일봉을 다시 받아야 하는 종목
+    - 개별 수집한 적이 없는 종목 (첫 실행, 신규 편입)
+    - 직전 lookback 거래일 중 (첫 거래 이후) 빠진 날이 있거나, 직전 거래일 봉이 없는 종목
+    - 오늘 스냅샷 종가가 직전 종가 대비 가격제한폭(price_limit) 밖 → 액면분할 등 수정주가 반영 필요
+    """
+    close = panel['Close'].reindex(index=trading_dates[-(lookback + 1):], columns=codes)  # 마지막 행 = 오늘 스냅샷
+    history = close.iloc[:-1]
+    seen = history.notna().cummax()
+    has_gap = (seen & history.isna()).any() | history.iloc[-1].isna()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        jump = (close.iloc[-1] / history.iloc[-1] - 1).abs() > price_limit
+    return set(close.columns[has_gap.to_numpy() | jump.to_numpy()]) | (set(codes) - panel['complete'])
+
+def scan_market_full(market='KR', ckpt=None):
+    """
+    전 종목 모멘텀 돌파 스캔 (시간 예산 내)
+    - 당일 시세는 전종목 시세 1회 호출로 갱신하고, 이전 일봉은 저장된 패널 재사용
+    - 이력이 비어 있는 종목만 개별 수집 (신규 상장/수정주가/첫 실행)
+    - 거래대금 큰 순으로 청크 단위 처리 → 시간 예산이 끝나도 유동성 높은 종목은 항상 평가됨
+    """
+    profile = MARKETS[market]
+    started = time.monotonic()
+    deadline = started + cfg.MOSIG_TIME_BUDGET_SEC
+    print(f"[{datetime.datetime.now()}] {profile['flag']} 모멘텀 돌파(Hybrid) 전 종목 스캔 시작... (예산 {cfg.MOSIG_TIME_BUDGET_SEC}초)")
+
+    # 1. 전 종목 시세 스냅샷 + 거래일 달력 (요청 2회)
+    try:
+        listing = checkpointed(ckpt, 'listing', profile['snapshot_listing'])
+        calendar_start = (datetime.datetime.now() - datetime.timedelta(days=90)).strftime('%Y-%m-%d')
+        trading_dates = fdr.DataReader(profile['calendar_symbol'], calendar_start).index
+        bar_date = trading_dates[-1]
+        print(f"✅ 스캔 대상: {len(listing)}개 종목 (기준일 {bar_date.date()}, 거래대금 순)")
+    except Exception as e:
+        print(f"❌ [모시그 봇] 대상 종목 선정 실패: {e}")
+        return []
+
+    names = dict(zip(listing['Code'], listing['Name']))
+    marcaps = dict(zip(listing['Code'], listing['Marcap']))
+    ordered_codes = list(listing['Code'])
+
+    # 2. 저장된 패널에 오늘 스냅샷 반영, 다시 받아야 할 종목 판정
+    panel = load_mosig_panel(profile['panel_path'])
+    snapshot = snapshot_rows(listing, bar_date)
+    _put_rows(panel, snapshot)
+    need_history = stale_codes(panel, ordered_codes, trading_dates, price_limit=profile['price_limit'])
+    panel['complete'] -= need_history
+    print(f"📦 저장된 이력 재사용 {len(ordered_codes) - len(need_history)}개 / 개별 수집 필요 {len(need_history)}개")
+
+    # 3. 거래대금 순 청크 처리: (필요 시) 이력 수집 → 패널 병합 → 신호 계산
+    history_start = trading_dates[-min(len(trading_dates), cfg.MOSIG_PANEL_ROWS)].strftime('%Y-%m-%d')
+    candidates, scanned, skipped = [], 0, 0
+    scan_sec = 0.0
+    for i in range(0, len(ordered_codes), cfg.MOSIG_CHUNK_SIZE):
+        chunk = ordered_codes[i:i + cfg.MOSIG_CHUNK_SIZE]
+        to_fetch = [c for c in chunk if c in need_history]
+        if to_fetch and time.monotonic() < deadline:
+            frames = fetch_ohlcv_frames({c: names[c] for c in to_fetch}, history_start, deadline, market=market)
+            # 받은 종목은 기존 이력을 버리고 새 이력으로 교체 (기준일 봉이 아직 없으면 스냅샷 값 유지)
+            for field in PANEL_FIELDS:
+                panel[field] = panel[field].drop(columns=list(frames), errors='ignore')
+            _put_rows(panel, {field: snapshot[field].reindex(columns=list(frames)) for field in PANEL_FIELDS})
+            _put_rows(panel, build_ohlcv_panel(frames))
+            need_history -= set(frames)
+            panel['complete'] |= set(frames)
+            del frames
+
+        ready = [c for c in chunk if c not in need_history]
+        skipped += len(chunk) - len(ready)
+        if not ready:
+            continue
+        t0 = time.perf_counter()
+        sub = {field: panel[field].loc[:bar_date, ready].iloc[-cfg.MOSIG_PANEL_ROWS:] for field in PANEL_FIELDS}
+        candidates += scan_breakouts(sub, names, marcaps, market=market)
+        scan_sec += time.perf_counter() - t0
+        scanned += len(ready)
+
+    save_mosig_panel(panel, profile['panel_path'])
+    print(f"\n✅ 분석 완료! 평가 {scanned}개 / 이력 부족으로 제외 {skipped}개 "
+          f"(총 {time.monotonic() - started:.1f}초, 신호 계산 {scan_sec * 1000:.0f}ms)")
+    return candidates
+
+
+# =========================================================
+# 메시지
+# =========================================================
+def format_message(candidates, market='KR'):
+    """텔레그램 메시지 포맷팅 (익절/손절가 포함, 통화 표시는 시장 프로필 기준)"""
+    profile = MARKETS[market]
+    if not candidates:
+        return profile['empty_message']
+
+    # config.MOSIG_STRATEGY 기준 내림차순 정렬 (값이 없는 종목은 뒤로)
+    rank_key, rank_label = RANK_KEYS.get(cfg.MOSIG_STRATEGY, RANK_KEYS['value'])
+
+    def _rank_value(stock):
+        value = stock.get(rank_key, np.nan)
+        return (False, 0.0) if pd.isna(value) else (True, value)
+
+    candidates.sort(key=_rank_value, reverse=True)
+
+    # 상위 N개
+    top_list = candidates[:profile['pick_count']]
+    price = profile['format_price']
+
+    msg = f"{profile['title']}\n"
+    msg += f"{profile['clock']()}\n"
+    msg += f"조건: 거래량 {VOL_MULT}배↑ / 손절 -{STOP_LOSS_RATE*100}%\n"
+    msg += f"정렬: {rank_label}\n"
+    msg += "-" * 28 + "\n"
+
+    for i, stock in enumerate(top_list):
+        msg += f"*{i+1}. {stock['Name']}* ({stock['Code']})\n"
+        msg += f"   💰 현  재: {price(stock['Price'])}\n"
+        msg += f"   🎯 목  표: *{price(stock['TargetPrice'])}* (+{stock['TargetPct']:.1f}%)\n"
+        msg += f"   🛡️ 손  절: {price(stock['StopPrice'])}\n"
+        msg += f"   📊 M: {stock['Momentum']:.1f} / Vol: {stock['VolumeRatio']:.1f}배 / ATR: {price(stock['ATR'])}\n"
+        if rank_key == 'Slope' and not pd.isna(stock.get('Slope', np.nan)):
+            msg += f"   📈 추세: 일 {np.expm1(stock['Slope']) * 100:+.2f}%\n"
+        elif rank_key == 'Marcap' and not pd.isna(stock.get('Marcap', np.nan)):
+            msg += f"   🏢 시총: {profile['format_marcap'](stock['Marcap'])}\n"
+        msg += "\n"
+
+    msg += "-" * 28
+    msg += f"\n총 {len(candidates)}개 종목 포착됨"
+    if len(candidates) > len(top_list):
+        msg += f" (상위 {len(top_list)}개 출력)"
+
+    return msg
+
+
+if __name__ == "__main__":
+    targets = [m.upper() for m in sys.argv[1:]] or list(MARKETS)
+    results = scan_markets(targets)
+    for market, detected in results.items():
+        print("\n" + "=" * 45)
+        print(format_message(detected, market))
+        print("=" * 45)
+    shutdown()
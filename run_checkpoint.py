@@ -0,0 +1,105 @@
+# run_checkpoint.py
+"""
+통합 리포트 파이프라인 체크포인트.
+실행 ID(run ID)별 폴더(data/runs/<run_id>/)에 단계별 결과를 pickle로 저장해 두고,
+같은 실행 ID로 다시 돌리면 완료된 단계는 저장된 결과를 그대로 쓰고 실패한 단계부터 이어서 실행합니다.
+(이미 전송된 텔레그램 메시지도 다시 보내지 않음)
+
+실행 ID:
+- REPORT_RUN_ID 환경 변수가 있으면 그 값
+- GitHub Actions에서는 GITHUB_RUN_ID ("Re-run failed jobs" 해도 동일)
+- 로컬에서는 한국 시간 기준 날짜 + 오전/오후 (예: 20260105-AM)
+  → 같은 반나절 안의 로컬 재실행은 같은 실행으로 취급되어 보낸 메시지를 다시 보내지 않음
+    (일부러 새로 실행하려면 REPORT_RUN_ID를 다른 값으로 지정)
+"""
+
+import os
+import pickle
+import shutil
+import threading
+import datetime
+
+import pytz
+
+import config as cfg
+
+
+def default_run_id():
+    if os.environ.get('REPORT_RUN_ID'):
+        return os.environ['REPORT_RUN_ID']
+    if os.environ.get('GITHUB_RUN_ID'):
+        return f"gh-{os.environ['GITHUB_RUN_ID']}"
+    now = datetime.datetime.now(pytz.timezone('Asia/Seoul'))
+    return f"{now.strftime('%Y%m%d')}-{'AM' if now.hour < 12 else 'PM'}"
+
+
+class RunCheckpoint:
+    """단계별 결과 저장소. 단계 이름은 'etf.listing', 'send.report' 처럼 점으로 구분"""
+
+    def __init__(self, run_id=None, base_dir=None, prefix=''):
+        self.run_id = run_id or default_run_id()
+        self.base_dir = base_dir or cfg.RUN_CHECKPOINT_DIR
+        self.run_dir = os.path.join(self.base_dir, self.run_id)
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        os.makedirs(self.run_dir, exist_ok=True)
+
+    def scope(self, name):
+        """하위 단계용 체크포인트 (예: ckpt.scope('etf').run('listing', ...) → 'etf.listing')"""
+        child = RunCheckpoint.__new__(RunCheckpoint)
+        child.__dict__.update(self.__dict__)
+        child.prefix = f"{self.prefix}{name}."
+        return child
+
+    def _path(self, stage):
+        return os.path.join(self.run_dir, f"{self.prefix}{stage}.pkl")
+
+    def has(self, stage):
+        return os.path.exists(self._path(stage))
+
+    def load(self, stage):
+        with open(self._path(stage), 'rb') as f:
+            return pickle.load(f)
+
+    def save(self, stage, value):
+        # 임시 파일에 쓴 뒤 교체 (저장 도중 중단돼도 반쯤 쓴 체크포인트가 남지 않음)
+        path = self._path(stage)
+        with self._lock:
+            with open(path + '.tmp', 'wb') as f:
+                pickle.dump(value, f)
+            os.replace(path + '.tmp', path)
+
+    def run(self, stage, func, is_complete=None):
+        """
+        완료된 단계면 저장된 결과를 반환하고, 아니면 func()를 실행해 저장합니다.
+        :param is_complete: 결과를 받아 저장 여부를 판단 (False면 저장하지 않아 다음 실행에서 재시도)
+        """
+        if self.has(stage):
+            try:
+                value = self.load(stage)
+                print(f"♻️  [체크포인트] {self.prefix}{stage} 재사용 ({self.run_id})")
+                return value
+            except Exception as e:
+                print(f"⚠️ [체크포인트] {self.prefix}{stage} 로드 실패, 다시 실행: {e}")
+
+        value = func()
+        if is_complete is None or is_complete(value):
+            self.save(stage, value)
+        return value
+
+    def prune(self, keep=None):
+        """오래된 실행 폴더 정리 (최근 keep개 유지)"""
+        keep = cfg.RUN_CHECKPOINT_KEEP if keep is None else keep
+        runs = sorted(
+            (d for d in os.listdir(self.base_dir) if os.path.isdir(os.path.join(self.base_dir, d))),
+            key=lambda d: os.path.getmtime(os.path.join(self.base_dir, d)),
+        )
+        for old in [d for d in runs if d != self.run_id][:max(0, len(runs) - keep)]:
+            shutil.rmtree(os.path.join(self.base_dir, old), ignore_errors=True)
+
+
+def checkpointed(ckpt, stage, func, is_complete=None):
+    """ckpt가 없으면(개별 봇 단독 실행) 그냥 실행"""
+    if ckpt is None:
+        return func()
+    return ckpt.run(stage, func, is_complete)
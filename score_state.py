@@ -0,0 +1,358 @@
+# score_state.py
+"""
+모멘텀 스코어 증분 계산 상태.
+매일 1년치 시세를 다시 받아 pct_change(20/60/120), rolling(60).std()를 전부 계산한 뒤
+마지막 행만 쓰던 방식을 대신해, 유니버스별로 아래 상태를 data/ 에 저장해 두고
+새 거래일이 생기면 그 날짜만 반영합니다. (하루 추가 시 O(종목 수))
+
+- 종가 링버퍼: 최근 max(lags)+1 거래일 종가 (n일 수익률 계산용)
+- 일간 수익률 링버퍼 + 누적합/제곱합/유효개수: rolling(vol_window).std() 계산용
+- 점수 기록(score log): 스크리너처럼 과거 시점 점수가 필요한 경우 최근 N일 점수 보관
+"""
+
+import os
+import pickle
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+import config as cfg
+
+STATE_VERSION = 1
+EPSILON = 1e-6  # 0으로 나누기 방지 (기존 봇과 동일)
+
+
+class ScoreState:
+    """유니버스 하나의 증분 스코어 상태"""
+
+    def __init__(self, tickers, lags=(20, 60, 120), vol_window=60, log_size=0, log_spec=None):
+        self.version = STATE_VERSION
+        self.tickers = list(tickers)
+        self.lags = tuple(lags)
+        self.vol_window = vol_window
+        self.buffer_len = max(self.lags) + 1
+        # log_spec: ('weighted', (w1, w2, w3)) 또는 ('vol_adjusted', (단기, 장기))
+        self.log_size = log_size if log_spec else 0
+        self.log_spec = log_spec
+
+        n = len(self.tickers)
+        self.dates = []                                      # 종가 링버퍼에 들어있는 날짜 (오래된 순)
+        self.closes = np.full((self.buffer_len, n), np.nan)  # 종가 링버퍼
+        self.head = -1                                       # 가장 최근 종가 위치
+        self.rets = np.full((vol_window, n), np.nan)         # 일간 수익률 링버퍼
+        self.ret_head = -1
+        self.ret_sum = np.zeros(n)
+        self.ret_sumsq = np.zeros(n)
+        self.ret_cnt = np.zeros(n, dtype=np.int64)
+        self.valid_counts = np.zeros(n, dtype=np.int64)      # 지금까지 관측된 유효 종가 수
+        self.updates_since_resync = 0
+        self.score_dates = []
+        self.score_log = np.full((self.log_size, n), np.nan)
+        self.last_date = None
+        self.synced_on = None
+
+    # ------------------------------------------------------------------
+    # 구성
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_frame(cls, price_frame, **kwargs):
+        """전체 시세(행: 날짜, 열: 종목)로 상태를 새로 만듭니다."""
+        state = cls(list(price_frame.columns), **kwargs)
+        state._load_columns(price_frame)
+        return state
+
+    def _load_columns(self, price_frame):
+        """
+        price_frame의 열들로 해당 종목 상태를 다시 계산합니다.
+        새 상태이면 날짜축도 price_frame 기준으로 잡고, 기존 상태이면 보관 중인 날짜축에 맞춥니다.
+        """
+        frame = price_frame.sort_index().ffill()
+        if self.last_date is None:
+            self.dates = list(frame.index[-self.buffer_len:])
+            self.head = len(self.dates) - 1
+            self.ret_head = self.vol_window - 1
+            self.last_date = frame.index[-1]
+            if self.log_size:
+                self.score_dates = list(frame.index[-self.log_size:])
+        else:
+            frame = frame.reindex(frame.index.union(self.dates)).ffill().loc[:self.last_date]
+
+        idx = [self.tickers.index(t) for t in frame.columns]
+        values = frame.to_numpy(dtype=float)
+        aligned = frame.reindex(self.dates).to_numpy(dtype=float)
+
+        # 종가 링버퍼: 링 위치 순서대로 채우기
+        n_rows = len(self.dates)
+        pos = [(self.head - (n_rows - 1 - k)) % self.buffer_len for k in range(n_rows)]
+        self.closes[:, idx] = np.nan
+        self.closes[np.ix_(pos, idx)] = aligned
+
+        # 일간 수익률 링버퍼 (마지막 vol_window개)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rets = (aligned[1:] / aligned[:-1] - 1)[-self.vol_window:]
+        r_pos = [(self.ret_head - (len(rets) - 1 - k)) % self.vol_window for k in range(len(rets))]
+        self.rets[:, idx] = np.nan
+        self.rets[np.ix_(r_pos, idx)] = rets
+        self._resync(idx)
+
+        self.valid_counts[idx] = np.sum(~np.isnan(values), axis=0)
+
+        if self.log_size:
+            n_log = len(self.score_dates)
+            scores = score_frame(frame, self.log_spec, self.lags, self.vol_window)
+            self.score_log[:, idx] = np.nan
+            rows = list(range(self.log_size - n_log, self.log_size))
+            self.score_log[np.ix_(rows, idx)] = scores.reindex(self.score_dates).to_numpy(dtype=float)
+
+    def _resync(self, idx=None):
+        """누적합/제곱합을 링버퍼에서 다시 계산 (부동소수점 오차 누적 방지)"""
+        cols = slice(None) if idx is None else idx
+        window = self.rets[:, cols]
+        valid = ~np.isnan(window)
+        self.ret_sum[cols] = np.where(valid, window, 0.0).sum(axis=0)
+        self.ret_sumsq[cols] = np.where(valid, window * window, 0.0).sum(axis=0)
+        self.ret_cnt[cols] = valid.sum(axis=0)
+        if idx is None:
+            self.updates_since_resync = 0
+
+    def set_tickers(self, tickers):
+        """유니버스 변경: 빠진 종목은 제거하고, 새 종목은 NaN 열로 추가 (이후 _load_columns로 채움)"""
+        tickers = list(tickers)
+        keep = [self.tickers.index(t) for t in tickers if t in self.tickers]
+        new = [t for t in tickers if t not in self.tickers]
+        order = [t for t in tickers if t in self.tickers] + new
+
+        def _resize(arr, fill):
+            kept = arr[..., keep]
+            pad_shape = arr.shape[:-1] + (len(new),)
+            return np.concatenate([kept, np.full(pad_shape, fill, dtype=arr.dtype)], axis=-1)
+
+        self.closes = _resize(self.closes, np.nan)
+        self.rets = _resize(self.rets, np.nan)
+        self.ret_sum = _resize(self.ret_sum, 0.0)
+        self.ret_sumsq = _resize(self.ret_sumsq, 0.0)
+        self.ret_cnt = _resize(self.ret_cnt, 0)
+        self.valid_counts = _resize(self.valid_counts, 0)
+        self.score_log = _resize(self.score_log, np.nan)
+        self.tickers = order
+        return new
+
+    # ------------------------------------------------------------------
+    # 증분 갱신
+    # ------------------------------------------------------------------
+    def update(self, date, closes):
+        """
+        새 거래일 하루를 반영합니다.
+        :param closes: self.tickers 순서의 종가 배열 (NaN은 직전 종가로 채움 = ffill)
+        """
+        closes = np.asarray(closes, dtype=float)
+        prev = self.closes[self.head]
+        closes = np.where(np.isnan(closes), prev, closes)
+
+        # 종가 링버퍼 전진
+        self.head = (self.head + 1) % self.buffer_len
+        self.closes[self.head] = closes
+        self.dates = (self.dates + [date])[-self.buffer_len:]
+
+        # 수익률 링버퍼 전진 + 누적합 갱신 (빠지는 값 차감, 들어오는 값 가산)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            new_ret = closes / prev - 1
+        self.ret_head = (self.ret_head + 1) % self.vol_window
+        old_ret = self.rets[self.ret_head]
+        old_valid = ~np.isnan(old_ret)
+        new_valid = ~np.isnan(new_ret)
+        self.ret_sum += np.where(new_valid, new_ret, 0.0) - np.where(old_valid, old_ret, 0.0)
+        self.ret_sumsq += np.where(new_valid, new_ret ** 2, 0.0) - np.where(old_valid, old_ret ** 2, 0.0)
+        self.ret_cnt += new_valid.astype(np.int64) - old_valid.astype(np.int64)
+        self.rets[self.ret_head] = new_ret
+
+        self.valid_counts += ~np.isnan(closes)
+        self.last_date = date
+
+        self.updates_since_resync += 1
+        if self.updates_since_resync >= self.vol_window:
+            self._resync()
+
+        if self.log_size:
+            self.score_log = np.roll(self.score_log, -1, axis=0)
+            self.score_log[-1] = self.score(self.log_spec).to_numpy()
+            self.score_dates = (self.score_dates + [date])[-self.log_size:]
+
+    def apply_frame(self, new_rows):
+        """last_date 이후 날짜의 행들을 순서대로 반영합니다."""
+        new_rows = new_rows.reindex(columns=self.tickers).sort_index()
+        new_rows = new_rows[new_rows.index > self.last_date]
+        for date, row in new_rows.iterrows():
+            self.update(date, row.to_numpy(dtype=float))
+        return len(new_rows)
+
+    # ------------------------------------------------------------------
+    # 점수 조회
+    # ------------------------------------------------------------------
+    def momentum(self, lag):
+        """price.pct_change(lag).iloc[-1] 와 동일"""
+        past = self.closes[(self.head - lag) % self.buffer_len]
+        if len(self.dates) <= lag:
+            past = np.full(len(self.tickers), np.nan)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return pd.Series(self.closes[self.head] / past - 1, index=self.tickers)
+
+    def volatility(self):
+        """price.pct_change().rolling(vol_window).std().iloc[-1] 와 동일 (표본표준편차)"""
+        n = self.ret_cnt.astype(float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            var = (self.ret_sumsq - self.ret_sum ** 2 / n) / (n - 1)
+        std = np.sqrt(np.clip(var, 0.0, None))
+        std[self.ret_cnt < self.vol_window] = np.nan
+        return pd.Series(std, index=self.tickers)
+
+    def weighted_momentum(self, weights):
+        """가중 모멘텀: 20/60/120일 수익률 가중합 (NaN은 0)"""
+        total = pd.Series(0.0, index=self.tickers)
+        for lag, w in zip(self.lags, weights):
+            total += self.momentum(lag).fillna(0) * w
+        return total
+
+    def vol_adjusted(self, short=60, long=120):
+        """변동성 조절 모멘텀: (단기/변동성, 장기/변동성) 평균"""
+        vol = self.volatility()
+        score_short = self.momentum(short) / (vol + EPSILON)
+        score_long = self.momentum(long) / (vol + EPSILON)
+        return (score_short.fillna(0) * 0.5) + (score_long.fillna(0) * 0.5)
+
+    def score(self, spec):
+        kind, params = spec
+        if kind == 'weighted':
+            return self.weighted_momentum(params)
+        return self.vol_adjusted(*params)
+
+    def score_history(self):
+        """기록된 최근 점수 (행: 날짜, 열: 종목)"""
+        n = len(self.score_dates)
+        return pd.DataFrame(self.score_log[self.log_size - n:], index=self.score_dates, columns=self.tickers)
+
+    def price_frame(self):
+        """보관 중인 최근 종가 (행: 날짜, 열: 종목) - 기존 raw_data 대용"""
+        n = len(self.dates)
+        pos = [(self.head - (n - 1 - k)) % self.buffer_len for k in range(n)]
+        return pd.DataFrame(self.closes[pos], index=self.dates, columns=self.tickers)
+
+    def valid_count(self):
+        return pd.Series(self.valid_counts, index=self.tickers)
+
+    def last_close(self):
+        return pd.Series(self.closes[self.head], index=self.tickers)
+
+    # ------------------------------------------------------------------
+    # 저장/로드
+    # ------------------------------------------------------------------
+    def save(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self, f)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path):
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                state = pickle.load(f)
+            return state if getattr(state, 'version', None) == STATE_VERSION else None
+        except Exception as e:
+            print(f"⚠️ 스코어 상태 로드 실패 ({path}): {e}")
+            return None
+
+
+def score_frame(price_data, spec, lags=(20, 60, 120), vol_window=60):
+    """전체 기간 점수 (상태 생성 시 score log 초기화용, 기존 벡터 계산과 동일)"""
+    kind, params = spec
+    if kind == 'weighted':
+        scores = 0
+        for lag, w in zip(lags, params):
+            scores = scores + price_data.pct_change(lag).fillna(0) * w
+        return scores
+    short, long = params
+    vol = price_data.pct_change().rolling(vol_window).std()
+    score_short = price_data.pct_change(short) / (vol + EPSILON)
+    score_long = price_data.pct_change(long) / (vol + EPSILON)
+    return (score_short.fillna(0) * 0.5) + (score_long.fillna(0) * 0.5)
+
+
+def state_path(key):
+    return os.path.join(cfg.SCORE_STATE_DIR, f"score_state_{key}.pkl")
+
+
+def sync_score_state(key, tickers, fetcher=None, lookback_days=365, reuse_same_day=False, **state_kwargs):
+    """
+    저장된 상태를 불러와 최신 거래일까지 증분 갱신합니다.
+    - 상태가 없거나 설정이 바뀌었거나 너무 오래됐으면 lookback_days 시세로 새로 생성
+    - 새로 편입된 종목, 직전 종가가 달라진 종목(액면분할/수정주가 등)은 해당 종목만 전체 시세로 재계산
+    :param tickers: {'종목명': '종목코드'}
+    :param fetcher: fetcher(tickers, start_date, end_date) -> 종가 DataFrame (기본: common.fetch_data_in_parallel)
+    :return: ScoreState
+    """
+    if fetcher is None:
+        from common import fetch_data_in_parallel
+        fetcher = fetch_data_in_parallel
+
+    now = datetime.now()
+    end_date = now.strftime("%Y-%m-%d")
+    full_start = (now - timedelta(days=lookback_days)).strftime("%Y-%m-%d")
+    path = state_path(key)
+
+    def _build():
+        print(f"🧮 [{key}] 스코어 상태 신규 생성 (전체 {lookback_days}일 시세)")
+        frame = fetcher(tickers, full_start, end_date)
+        if frame.empty:
+            return None
+        state = ScoreState.from_frame(frame, **state_kwargs)
+        state.synced_on = now.date()
+        state.save(path)
+        return state
+
+    state = ScoreState.load(path)
+    probe = ScoreState([], **state_kwargs)
+    if (state is None or state.last_date is None
+            or (state.lags, state.vol_window, state.log_size, state.log_spec)
+            != (probe.lags, probe.vol_window, probe.log_size, probe.log_spec)
+            or (now - pd.Timestamp(state.last_date)).days > cfg.SCORE_STATE_MAX_GAP_DAYS):
+        return _build()
+
+    if reuse_same_day and state.synced_on == now.date() and set(state.tickers) == set(tickers):
+        print(f"📦 [{key}] 당일 갱신된 스코어 상태 사용")
+        return state
+
+    new_names = state.set_tickers(tickers.keys())
+    old_names = [t for t in state.tickers if t not in new_names]
+
+    # 기존 종목: 마지막 저장일부터 받아 겹치는 날짜로 검증 후 신규 거래일만 반영
+    last_date = pd.Timestamp(state.last_date)
+    new_rows = fetcher({t: tickers[t] for t in old_names}, last_date.strftime("%Y-%m-%d"), end_date)
+    rebuild = list(new_names)
+    if not new_rows.empty:
+        if last_date in new_rows.index:
+            stored = state.last_close()[new_rows.columns]
+            fetched = new_rows.loc[last_date]
+            changed = ~np.isclose(stored.to_numpy(), fetched.to_numpy(), rtol=1e-6, equal_nan=True) & fetched.notna().to_numpy()
+            rebuild += list(fetched.index[changed])
+        added = state.apply_frame(new_rows)
+        print(f"🧮 [{key}] 신규 거래일 {added}일 증분 반영 (기준일: {pd.Timestamp(state.last_date).date()})")
+
+    if rebuild:
+        print(f"🧮 [{key}] 신규/수정 종목 {len(rebuild)}개 전체 재계산")
+        frame = fetcher({t: tickers[t] for t in rebuild}, full_start, end_date)
+        if not frame.empty:
+            state._load_columns(frame)
+
+    # 데이터를 전혀 받지 못한 종목은 제외
+    missing = [t for t in state.tickers if state.valid_counts[state.tickers.index(t)] == 0]
+    if missing:
+        state.set_tickers([t for t in state.tickers if t not in missing])
+
+    state.synced_on = now.date()
+    state.save(path)
+    return state
@@ -0,0 +1,289 @@
+# telegram_dispatcher.py
+"""
+텔레그램 메시지 발송기.
+- keep-alive 세션(커넥션 풀) 재사용 + POST 전송 (메시지를 URL 쿼리에 싣지 않음)
+- 채팅방별 전송 간격 / 그룹 분당 한도 / 전체 초당 한도 준수, 429 응답 시 retry_after 만큼 대기 후 재시도
+- 4096자 제한을 넘는 메시지는 줄 단위로 나눠 순서대로 전송
+- 비동기 모드: 큐에 넣고 바로 반환 (백그라운드 스레드가 전송, 프로세스 종료 전 남은 메시지 전송)
+
+로컬 테스트 (가짜 Bot API 서버로 분할/429/순서 확인):
+    python telegram_dispatcher.py
+"""
+
+import atexit
+import collections
+import queue
+import re
+import threading
+import time
+from concurrent.futures import Future
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import config as cfg
+
+MAX_MESSAGE_LEN = 4096   # 텔레그램 메시지 최대 길이 (UTF-16 기준)
+GLOBAL_INTERVAL = 1 / 30 # 봇 전체 초당 30건
+GROUP_PER_MINUTE = 20    # 그룹 채팅방 분당 20건
+
+
+def _tg_len(text):
+    """텔레그램은 UTF-16 코드 단위로 길이를 셈 (이모지는 2)"""
+    return len(text.encode('utf-16-le')) // 2
+
+
+def split_message(text, limit=MAX_MESSAGE_LEN):
+    """
+    긴 메시지를 줄 경계에서 limit 이하 조각으로 나눕니다.
+    (HTML/Markdown 태그는 줄 안에서 닫히므로 줄 단위로 자르면 서식이 깨지지 않음)
+    한 줄이 limit보다 길면 그 줄만 글자 단위로 자릅니다.
+    줄바꿈은 다음 조각 앞에 남겨 ''.join(조각) == text (경계의 빈 줄도 보존)
+    """
+    if _tg_len(text) <= limit:
+        return [text]
+
+    chunks, current = [], ''
+    for i, line in enumerate(text.split('\n')):
+        piece = line if i == 0 else '\n' + line
+        while _tg_len(piece) > limit:
+            if current:
+                chunks.append(current)
+                current = ''
+            cut = limit
+            while _tg_len(piece[:cut]) > limit:
+                cut -= 1
+            chunks.append(piece[:cut])
+            piece = piece[cut:]
+        if current and _tg_len(current + piece) > limit:
+            chunks.append(current)
+            current = piece
+        else:
+            current += piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class TelegramDispatcher:
+    """봇 토큰 하나에 대한 발송기 (스레드 안전)"""
+
+    def __init__(self, token, api_base=None, timeout=None, max_retries=None, chat_interval=None):
+        self.token = token
+        self.api_base = (api_base or cfg.TELEGRAM_API_BASE).rstrip('/')
+        self.timeout = timeout or cfg.TELEGRAM_TIMEOUT
+        self.max_retries = cfg.TELEGRAM_MAX_RETRIES if max_retries is None else max_retries
+        self.chat_interval = cfg.TELEGRAM_CHAT_INTERVAL if chat_interval is None else chat_interval
+
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=2, pool_maxsize=4))
+        self.session.mount('http://', HTTPAdapter(pool_connections=2, pool_maxsize=4))
+
+        self._rate_lock = threading.Lock()
+        self._send_lock = threading.Lock()  # 조각 메시지 순서 보장
+        self._last_global = 0.0
+        self._last_by_chat = {}
+        self._group_history = collections.defaultdict(collections.deque)
+
+        self._queue = queue.Queue()
+        self._worker = None
+
+    # ------------------------------------------------------------------
+    # 공개 API
+    # ------------------------------------------------------------------
+    def send(self, text, chat_id, parse_mode='HTML', block=True):
+        """
+        메시지를 전송합니다. 길면 나눠서 보냅니다.
+        :param block: False면 큐에 넣고 바로 반환
+        :return: block=True면 전송 성공 여부(bool), False면 결과를 담을 Future
+        """
+        if block:
+            return self._deliver(text, chat_id, parse_mode)
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((text, chat_id, parse_mode, future))
+        return future
+
+    def flush(self, timeout=None):
+        """큐에 남은 메시지가 모두 전송될 때까지 대기"""
+        if self._worker is None:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    # ------------------------------------------------------------------
+    # 내부 구현
+    # ------------------------------------------------------------------
+    def _ensure_worker(self):
+        with self._rate_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run_queue, name='telegram-dispatcher', daemon=True)
+                self._worker.start()
+                atexit.register(self.flush, cfg.TELEGRAM_FLUSH_TIMEOUT)
+
+    def _run_queue(self):
+        while True:
+            text, chat_id, parse_mode, future = self._queue.get()
+            try:
+                future.set_result(self._deliver(text, chat_id, parse_mode))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    def _deliver(self, text, chat_id, parse_mode):
+        chunks = split_message(text)
+        with self._send_lock:
+            for i, chunk in enumerate(chunks, 1):
+                if not self._post(chunk, chat_id, parse_mode):
+                    print(f"❌ 텔레그램 전송 실패 (Chat ID: {chat_id}, {i}/{len(chunks)})")
+                    return False
+        suffix = f", {len(chunks)}개로 분할" if len(chunks) > 1 else ""
+        print(f"✅ 텔레그램 전송 완료 (Chat ID: {chat_id}{suffix})")
+        return True
+
+    def _wait_rate_limit(self, chat_id):
+        """전체 초당 한도, 채팅방별 간격, 그룹 분당 한도를 지키도록 대기"""
+        while True:
+            with self._rate_lock:
+                now = time.monotonic()
+                wait = max(
+                    self._last_global + GLOBAL_INTERVAL - now,
+                    self._last_by_chat.get(chat_id, 0.0) + self.chat_interval - now,
+                )
+                history = self._group_history[chat_id]
+                if str(chat_id).startswith('-'):
+                    while history and now - history[0] >= 60:
+                        history.popleft()
+                    if len(history) >= GROUP_PER_MINUTE:
+                        wait = max(wait, history[0] + 60 - now)
+                if wait <= 0:
+                    self._last_global = now
+                    self._last_by_chat[chat_id] = now
+                    if str(chat_id).startswith('-'):
+                        history.append(now)
+                    return
+            time.sleep(wait)
+
+    def _post(self, text, chat_id, parse_mode):
+        url = f"{self.api_base}/bot{self.token}/sendMessage"
+        payload = {'chat_id': chat_id, 'text': text}
+        if parse_mode:
+            payload['parse_mode'] = parse_mode
+
+        for attempt in range(self.max_retries + 1):
+            self._wait_rate_limit(chat_id)
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                print(f"⚠️ 텔레그램 연결 오류 ({attempt + 1}/{self.max_retries + 1}): {e}")
+                time.sleep(min(2 ** attempt, 30))
+                continue
+
+            if response.status_code == 200:
+                return True
+
+            try:
+                body = response.json()
+            except ValueError:
+                body = {}
+
+            if response.status_code == 429:
+                # 한도 초과: 서버가 알려준 시간만큼 대기 후 재시도
+                retry_after = body.get('parameters', {}).get('retry_after', 1)
+                print(f"⏳ 텔레그램 전송 한도 초과 → {retry_after}초 후 재시도")
+                time.sleep(retry_after)
+                continue
+
+            if response.status_code == 400 and 'parse' in body.get('description', '') and 'parse_mode' in payload:
+                # 서식 파싱 실패: 태그를 제거하고 일반 텍스트로 다시 전송
+                print(f"⚠️ 텔레그램 서식 오류 → 일반 텍스트로 재전송: {body.get('description')}")
+                payload.pop('parse_mode')
+                payload['text'] = re.sub('<.*?>', '', text) if parse_mode == 'HTML' else text
+                continue
+
+            if response.status_code >= 500:
+                time.sleep(min(2 ** attempt, 30))
+                continue
+
+            print(f"    - Status Code: {response.status_code}")
+            print(f"    - Response: {response.text}")
+            return False
+        return False
+
+
+_dispatchers = {}
+_dispatchers_lock = threading.Lock()
+
+
+def get_dispatcher(token, api_base=None):
+    """토큰별 발송기 (프로세스 안에서 세션/큐/전송 간격 공유)"""
+    key = (token, api_base or cfg.TELEGRAM_API_BASE)
+    with _dispatchers_lock:
+        if key not in _dispatchers:
+            _dispatchers[key] = TelegramDispatcher(token, api_base=api_base)
+        return _dispatchers[key]
+
+
+# ----------------------------------------------------------------------
+# 로컬 가짜 Bot API 서버로 동작 확인
+# ----------------------------------------------------------------------
+def _run_selftest():
+    import json
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    received = []
+    state = {'calls': 0}
+
+    class FakeBotAPI(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep-alive
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            state['calls'] += 1
+            if state['calls'] == 2:
+                status, reply = 429, {'ok': False, 'error_code': 429, 'parameters': {'retry_after': 1}}
+            elif _tg_len(body['text']) > MAX_MESSAGE_LEN:
+                status, reply = 400, {'ok': False, 'description': 'Bad Request: message is too long'}
+            else:
+                received.append((body['chat_id'], body['text']))
+                status, reply = 200, {'ok': True, 'result': {'message_id': len(received)}}
+            data = json.dumps(reply).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeBotAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    dispatcher = TelegramDispatcher('TEST', api_base=api_base, chat_interval=0.2)
+    long_text = '\n'.join(f"<b>{i}위. 테스트 종목 📈</b> 점수: {i * 0.001:.3f}" for i in range(400))
+
+    started = time.monotonic()
+    assert dispatcher.send('첫 메시지', chat_id='1')
+    queue_started = time.monotonic()
+    futures = [dispatcher.send(long_text, chat_id='1', block=False),
+               dispatcher.send('마지막 메시지', chat_id='2', block=False)]
+    queued_in = time.monotonic() - queue_started
+    assert all(f.result(timeout=30) for f in futures)
+    server.shutdown()
+
+    parts = [t for c, t in received if c == '1'][1:]
+    assert ''.join(parts) == long_text, "분할 후 재조합 결과가 원문과 다름"
+    assert all(0 < _tg_len(p) <= MAX_MESSAGE_LEN for p in parts), "빈 조각 또는 길이 초과 조각"
+    print(f"\n✅ 자체 테스트 통과: 서버 호출 {state['calls']}회 (429 1회 포함), "
+          f"긴 메시지 {len(parts)}개로 분할, 큐 등록 {queued_in * 1000:.1f}ms, 총 {time.monotonic() - started:.1f}초")
+
+
+if __name__ == '__main__':
+    _run_selftest()
@@ -0,0 +1,225 @@
+# ticker_index.py
+"""
+KOSPI/KOSDAQ 종목코드 ↔ 종목명 인덱스.
+KRX 전종목 목록 1회 호출로 만들고 data/ticker_index.json에 저장합니다.
+- 갱신은 증분 병합: 신규 상장은 추가, 사명 변경은 덮어쓰기, 상장폐지 종목은 상장 여부만 false로 남김
+  (과거 보유 종목 이름 표시용)
+- 저장 형식: {'version', 'updated', 'tickers': {'종목코드': [종목명, 시장, 상장여부]}}
+- 통합 리포트(일일 작업)가 매일 갱신하고, 대시보드는 파일만 읽음 (하루 넘게 지났으면 직접 갱신)
+- build_search_index / search_names: 종목명 부분일치·초성·종목코드 접두 검색 (순위 고정)
+
+사용법:
+    python ticker_index.py      # 지금 갱신
+"""
+
+import os
+import json
+import bisect
+import datetime
+
+import pytz
+
+import config as cfg
+
+INDEX_VERSION = 1
+
+
+def _today():
+    return datetime.datetime.now(pytz.timezone('Asia/Seoul')).strftime('%Y-%m-%d')
+
+
+def fetch_listing():
+    """KRX 전종목 목록 1회 호출 → {'종목코드': (종목명, 시장)}"""
+    import FinanceDataReader as fdr
+    listing = fdr.StockListing('KRX')
+    listing = listing[listing['Market'].str.startswith(('KOSPI', 'KOSDAQ'))]
+    return {code: (name, market) for code, name, market in zip(listing['Code'], listing['Name'], listing['Market'])}
+
+
+def read_index(path=None):
+    """저장된 인덱스 (없거나 형식이 다르면 None)"""
+    path = path or cfg.TICKER_INDEX_PATH
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ 종목 인덱스 로드 실패: {e}")
+        return None
+    return index if index.get('version') == INDEX_VERSION else None
+
+
+def refresh_ticker_index(path=None, listing=None):
+    """
+    저장된 인덱스에 최신 전종목 목록을 병합해 저장합니다.
+    :param listing: fetch_listing() 결과 (없으면 호출)
+    :return: 갱신된 인덱스 dict, 목록 조회 실패 시 기존 인덱스
+    """
+    path = path or cfg.TICKER_INDEX_PATH
+    index = read_index(path) or {'version': INDEX_VERSION, 'updated': None, 'tickers': {}}
+    try:
+        listing = listing if listing is not None else fetch_listing()
+    except Exception as e:
+        print(f"⚠️ 종목 목록 조회 실패, 기존 인덱스 유지: {e}")
+        return index
+    if not listing:
+        return index
+
+    tickers = index['tickers']
+    added = renamed = delisted = 0
+    for code, (name, market) in listing.items():
+        old = tickers.get(code)
+        if old is None:
+            added += 1
+        elif old[0] != name:
+            renamed += 1
+        tickers[code] = [name, market, True]
+    for code, entry in tickers.items():
+        if code not in listing and entry[2]:
+            entry[2] = False
+            delisted += 1
+
+    index['updated'] = _today()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(path + '.tmp', path)
+    print(f"✅ 종목 인덱스 갱신: {len(listing)}개 상장 (신규 {added}, 사명변경 {renamed}, 상장폐지 {delisted})")
+    return index
+
+
+def name_maps(index):
+    """
+    인덱스 → (name_to_ticker, ticker_to_name)
+    name_to_ticker에는 상장 종목만 (같은 이름이면 상장 종목 우선), ticker_to_name은 상장폐지 포함
+    """
+    ticker_to_name = {code: entry[0] for code, entry in index['tickers'].items()}
+    name_to_ticker = {entry[0]: code for code, entry in sorted(index['tickers'].items()) if entry[2]}
+    return name_to_ticker, ticker_to_name
+
+
+def load_ticker_index(path=None, max_age_days=1):
+    """
+    저장된 인덱스를 읽어 (name_to_ticker, ticker_to_name) 반환.
+    파일이 없거나 max_age_days보다 오래됐으면 먼저 갱신합니다.
+    """
+    index = read_index(path)
+    stale = index is None or index.get('updated') is None or (
+        datetime.date.fromisoformat(_today()) - datetime.date.fromisoformat(index['updated'])
+    ).days >= max_age_days
+    if stale:
+        index = refresh_ticker_index(path)
+    return name_maps(index)
+
+
+# --- 종목명 검색 인덱스 (보유 종목 입력 해석용) ---
+_CHOSEONG = 'ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ'
+
+
+def _normalize(text):
+    return ''.join(text.split()).lower()
+
+
+def choseong(text):
+    """한글 음절을 초성으로 바꿈 (삼성전자 → ㅅㅅㅈㅈ), 나머지 문자는 그대로"""
+    out = []
+    for ch in text:
+        offset = ord(ch) - 0xAC00
+        out.append(_CHOSEONG[offset // 588] if 0 <= offset < 11172 else ch)
+    return ''.join(out)
+
+
+def _is_choseong(text):
+    return all(ch in _CHOSEONG for ch in text)
+
+
+def _grams(text):
+    """1·2글자 n-gram 집합"""
+    return set(text) | {text[i:i + 2] for i in range(len(text) - 1)}
+
+
+def _posting(keys):
+    posting = {}
+    for i, key in enumerate(keys):
+        for gram in _grams(key):
+            posting.setdefault(gram, set()).add(i)
+    return posting
+
+
+def build_search_index(name_to_ticker):
+    """
+    종목명 검색 인덱스 (정규화 이름/초성 각각의 1·2-gram 포스팅 + 정렬된 종목코드).
+    이름 순으로 정렬해 두어 같은 순위 안에서도 결과가 항상 같습니다.
+    """
+    names = sorted(name_to_ticker)
+    keys = [_normalize(name) for name in names]
+    initials = [choseong(key) for key in keys]
+    return {
+        'names': names,
+        'tickers': [name_to_ticker[name] for name in names],
+        'exact': {key: i for i, key in reversed(list(enumerate(keys)))},
+        'keys': keys,
+        'initials': initials,
+        'key_grams': _posting(keys),
+        'initial_grams': _posting(initials),
+        'codes': sorted(name_to_ticker.values()),
+        'code_names': {code: name for name, code in name_to_ticker.items()},
+    }
+
+
+def _lookup(posting, query):
+    """query의 n-gram을 모두 가진 후보 인덱스 (실제 부분 문자열 여부는 호출부에서 확인)"""
+    grams = [query[i:i + 2] for i in range(len(query) - 1)] or [query]
+    sets = sorted((posting.get(gram, set()) for gram in grams), key=len)
+    return sets[0].intersection(*sets[1:])
+
+
+def search_names(index, query, limit=5):
+    """
+    종목명/종목코드 검색 → [(종목명, 종목코드), ...] (순위순)
+    순위: 이름 일치 > 이름 접두 > 이름 포함 > 초성 일치 > 초성 접두 > 초성 포함, 같은 순위는 짧은 이름 우선.
+    숫자만 입력하면 종목코드 접두 검색.
+    """
+    q = _normalize(query)
+    if not q:
+        return []
+    if q.isdigit():
+        codes = index['codes']
+        start = bisect.bisect_left(codes, q)
+        matched = []
+        for code in codes[start:start + limit]:
+            if not code.startswith(q):
+                break
+            matched.append(code)
+        return [(index['code_names'][code], code) for code in matched]
+
+    if q in index['exact']:
+        i = index['exact'][q]
+        return [(index['names'][i], index['tickers'][i])]
+
+    ranked = []
+    keys, initials = index['keys'], index['initials']
+    for i in _lookup(index['key_grams'], q):
+        key = keys[i]
+        if q in key:
+            ranked.append((1 if key.startswith(q) else 2, len(key), index['names'][i], i))
+    if _is_choseong(q):
+        for i in _lookup(index['initial_grams'], q):
+            initial = initials[i]
+            if q in initial:
+                rank = 3 if initial == q else 4 if initial.startswith(q) else 5
+                ranked.append((rank, len(initial), index['names'][i], i))
+
+    seen, results = set(), []
+    for *_, i in sorted(ranked):
+        if i not in seen:
+            seen.add(i)
+            results.append((index['names'][i], index['tickers'][i]))
+            if len(results) == limit:
+                break
+    return results
+
+
+if __name__ == "__main__":
+    refresh_ticker_index()
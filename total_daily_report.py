@@ -3,15 +3,22 @@
 import sys
 import os
 import datetime
+import time
+import queue
+import threading
+from concurrent.futures import Future
 import pytz
 import config as cfg
-from common import send_telegram
+from common import send_telegram, set_cancel_event
+from run_checkpoint import RunCheckpoint
 
 # 각 봇 모듈 임포트
 # 파일 이름이 숫자로 시작해서 importlib 사용 혹은 별칭으로 import 해야 할 수도 있지만, 
 # 파이썬에서는 숫자로 시작하는 모듈 import가 까다로움.
 # 여기서는 importlib을 사용하여 동적으로 가져오겠습니다.
-import importlib
+import importlib.util
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
 def import_module_by_path(module_name, file_path):
     spec = importlib.util.spec_from_file_location(module_name, file_path)
@@ -20,39 +27,266 @@ def import_module_by_path(module_name, file_path):
     spec.loader.exec_module(module)
     return module
 
-# 모듈 로드
-etf_bot = import_module_by_path("etf_bot", "1m_auto_bot_upload_etf.py")
-stock_bot = import_module_by_path("stock_bot", "1m_auto_bot_upload_stock.py")
-us_bot = import_module_by_path("us_bot", "1m_auto_bot_upload_US.py")
-mosig_bot = import_module_by_path("mosig_bot", "mosig_bot.py")
+# 모듈 로드 (지연 로드: 실제로 해당 분석기를 실행할 때 처음 import)
+BOT_FILES = {
+    'etf_bot': '1m_auto_bot_upload_etf.py',
+    'stock_bot': '1m_auto_bot_upload_stock.py',
+    'us_bot': '1m_auto_bot_upload_US.py',
+    'mosig_bot': 'mosig_bot.py',
+}
+_bot_lock = threading.Lock()
+
+def load_bot(module_name):
+    """봇 모듈을 처음 사용할 때 로드하고 이후에는 sys.modules의 것을 재사용"""
+    with _bot_lock:
+        if module_name not in sys.modules:
+            import_module_by_path(module_name, os.path.join(BASE_DIR, BOT_FILES[module_name]))
+        return sys.modules[module_name]
+
+# 분석기 의존성 그래프 (DAG)
+# - after   : 선행 노드가 끝난 뒤(성공/실패/타임아웃 무관) 시작 → KR 분석기는 같은 KRX 소스를 쓰므로 한 줄로 직렬화
+# - run     : 실제 분석 함수 (인자: 노드별 체크포인트, 체크포인트 미사용 시 None)
+# - complete: 결과를 체크포인트로 남겨도 되는지 판단 (오류 결과는 남기지 않아 재실행 시 다시 분석)
+# - fallback: 실패/타임아웃 시 리포트에 넣을 대체 결과
+ANALYZER_DAG = {
+    'etf': {
+        'label': '🇰🇷 한국 ETF',
+        'after': [],
+        'run': lambda ckpt: load_bot('etf_bot').analyze_etf_strategy(ckpt),
+        'complete': lambda result, ckpt: not result.get('error'),
+        'fallback': lambda err: {'market_status': '정보 없음', 'error': err},
+    },
+    'stock': {
+        'label': '🇰🇷 한국 개별주',
+        'after': ['etf'],
+        'run': lambda ckpt: load_bot('stock_bot').analyze_stock_strategy(ckpt),
+        'complete': lambda result, ckpt: not result.get('error'),
+        'fallback': lambda err: {'market_status': '정보 없음', 'error': err},
+    },
+    'mosig': {
+        'label': '🔎 모멘텀 급등주',
+        'after': ['stock'],
+        'run': lambda ckpt: load_bot('mosig_bot').analyze_mosig_strategy(ckpt),
+        # 종목 리스트 조회에 실패해도 빈 리스트를 반환하므로 리스트 단계 완료 여부로 판단
+        'complete': lambda result, ckpt: ckpt is None or ckpt.has('listing'),
+        'fallback': lambda err: [],
+    },
+    'us': {
+        'label': '🇺🇸 미국 주식',
+        'after': [],
+        'run': lambda ckpt: load_bot('us_bot').analyze_us_stock_strategy(ckpt),
+        'complete': lambda result, ckpt: not result.get('error'),
+        'fallback': lambda err: {'market_status': '정보 없음', 'error': err},
+    },
+}
+
+DEFAULT_ANALYZER_TIMEOUT = 900
+
+def run_analyzer_dag(dag, timeouts=None, ckpt=None, cancel_grace=None):
+    """
+    의존성 그래프에 따라 분석기를 병렬 실행합니다.
+    선행 노드가 모두 끝난 노드부터 스레드로 시작하며, 노드별 제한 시간을 넘기면
+    fallback 결과로 대체하고 그 노드의 취소 이벤트를 설정합니다. (common.set_cancel_event:
+    병렬 수집이 남은 요청을 보내지 않고 Cancelled로 종료)
+    후속 노드는 선행 노드 스레드가 실제로 끝난 뒤에만 시작하므로, 멈추지 않은 KR 분석기와
+    다음 KR 분석기가 KRX에 동시에 요청하지 않습니다. cancel_grace초 안에 멈추지 않으면 후속 노드는 건너뜁니다.
+    이미 보낸 요청은 끊을 수 없으므로(요청 타임아웃 없음) 프로세스 종료는 main 호출부에서 os._exit로 보장합니다.
+    :param dag: {노드명: {'after', 'run', 'fallback', 'label'}}
+    :param timeouts: {노드명: 제한 시간(초)}
+    :param ckpt: RunCheckpoint - 완료된 노드는 저장된 결과를 재사용 ('<노드명>.result')
+    :param cancel_grace: 취소 후 멈출 때까지 기다리는 시간(초), 기본 cfg.REPORT_CANCEL_GRACE
+    :return: (results, errors) - {노드명: 결과}, {노드명: 오류 메시지}
+    """
+    timeouts = timeouts or {}
+    cancel_grace = cfg.REPORT_CANCEL_GRACE if cancel_grace is None else cancel_grace
+    results, errors = {}, {}
+    pending = dict(dag)
+    running = {}   # 노드명 -> (시작 시각, 마감 시각)
+    threads = {}   # 노드명 -> (스레드, 취소 이벤트)
+    stopping = {}  # 취소했지만 아직 안 멈춘 노드명 -> 기다릴 마감 시각
+    stuck = set()  # 유예 시간 안에 안 멈춘 노드 + 그 때문에 건너뛴 노드
+    done_queue = queue.Queue()
+
+    def _call(node, node_ckpt):
+        if node_ckpt is None:
+            return node['run'](None)
+        complete = node.get('complete')
+        return node_ckpt.run(
+            'result',
+            lambda: node['run'](node_ckpt),
+            None if complete is None else (lambda value: complete(value, node_ckpt)),
+        )
+
+    def _worker(name, node, cancel):
+        set_cancel_event(cancel)
+        try:
+            node_ckpt = ckpt.scope(name) if ckpt is not None else None
+            done_queue.put((name, _call(node, node_ckpt), None))
+        except Exception as e:
+            done_queue.put((name, None, e))
+
+    def _finish(name, value, error=None):
+        started, _ = running.pop(name)
+        elapsed = time.monotonic() - started
+        label = dag[name].get('label', name)
+        if error is None:
+            results[name] = value
+            print(f"\n✅ [{label}] 완료 ({elapsed:.1f}초)")
+        else:
+            errors[name] = error
+            results[name] = dag[name]['fallback'](error)
+            print(f"\n⚠️ [{label}] {error} ({elapsed:.1f}초)")
+
+    def _stopped(name):
+        thread = threads.get(name)
+        return thread is None or not thread[0].is_alive()
+
+    while pending or running:
+        # 0. 취소 후 멈춘 노드 정리, 유예 시간 안에 안 멈춘 노드의 후속 노드(와 그 후속)는 건너뜀
+        now = time.monotonic()
+        for name in [n for n in stopping if _stopped(n)]:
+            stopping.pop(name)
+            print(f"\n🛑 [{dag[name].get('label', name)}] 취소 후 종료 확인")
+        for name in [n for n, deadline in stopping.items() if deadline <= now]:
+            stopping.pop(name)
+            stuck.add(name)
+            print(f"\n⚠️ [{dag[name].get('label', name)}] 취소 후 {cancel_grace}초 동안 멈추지 않음")
+        skipped = True
+        while skipped:
+            skipped = False
+            for name, node in list(pending.items()):
+                blocked = [dep for dep in node['after'] if dep in stuck]
+                if blocked:
+                    pending.pop(name)
+                    stuck.add(name)
+                    skipped = True
+                    error = f"선행 분석기({', '.join(blocked)})가 멈추지 않아 건너뜀"
+                    errors[name] = error
+                    results[name] = node['fallback'](error)
+                    print(f"\n⚠️ [{node.get('label', name)}] {error}")
+
+        # 1. 선행 노드가 모두 끝난(스레드까지 종료된) 노드 시작
+        ready = [name for name, node in pending.items()
+                 if all(dep in results and dep not in stopping for dep in node['after'])]
+        for name in ready:
+            node = pending.pop(name)
+            print(f"\n>>> [{node.get('label', name)}] 분석 시작...")
+            running[name] = (time.monotonic(), time.monotonic() + timeouts.get(name, DEFAULT_ANALYZER_TIMEOUT))
+            cancel = threading.Event()
+            thread = threading.Thread(target=_worker, args=(name, node, cancel), name=f"analyzer-{name}", daemon=True)
+            threads[name] = (thread, cancel)
+            thread.start()
+
+        if not running and not stopping:
+            if pending:
+                raise ValueError(f"분석기 의존성 순환 또는 누락: {list(pending)}")
+            break
+
+        # 2. 가장 빠른 마감 시각(제한 시간 또는 취소 유예)까지 완료 대기
+        deadlines = [deadline for _, deadline in running.values()] + list(stopping.values())
+        wait_sec = max(0.0, min(deadlines) - time.monotonic())
+        try:
+            name, value, exc = done_queue.get(timeout=wait_sec)
+        except queue.Empty:
+            now = time.monotonic()
+            for name in [n for n, (_, deadline) in running.items() if deadline <= now]:
+                threads[name][1].set()
+                stopping[name] = now + cancel_grace
+                _finish(name, None, f"제한 시간 초과 ({timeouts.get(name, DEFAULT_ANALYZER_TIMEOUT)}초)")
+            continue
+
+        if name not in running:
+            # 이미 타임아웃 처리된 노드의 늦은 결과는 버림 (스레드 종료는 다음 루프에서 확인)
+            threads[name][0].join()
+            continue
+        _finish(name, value, None if exc is None else f"실행 오류: {exc}")
+
+    return results, errors
+
+def send_once(ckpt, stage, msg, errors, **kwargs):
+    """
+    같은 실행(run ID)에서 이미 보낸 메시지는 다시 보내지 않습니다.
+    이전 전송이 일부 분석 실패 상태였고 이번 재실행의 실패가 그 진부분집합일 때만(실패가 줄었을 때만)
+    갱신된 메시지를 다시 보냅니다. ({A} → {B}처럼 실패 종목만 바뀐 경우는 다시 보내지 않음)
+    로컬 실행은 한국 시간 반나절 동안 같은 run ID를 쓰므로, 같은 반나절에 일부러 다시 보내려면
+    REPORT_RUN_ID 환경 변수로 새 run ID를 지정해야 합니다.
+    전송은 큐에 넣고 바로 반환하며, 전송이 성공하면 그때 체크포인트를 남깁니다.
+    :return: 전송 성공 여부를 담을 Future
+    """
+    errors = sorted(errors)
+    if ckpt.has(stage):
+        sent = ckpt.load(stage)
+        if not set(errors) < set(sent['errors']):
+            print(f"♻️  [체크포인트] {stage} 이미 전송됨 → 건너뜀 (새로 보내려면 REPORT_RUN_ID 지정)")
+            future = Future()
+            future.set_result(True)
+            return future
+
+    def _record(future):
+        if not future.exception() and future.result():
+            ckpt.save(stage, {'errors': errors})
+
+    future = send_telegram(msg, block=False, **kwargs)
+    future.add_done_callback(_record)
+    return future
 
 def main():
-    print("🚀 [통합 봇] 일일 투자 분석 시작...")
-    
-    # 1. 각 전략 실행 (순차 실행)
-    print(">>> 1. 한국 ETF 분석 중...")
-    etf_result = etf_bot.analyze_etf_strategy()
-    
-    print(">>> 2. 한국 개별주 분석 중...")
-    stock_result = stock_bot.analyze_stock_strategy()
-    
-    print(">>> 3. 미국 주식 분석 중...")
-    us_result = us_bot.analyze_us_stock_strategy()
-    
-    print(">>> 4. 모멘텀 급등주 스캔 중...")
-    mosig_candidates = mosig_bot.analyze_mosig_strategy()
-    
-    # 2. 통합 리포트 작성 (ETF + Stock + US)
-    report_msg = create_consolidated_report(etf_result, stock_result, us_result, mosig_candidates)
+    ckpt = RunCheckpoint()
+    ckpt.prune()
+    print(f"🚀 [통합 봇] 일일 투자 분석 시작... (run ID: {ckpt.run_id})")
+    started = time.monotonic()
+
+    # 1. 각 전략 실행 (KR / US 소스 병렬, KR 내부는 순차, 완료된 단계는 체크포인트 재사용)
+    results, errors = run_analyzer_dag(ANALYZER_DAG, cfg.REPORT_ANALYZER_TIMEOUTS, ckpt)
+    print(f"⏱️ 전체 분석 소요: {time.monotonic() - started:.1f}초")
+    if 'mosig_engine' in sys.modules:
+        sys.modules['mosig_engine'].shutdown()  # 모시그 시장별 스레드 풀/일봉 캐시 정리
+
+    etf_result = results['etf']
+    stock_result = results['stock']
+    us_result = results['us']
+    mosig_candidates = results['mosig']
+
+    # 리포트에 오류로 표시될 섹션 (타임아웃/예외 + 분석기가 반환한 오류)
+    report_errors = [name for name in ('etf', 'stock', 'us') if name in errors or results[name].get('error')]
+    if 'mosig' in errors:
+        report_errors.append('mosig')
+
+    # 2. 통합 리포트 작성 (모든 분석 결과가 모인 뒤, 오류 없는 리포트만 체크포인트)
+    report_msg = ckpt.run(
+        'render.report',
+        lambda: create_consolidated_report(etf_result, stock_result, us_result, mosig_candidates),
+        lambda _: not report_errors,
+    )
     
-    # 3. 통합 리포트 전송 (메인 채팅방)
+    # 3. 통합 리포트 전송 (메인 채팅방, 백그라운드 전송하는 동안 급등주 메시지 작성)
     print("📡 [통합 봇] 메인 리포트 전송 중...")
-    send_telegram(report_msg, parse_mode='HTML')
+    sends = [send_once(ckpt, 'send.report', report_msg, report_errors, parse_mode='HTML')]
     
     # 4. Mosig 알림 전송 (별도 채팅방)
     print("📡 [통합 봇] 급등주 알림 전송 중...")
-    mosig_msg = mosig_bot.format_message(mosig_candidates)
-    send_telegram(mosig_msg, chat_id=cfg.CHAT_ID_1P, parse_mode='Markdown')
+    mosig_errors = ['mosig'] if 'mosig' in errors else []
+    if mosig_errors:
+        mosig_msg = f"⚠️ [모시그 봇] 스캔 실패: {errors['mosig']}"
+    else:
+        mosig_msg = ckpt.run('render.mosig', lambda: load_bot('mosig_bot').format_message(mosig_candidates))
+    sends.append(send_once(ckpt, 'send.mosig', mosig_msg, mosig_errors, chat_id=cfg.CHAT_ID_1P, parse_mode='Markdown'))
+
+    # 전송 완료 대기
+    if not all(f.result() for f in sends):
+        print("⚠️ 일부 메시지 전송 실패 (같은 run ID로 재실행하면 미전송 메시지만 다시 보냄)")
+
+    # 5. 대시보드용 모멘텀 스냅샷 발행 + 종목명 인덱스 갱신 (실패해도 리포트에는 영향 없음)
+    try:
+        import momentum_snapshot
+        momentum_snapshot.publish_snapshot({'etf': etf_result, 'stock': stock_result, 'us': us_result})
+    except Exception as e:
+        print(f"⚠️ 모멘텀 스냅샷 발행 실패: {e}")
+    try:
+        import ticker_index
+        ticker_index.refresh_ticker_index()
+    except Exception as e:
+        print(f"⚠️ 종목 인덱스 갱신 실패: {e}")
     
     print("✅ 모든 작업 완료!")
 
@@ -162,4 +396,15 @@ def create_consolidated_report(etf, stock, us, mosig_list):
     return msg
 
 if __name__ == "__main__":
-    main()
+    exit_code = 0
+    try:
+        main()
+    except Exception:
+        import traceback
+        traceback.print_exc()
+        exit_code = 1
+    # 취소된 분석기의 수집 스레드가 응답 없는 요청에 묶여 있어도 바로 종료
+    # (concurrent.futures는 인터프리터 종료 시 작업 스레드를 join함, 전송/저장은 main 안에서 모두 끝남)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    os._exit(exit_code)